@@ -1,7 +1,7 @@
 
 # --- ADICIONADO: configuração de conexão com banco para múltiplos ambientes ---
 import os
-from urllib.parse import urlparse
+from urllib.parse import urlencode, urlparse
 
 # Prioriza DATABASE_URL (Render / produção), depois LOCAL_DATABASE_URL (local Docker/MySQL), depois fallback sqlite
 DATABASE_URL = os.getenv("DATABASE_URL") or os.getenv("LOCAL_DATABASE_URL") or "sqlite:///dev.db"
@@ -14,13 +14,22 @@ if DATABASE_URL.startswith("postgresql://"):
 SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret")
 # --- FIM DA ADIÇÃO ---
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
+import functools
+import hashlib
+import hmac
 import os
-from services.db import Database
-from pymysql.err import IntegrityError
+import time
+from services import lote, metricas, perfil, serializacao
+from services.cpf import normalizar_cpf
+from services.db import Database, ERROS_INTEGRIDADE, violacao_de_fk
+from services.importacao import detectar_formato, ler_registros
+from services.paginacao import decodificar_cursor, ler_limite
 
 app = Flask(__name__)
+# jsonify/request.json com orjson (Decimal como texto, datas em ISO 8601)
+app.json = serializacao.ProvedorJSON(app)
 app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = SECRET_KEY
@@ -36,6 +45,172 @@ DB = Database(
     password=os.getenv("DB_PASSWORD", "app_password_here"),
     database=os.getenv("DB_NAME", "assim_saude")
 )
+metricas.REGISTRO.registrar_coletor('db', DB.estatisticas)
+# DB_ORM=1: listagem de funcionários pelo ORM (services/orm.py) em vez do SQL do Database
+ORM = None
+if os.getenv("DB_ORM", "0").lower() in ("1", "true"):
+    from services import orm as ORM
+    ORM.configurar(app, DB)
+# /metrics expõe SQL normalizado, rotas e estado do pool: sem token só responde com METRICS_PUBLICO=1
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_PUBLICO = os.getenv("METRICS_PUBLICO", "0").lower() in ("1", "true")
+
+
+# ----------------------------
+# BANCO
+# ----------------------------
+@app.before_request
+def _nova_requisicao_db():
+    # threads do servidor são reaproveitadas: a leitura-após-escrita vale só dentro da requisição
+    DB.nova_requisicao()
+
+
+# ----------------------------
+# MÉTRICAS
+# ----------------------------
+@app.before_request
+def _iniciar_medicao():
+    g.inicio_requisicao = time.perf_counter()
+    if perfil.pedido(request.headers, request.args):
+        g.amostrador = perfil.AmostradorPilhas().iniciar()
+
+
+@app.after_request
+def _registrar_medicao(resp):
+    amostrador = g.pop('amostrador', None)
+    if amostrador:
+        amostrador.parar()
+        identificador, caminho = amostrador.salvar(f"{request.method}_{request.path}")
+        print(f"[Perfil] {request.method} {request.path} ({identificador}) -> {caminho}")
+        resp.headers['X-Profile-Id'] = identificador
+    inicio = g.pop('inicio_requisicao', None)
+    if inicio is not None:
+        rota = request.url_rule.rule if request.url_rule else 'nao_encontrada'
+        # em stream o corpo ainda nem foi gerado: o tamanho fica de fora
+        tamanho = None if resp.is_streamed else resp.content_length
+        metricas.registrar_requisicao(request.method, rota, resp.status_code, time.perf_counter() - inicio, tamanho)
+    return resp
+
+
+# registrado depois das métricas: o Flask roda os after_request em ordem inversa,
+# então a compressão acontece antes e o tamanho medido é o que vai pela rede
+@app.after_request
+def _comprimir(resp):
+    return serializacao.comprimir(resp, request)
+
+
+# ----------------------------
+# SAÚDE
+# ----------------------------
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: o processo está de pé e atendendo (não toca no banco)."""
+    return jsonify({'status': 'ok'}), 200
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: banco respondendo e pool aquecido; 503 enquanto não estiver."""
+    pronto, detalhes = DB.verificar_prontidao()
+    detalhes['status'] = 'pronto' if pronto else 'aguardando'
+    return jsonify(detalhes), 200 if pronto else 503
+
+
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    if METRICS_TOKEN:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {METRICS_TOKEN}"):
+            return jsonify({'erro': 'Não autorizado'}), 401
+    elif not METRICS_PUBLICO:
+        return jsonify({'erro': 'Métricas desabilitadas: defina METRICS_TOKEN (ou METRICS_PUBLICO=1)'}), 403
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
+def _paginado():
+    """Listagens só viram páginas ({'itens', 'next_cursor'}) quando o cliente pede `limit` ou `after`."""
+    return 'limit' in request.args or 'after' in request.args
+
+
+def _incluir_arquivados():
+    """`?include_archived=1`: funcionários desligados e arquivados também entram (migração 004)."""
+    return request.args.get('include_archived', '').lower() in ('1', 'true')
+
+
+def _ler_pagina():
+    """(limite, after) validados antes do 304: parâmetro inválido é 400, nunca 304 (ValueError)."""
+    apos = request.args.get('after')
+    decodificar_cursor(apos)
+    return ler_limite(request.args.get('limit')), apos
+
+
+def _etag_da_listagem(*tabelas):
+    """
+    Versão das tabelas + query string normalizada (filtros, página, `formato`): cada representação
+    da listagem tem o seu validador, e um 304 nunca confirma o que o cliente não guardou.
+    """
+    etag = DB.versoes.etag(*tabelas)
+    parametros = sorted(request.args.items(multi=True))
+    if parametros:
+        etag += '-' + hashlib.blake2s(urlencode(parametros).encode(), digest_size=8).hexdigest()
+    return etag
+
+
+def _nao_modificado(etag):
+    """304 imediato se o cliente já tem esta versão; evita consulta e serialização."""
+    # comparação fraca: a versão gzip da mesma resposta volta como W/"..." (serializacao.comprimir)
+    if request.if_none_match.contains_weak(etag):
+        resp = app.response_class(status=304)
+        resp.set_etag(etag, weak=not request.if_none_match.contains(etag))
+        return resp
+    return None
+
+
+def _com_etag(resp, etag):
+    resp.set_etag(etag)
+    # sempre revalida: a próxima carga vira um If-None-Match
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+
+def _lista(dados):
+    """jsonify das listagens; `?formato=colunar` troca a lista de dicts por colunas + linhas."""
+    if request.args.get('formato') == 'colunar':
+        dados = serializacao.colunar(dados)
+    return jsonify(dados)
+
+
+def _streaming():
+    """Modo stream: `?stream=1` ou `Accept: application/x-ndjson`."""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def _responder_stream(lotes):
+    """Escreve os lotes conforme chegam do banco: NDJSON (uma linha por registro) ou um array JSON."""
+    dumps = serializacao.dumps
+    ndjson = (request.accept_mimetypes.best == 'application/x-ndjson'
+              or request.args.get('formato') == 'ndjson')
+
+    def gerar_ndjson():
+        for linhas in lotes:
+            yield b''.join(dumps(linha) + b'\n' for linha in linhas)
+
+    def gerar_array():
+        yield b'['
+        separador = b''
+        for linhas in lotes:
+            if linhas:
+                # um dumps por lote: o array do lote sem os colchetes
+                yield separador + dumps(linhas)[1:-1]
+                separador = b','
+        yield b']'
+
+    resp = Response(gerar_ndjson() if ndjson else gerar_array(),
+                    mimetype='application/x-ndjson' if ndjson else 'application/json')
+    # não deixa proxies (nginx) segurarem o corpo inteiro antes de repassar
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
 
 # ----------------------------
 # CARGOS
@@ -43,8 +218,26 @@ DB = Database(
 @app.route('/api/cargos', methods=['GET'])
 def listar_cargos():
     nome = request.args.get('nome', '')
-    cargos = DB.buscar_cargos_por_nome(nome)
-    return jsonify(cargos), 200
+    if _paginado():
+        try:
+            limite, apos = _ler_pagina()
+        except ValueError as ve:
+            return jsonify({'erro': str(ve)}), 400
+    etag = _etag_da_listagem('cargos')
+    resp = _nao_modificado(etag)
+    if resp:
+        return resp
+    if not _paginado():
+        return _com_etag(_lista(DB.buscar_cargos_por_nome(nome)), etag), 200
+    return _com_etag(_lista(DB.paginar_cargos(nome, limite, apos)), etag), 200
+
+
+@app.route('/api/cargos/<int:cargo_id>', methods=['GET'])
+def obter_cargo(cargo_id):
+    cargo = DB.buscar_cargo(cargo_id)
+    if cargo:
+        return jsonify(cargo), 200
+    return jsonify({'erro': 'Cargo não encontrado'}), 404
 
 
 @app.route('/api/cargos', methods=['POST'])
@@ -64,6 +257,11 @@ def adicionar_cargo():
         return jsonify({'erro': str(e)}), 500
 
 
+@app.route('/api/cargos/batch', methods=['POST'])
+def lote_cargos():
+    return _aplicar_lote(DB.lote_cargos)
+
+
 @app.route('/api/cargos/<int:cargo_id>', methods=['PUT'])
 def editar_cargo(cargo_id):
     data = request.json or {}
@@ -80,8 +278,8 @@ def remover_cargo(cargo_id):
         if deleted:
             return jsonify({'mensagem': 'Cargo excluído'}), 200
         return jsonify({'erro': 'Cargo não encontrado'}), 404
-    except IntegrityError:
-        return jsonify({'erro': 'Não é possível excluir este cargo: existem funcionários vinculados.'}), 400
+    except ERROS_INTEGRIDADE:
+        return jsonify({'erro': 'Não é possível excluir este cargo: existem funcionários ativos vinculados.'}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
@@ -93,8 +291,40 @@ def remover_cargo(cargo_id):
 def listar_funcionarios():
     nome = request.args.get('nome', '')
     cpf = request.args.get('cpf', '')
-    funcionarios = DB.buscar_funcionarios(nome, cpf)
-    return jsonify(funcionarios), 200
+    arquivados = _incluir_arquivados()
+    if _streaming():
+        return _responder_stream(DB.iterar_funcionarios(nome, cpf, incluir_arquivados=arquivados))
+    if _paginado():
+        try:
+            limite, apos = _ler_pagina()
+        except ValueError as ve:
+            return jsonify({'erro': str(ve)}), 400
+    # a listagem traz nome/salário do cargo, então depende das duas tabelas
+    etag = _etag_da_listagem('funcionarios', 'cargos')
+    resp = _nao_modificado(etag)
+    if resp:
+        return resp
+    if arquivados:
+        # a união com o arquivo só existe no SQL do Database
+        if not _paginado():
+            return _com_etag(_lista(DB.buscar_funcionarios(nome, cpf, incluir_arquivados=True)), etag), 200
+        paginar = functools.partial(DB.paginar_funcionarios, incluir_arquivados=True)
+    else:
+        leitor = ORM or DB
+        if not _paginado():
+            return _com_etag(_lista(leitor.buscar_funcionarios(nome, cpf)), etag), 200
+        paginar = leitor.paginar_funcionarios
+    return _com_etag(_lista(paginar(nome, cpf, limite, apos)), etag), 200
+
+
+@app.route('/api/funcionarios/busca', methods=['GET'])
+def buscar_funcionarios():
+    try:
+        limite = ler_limite(request.args.get('limit'), padrao=20)
+    except ValueError as ve:
+        return jsonify({'erro': str(ve)}), 400
+    return _lista(DB.pesquisar_funcionarios(request.args.get('q', ''), limite,
+                                            incluir_arquivados=_incluir_arquivados())), 200
 
 
 @app.route('/api/funcionarios', methods=['POST'])
@@ -116,7 +346,7 @@ def adicionar_funcionario():
             data.get('cargo_id')
         )
         return jsonify({'mensagem': 'Funcionário cadastrado', 'id': new_id}), 201
-    except IntegrityError:
+    except ERROS_INTEGRIDADE:
         return jsonify({'erro': 'CPF já cadastrado'}), 400
     except ValueError as ve:
         return jsonify({'erro': str(ve)}), 400
@@ -124,6 +354,42 @@ def adicionar_funcionario():
         return jsonify({'erro': str(e)}), 500
 
 
+@app.route('/api/funcionarios/bulk', methods=['POST'])
+def importar_funcionarios():
+    try:
+        formato = detectar_formato(request.content_type, request.args.get('formato'))
+        registros = ler_registros(request.get_data(as_text=True), formato)
+    except ValueError as ve:
+        return jsonify({'erro': str(ve)}), 400
+    if not registros:
+        return jsonify({'erro': 'Arquivo vazio'}), 400
+
+    try:
+        relatorio = DB.importar_funcionarios(registros)
+        return jsonify(relatorio), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
+@app.route('/api/funcionarios/batch', methods=['POST'])
+def lote_funcionarios():
+    return _aplicar_lote(DB.lote_funcionarios)
+
+
+def _aplicar_lote(aplicar):
+    """Lote numa transação só: 200 se aplicado, 400 com o relatório por operação se não (inclusive
+    em por_item quando nenhuma operação foi aplicada)."""
+    try:
+        modo, operacoes = lote.ler_lote(request.get_json(silent=True))
+    except ValueError as ve:
+        return jsonify({'erro': str(ve)}), 400
+    try:
+        relatorio = aplicar(operacoes, tudo_ou_nada=(modo == 'tudo_ou_nada'))
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+    return jsonify(relatorio), 200 if relatorio['aplicado'] else 400
+
+
 @app.route('/api/funcionarios/<int:func_id>', methods=['PUT'])
 def editar_funcionario(func_id):
     data = request.json or {}
@@ -134,12 +400,36 @@ def editar_funcionario(func_id):
         return jsonify({'erro': 'Funcionário não encontrado'}), 404
     except ValueError as ve:
         return jsonify({'erro': str(ve)}), 400
-    except IntegrityError:
+    except ERROS_INTEGRIDADE:
         return jsonify({'erro': 'CPF já cadastrado'}), 400
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
 
+@app.route('/api/funcionarios/by-cpf/<cpf>', methods=['PUT'])
+def upsert_funcionario(cpf):
+    data = request.json or {}
+    if data.get('cpf') and normalizar_cpf(data['cpf']) != normalizar_cpf(cpf):
+        return jsonify({'erro': 'CPF do corpo difere do CPF da URL'}), 400
+    for f in ('nome', 'cargo_id'):
+        if not data.get(f):
+            return jsonify({'erro': f'Campo {f} é obrigatório'}), 400
+
+    try:
+        func_id, criado = DB.upsert_funcionario(cpf, data)
+        if criado:
+            return jsonify({'mensagem': 'Funcionário cadastrado', 'id': func_id, 'criado': True}), 201
+        return jsonify({'mensagem': 'Funcionário atualizado', 'id': func_id, 'criado': False}), 200
+    except ValueError as ve:
+        return jsonify({'erro': str(ve)}), 400
+    except ERROS_INTEGRIDADE as e:
+        if violacao_de_fk(e):
+            return jsonify({'erro': 'Cargo não encontrado'}), 400
+        return jsonify({'erro': f'Conflito com um registro existente: {e}'}), 409
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+
 @app.route('/api/funcionarios/<int:func_id>', methods=['DELETE'])
 def excluir_funcionario(func_id):
     try:
@@ -152,40 +442,88 @@ def excluir_funcionario(func_id):
 
 
 # ----------------------------
-# CONTADORES GERAIS
+# RELATÓRIO
 # ----------------------------
-@app.route('/api/counts', methods=['GET'])
-def api_counts():
+@app.route('/api/relatorio', methods=['GET'])
+def relatorio():
+    cargo_id = request.args.get('cargo_id') or None
+    if cargo_id is not None and not cargo_id.isdigit():
+        return jsonify({'erro': 'cargo_id deve ser numérico'}), 400
     try:
-        cur = DB.conn.cursor()
-
-        cur.execute("SELECT COUNT(*) FROM cargos")
-        cargos = cur.fetchone()[0]
-
-        cur.execute("SELECT COUNT(*) FROM funcionarios")
-        funcionarios = cur.fetchone()[0]
+        pagina = DB.gerar_relatorio(
+            request.args.get('nome', ''),
+            int(cargo_id) if cargo_id is not None else None,
+            ler_limite(request.args.get('limit')),
+            request.args.get('after'),
+            agregados=request.args.get('agregados', '').lower() in ('1', 'true'),
+        )
+    except ValueError as ve:
+        return jsonify({'erro': str(ve)}), 400
+    return _lista(pagina), 200
 
-        schema = os.getenv('DB_NAME', 'assim_saude')
-        cur.execute("""
-            SELECT COUNT(*) FROM information_schema.tables
-            WHERE table_schema=%s AND table_name=%s
-        """, (schema, 'relatorios'))
-        existe = cur.fetchone()[0]
 
-        relatorios = None
-        if existe:
-            cur.execute("SELECT COUNT(*) FROM relatorios")
-            relatorios = cur.fetchone()[0]
+@app.route('/api/resumo/cargos', methods=['GET'])
+def resumo_cargos():
+    """Quantidade de funcionários e folha por cargo (uma linha por cargo, mantida a cada escrita)."""
+    etag = _etag_da_listagem('funcionarios', 'cargos')
+    resp = _nao_modificado(etag)
+    if resp:
+        return resp
+    try:
+        return _com_etag(_lista(DB.resumo_cargos()), etag), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
 
-        return jsonify({
-            'cargos': cargos,
-            'funcionarios': funcionarios,
-            'relatorios': relatorios
-        }), 200
 
+# ----------------------------
+# CONTADORES GERAIS
+# ----------------------------
+@app.route('/api/counts', methods=['GET'])
+def api_counts():
+    try:
+        contagens, etag = DB.contar_registros()
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
+    corpo = {
+        'cargos': contagens['cargos'],
+        'funcionarios': contagens['funcionarios'],
+        'relatorios': contagens['relatorios']
+    }
+    if _incluir_arquivados():
+        # contados na hora (fora do cache): desligados ainda na tabela e já arquivados; o
+        # arquivamento não muda o total de ativos, então os dois também entram no ETag
+        desligados = DB.contar_desligados()
+        corpo.update(desligados)
+        etag = f"{etag}-{desligados['funcionarios_inativos']}-{desligados['funcionarios_arquivados']}"
+    resp = jsonify(corpo)
+    # o navegador revalida a cada poll; sem mudança a resposta é um 304 sem corpo
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp.make_conditional(request)
+
+
+# ----------------------------
+# EVENTOS (SSE)
+# ----------------------------
+@app.route('/api/events', methods=['GET'])
+def api_eventos():
+    """
+    text/event-stream com `contagens` e `alteracao` (cargos/funcionarios) conforme acontecem;
+    o EventSource do navegador reconecta sozinho mandando o Last-Event-ID.
+    """
+    fluxo = DB.eventos.assinar(request.headers.get('Last-Event-ID'))
+    if fluxo is None:
+        # o frontend volta para o polling do /api/counts
+        resp = jsonify({'erro': 'Limite de conexões de eventos atingido'})
+        resp.headers['Retry-After'] = '30'
+        return resp, 503
+    resp = Response(fluxo, mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    # nginx/proxies: não segurar o stream em buffer
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
 
 # ✅ Detecta automaticamente o ambiente (local ou Render)
 if __name__ == '__main__':
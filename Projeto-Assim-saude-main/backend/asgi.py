@@ -0,0 +1,249 @@
+# asgi.py
+"""
+Modo assíncrono (ASGI) da API: as rotas de cargos, funcionários e contagens do app.py como
+handlers async sobre o AsyncDatabase (aiomysql / asyncpg / SQLite numa thread).
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 3
+
+Cada worker atende centenas de requisições simultâneas: quem espera o banco é uma corrotina,
+não uma thread. As demais rotas (lote, importação, relatório, SSE, métricas...) continuam no
+app.py (WSGI); os dois modos podem apontar para o mesmo banco.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+
+from services import serializacao
+from services.db_async import AsyncDatabase, ERROS_INTEGRIDADE_ASYNC
+from services.paginacao import ler_limite
+
+DB = AsyncDatabase(
+    host=os.getenv("DB_HOST", "localhost"),
+    port=int(os.getenv("DB_PORT", 3306)),
+    user=os.getenv("DB_USER", "appuser"),
+    password=os.getenv("DB_PASSWORD", "app_password_here"),
+    database=os.getenv("DB_NAME", "assim_saude")
+)
+
+
+class RespostaJSON(Response):
+    """JSON com o mesmo codificador do app.py (orjson, Decimal como texto, datas ISO 8601)."""
+    media_type = 'application/json'
+
+    def render(self, conteudo):
+        return serializacao.dumps(conteudo)
+
+
+def _lista(request, dados):
+    """Listagens; `?formato=colunar` troca a lista de dicts por colunas + linhas."""
+    if request.query_params.get('formato') == 'colunar':
+        dados = serializacao.colunar(dados)
+    return RespostaJSON(dados)
+
+
+def _paginado(request):
+    return 'limit' in request.query_params or 'after' in request.query_params
+
+
+async def _corpo(request):
+    try:
+        return await request.json() or {}
+    except ValueError:
+        return {}
+
+
+def _erro(mensagem, status):
+    return RespostaJSON({'erro': mensagem}, status_code=status)
+
+
+# ----------------------------
+# SAÚDE
+# ----------------------------
+async def healthz(request):
+    return RespostaJSON({'status': 'ok'})
+
+
+async def readyz(request):
+    pronto, detalhes = await DB.verificar_prontidao()
+    detalhes['status'] = 'pronto' if pronto else 'aguardando'
+    return RespostaJSON(detalhes, status_code=200 if pronto else 503)
+
+
+# ----------------------------
+# CARGOS
+# ----------------------------
+async def listar_cargos(request):
+    nome = request.query_params.get('nome', '')
+    if not _paginado(request):
+        return _lista(request, await DB.buscar_cargos_por_nome(nome))
+    try:
+        pagina = await DB.paginar_cargos(nome, ler_limite(request.query_params.get('limit')),
+                                         request.query_params.get('after'))
+    except ValueError as ve:
+        return _erro(str(ve), 400)
+    return _lista(request, pagina)
+
+
+async def obter_cargo(request):
+    cargo = await DB.buscar_cargo(request.path_params['cargo_id'])
+    if cargo:
+        return RespostaJSON(cargo)
+    return _erro('Cargo não encontrado', 404)
+
+
+async def adicionar_cargo(request):
+    data = await _corpo(request)
+    nome = data.get('nome')
+    salario = data.get('salario')
+    if not nome or salario is None:
+        return _erro('Nome e salário são obrigatórios.', 400)
+    try:
+        novo_id = await DB.inserir_cargo(nome, salario, data.get('descricao', ''))
+        return RespostaJSON({'mensagem': 'Cargo criado', 'id': novo_id}, status_code=201)
+    except Exception as e:
+        return _erro(str(e), 500)
+
+
+async def editar_cargo(request):
+    data = await _corpo(request)
+    updated = await DB.atualizar_cargo(request.path_params['cargo_id'], data.get('nome'),
+                                       data.get('salario'), data.get('descricao'))
+    if updated:
+        return RespostaJSON({'mensagem': 'Cargo atualizado'})
+    return _erro('Cargo não encontrado', 404)
+
+
+async def remover_cargo(request):
+    try:
+        if await DB.deletar_cargo(request.path_params['cargo_id']):
+            return RespostaJSON({'mensagem': 'Cargo excluído'})
+        return _erro('Cargo não encontrado', 404)
+    except ERROS_INTEGRIDADE_ASYNC:
+        return _erro('Não é possível excluir este cargo: existem funcionários ativos vinculados.', 400)
+    except Exception as e:
+        return _erro(str(e), 500)
+
+
+# ----------------------------
+# FUNCIONÁRIOS
+# ----------------------------
+async def listar_funcionarios(request):
+    nome = request.query_params.get('nome', '')
+    cpf = request.query_params.get('cpf', '')
+    # ?include_archived=1: desligados e arquivados também (migração 004)
+    arquivados = request.query_params.get('include_archived', '').lower() in ('1', 'true')
+    if not _paginado(request):
+        return _lista(request, await DB.buscar_funcionarios(nome, cpf, incluir_arquivados=arquivados))
+    try:
+        pagina = await DB.paginar_funcionarios(nome, cpf, ler_limite(request.query_params.get('limit')),
+                                               request.query_params.get('after'), incluir_arquivados=arquivados)
+    except ValueError as ve:
+        return _erro(str(ve), 400)
+    return _lista(request, pagina)
+
+
+async def adicionar_funcionario(request):
+    data = await _corpo(request)
+    for f in ('nome', 'cpf', 'cargo_id'):
+        if not data.get(f):
+            return _erro(f'Campo {f} é obrigatório', 400)
+    try:
+        new_id = await DB.inserir_funcionario(
+            data.get('nome'),
+            data.get('data_nascimento'),
+            data.get('endereco'),
+            data.get('cpf'),
+            data.get('email'),
+            data.get('telefone'),
+            data.get('cargo_id')
+        )
+        return RespostaJSON({'mensagem': 'Funcionário cadastrado', 'id': new_id}, status_code=201)
+    except ERROS_INTEGRIDADE_ASYNC:
+        return _erro('CPF já cadastrado', 400)
+    except ValueError as ve:
+        return _erro(str(ve), 400)
+    except Exception as e:
+        return _erro(str(e), 500)
+
+
+async def editar_funcionario(request):
+    data = await _corpo(request)
+    try:
+        if await DB.atualizar_funcionario(request.path_params['func_id'], data):
+            return RespostaJSON({'mensagem': 'Funcionário atualizado'})
+        return _erro('Funcionário não encontrado', 404)
+    except ValueError as ve:
+        return _erro(str(ve), 400)
+    except ERROS_INTEGRIDADE_ASYNC:
+        return _erro('CPF já cadastrado', 400)
+    except Exception as e:
+        return _erro(str(e), 500)
+
+
+async def excluir_funcionario(request):
+    try:
+        if await DB.deletar_funcionario(request.path_params['func_id']):
+            return RespostaJSON({'mensagem': 'Funcionário excluído'})
+        return _erro('Funcionário não encontrado', 404)
+    except Exception as e:
+        return _erro(str(e), 500)
+
+
+# ----------------------------
+# CONTADORES GERAIS
+# ----------------------------
+async def api_counts(request):
+    try:
+        contagens, etag = await DB.contar_registros()
+    except Exception as e:
+        return _erro(str(e), 500)
+    cabecalhos = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+    # o navegador revalida a cada poll; sem mudança a resposta é um 304 sem corpo.
+    # If-None-Match é uma lista (ou `*`) e usa comparação fraca: W/"x" casa com "x"
+    if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+        return Response(status_code=304, headers=cabecalhos)
+    return RespostaJSON({
+        'cargos': contagens['cargos'],
+        'funcionarios': contagens['funcionarios'],
+        'relatorios': contagens['relatorios']
+    }, headers=cabecalhos)
+
+
+@asynccontextmanager
+async def _ciclo_de_vida(app):
+    # sobe sem esperar o banco (como o app.py): o pool aquece em segundo plano
+    aquecimento = asyncio.create_task(DB.aquecer())
+    yield
+    aquecimento.cancel()
+    await DB.fechar()
+
+
+app = Starlette(
+    routes=[
+        Route('/healthz', healthz, methods=['GET']),
+        Route('/readyz', readyz, methods=['GET']),
+        Route('/api/cargos', listar_cargos, methods=['GET']),
+        Route('/api/cargos', adicionar_cargo, methods=['POST']),
+        Route('/api/cargos/{cargo_id:int}', obter_cargo, methods=['GET']),
+        Route('/api/cargos/{cargo_id:int}', editar_cargo, methods=['PUT']),
+        Route('/api/cargos/{cargo_id:int}', remover_cargo, methods=['DELETE']),
+        Route('/api/funcionarios', listar_funcionarios, methods=['GET']),
+        Route('/api/funcionarios', adicionar_funcionario, methods=['POST']),
+        Route('/api/funcionarios/{func_id:int}', editar_funcionario, methods=['PUT']),
+        Route('/api/funcionarios/{func_id:int}', excluir_funcionario, methods=['DELETE']),
+        Route('/api/counts', api_counts, methods=['GET']),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(GZipMiddleware, minimum_size=serializacao.GZIP_MINIMO, compresslevel=serializacao.GZIP_NIVEL),
+    ],
+    lifespan=_ciclo_de_vida,
+)
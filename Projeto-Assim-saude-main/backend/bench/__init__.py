@@ -0,0 +1,10 @@
+"""
+Benchmarks do backend (rodar a partir de backend/: `python -m bench.<modulo>`).
+
+ - bench.carga   -> carga HTTP em todas as rotas do app.py (vazão e p50/p95/p99 por rota)
+ - bench.banco   -> micro-benchmark dos métodos de services.db.Database
+ - bench.cpf     -> micro-benchmark da validação de CPF
+ - bench.serializacao -> micro-benchmark da serialização das listagens (jsonify x orjson x colunar)
+ - bench.dados   -> massa sintética (cargos e funcionários com CPFs válidos)
+ - bench.resultados -> estatísticas, JSON de resultados e comparação com baseline
+"""
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark dos métodos de services.db.Database, sem a camada HTTP.
+
+Usa um SQLite temporário (ou o banco de DATABASE_URL, com --usar-database-url), semeia a massa
+sintética e mede cada método `--repeticoes` vezes numa thread só:
+
+    python -m bench.banco --funcionarios 20000 --saida banco.json
+    python -m bench.banco --baseline banco.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from bench import dados, resultados
+
+
+ESCRITAS = {'inserir_funcionario', 'atualizar_funcionario', 'deletar_funcionario'}
+# operações por chamada no caso de lote (compare com LOTE x atualizar_funcionario)
+LOTE = 50
+
+
+def medir(funcao, repeticoes, aquecimento=3):
+    for i in range(min(aquecimento, repeticoes)):
+        funcao(i)
+    latencias = []
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao(i)
+        latencias.append(time.perf_counter() - t0)
+    return resultados.resumir(latencias, time.perf_counter() - inicio)
+
+
+def operacoes(db, cargo_ids, cpfs_usados, repeticoes, seed):
+    amostra = dados.gerar_funcionarios(100, cargo_ids, seed + 1, dados.cpfs_unicos(100, seed + 1))
+    nomes = [f['nome'].split()[1] for f in amostra]
+    prefixos = [f['cpf'][:7] for f in amostra]
+    cursor = db.paginar_funcionarios(limite=50)['next_cursor']
+
+    novos_cpfs = [c for c in dados.cpfs_unicos(repeticoes * 2 + len(cpfs_usados), seed + 9) if c not in cpfs_usados]
+    novos = dados.gerar_funcionarios(repeticoes + 3, cargo_ids, seed + 3, novos_cpfs)
+    criados = []
+
+    def inserir(i):
+        f = novos[len(criados)]
+        criados.append(db.inserir_funcionario(f['nome'], f['data_nascimento'], f['endereco'], f['cpf'],
+                                              f['email'], f['telefone'], f['cargo_id']))
+
+    def atualizar_em_lote(i):
+        # as mesmas LOTE atualizações de atualizar_funcionario, numa transação/requisição só
+        from services import lote
+        ops = [lote.Operacao(j, 'atualizar', criados[(i * LOTE + j) % len(criados)],
+                             dict(novos[(i * LOTE + j) % len(criados)], telefone=f'(11) 8{i:04d}-{j:04d}'))
+               for j in range(LOTE)]
+        db.lote_funcionarios(ops)
+
+    cargo = lambda i: cargo_ids[i % len(cargo_ids)]
+    return {
+        'buscar_cargos_por_nome': lambda i: db.buscar_cargos_por_nome(),
+        'buscar_cargo (cache)': lambda i: db.buscar_cargo(cargo(i)),
+        'paginar_funcionarios': lambda i: db.paginar_funcionarios(limite=50),
+        'paginar_funcionarios (2ª página)': lambda i: db.paginar_funcionarios(limite=50, apos=cursor),
+        'paginar_funcionarios (nome)': lambda i: db.paginar_funcionarios(nome=nomes[i % 100], limite=50),
+        'paginar_funcionarios (cpf)': lambda i: db.paginar_funcionarios(cpf=prefixos[i % 100], limite=50),
+        'pesquisar_funcionarios (nome)': lambda i: db.pesquisar_funcionarios(nomes[i % 100]),
+        'pesquisar_funcionarios (cpf)': lambda i: db.pesquisar_funcionarios(prefixos[i % 100]),
+        'gerar_relatorio': lambda i: db.gerar_relatorio(limite=50),
+        'gerar_relatorio (agregados)': lambda i: db.gerar_relatorio(cargo_id=cargo(i), limite=50, agregados=True),
+        'contar_registros': lambda i: db.contar_registros(),
+        'contar_registros (banco)': lambda i: db._contar_no_banco(),
+        'inserir_funcionario': inserir,
+        'atualizar_funcionario': lambda i: db.atualizar_funcionario(
+            criados[i % len(criados)], dict(novos[i % len(criados)], telefone=f'(11) 9{i:04d}-0000')),
+        f'lote_funcionarios ({LOTE} atualizações)': atualizar_em_lote,
+        'deletar_funcionario': lambda i: db.deletar_funcionario(criados.pop()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cargos', type=int, default=20)
+    parser.add_argument('--funcionarios', type=int, default=10_000)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--usar-database-url', action='store_true',
+                        help='mede no banco de DATABASE_URL em vez de um SQLite temporário')
+    resultados.adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    if not args.usar_database_url:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_'), 'bench.db')}"
+    from services.db import Database
+
+    db = Database()
+    inicio = time.perf_counter()
+    cargo_ids, cpfs_usados = dados.semear(db, args.cargos, args.funcionarios, args.seed)
+    print(f"Massa pronta em {time.perf_counter() - inicio:.1f}s ({args.funcionarios} funcionários, {db.kind})")
+
+    medidos = {}
+    for nome, funcao in operacoes(db, cargo_ids, cpfs_usados, args.repeticoes, args.seed).items():
+        # escritas não aquecem: cada chamada consome um registro (CPF novo / id criado)
+        medidos[nome] = medir(funcao, args.repeticoes, aquecimento=0 if nome in ESCRITAS else 3)
+
+    meta = resultados.metadados(tipo='banco', motor=db.kind, repeticoes=args.repeticoes,
+                                cargos=args.cargos, funcionarios=args.funcionarios, seed=args.seed)
+    return resultados.finalizar(args, meta, medidos)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Teste de carga HTTP de todas as rotas do app.py.
+
+Sem --url, sobe o `app` num servidor local (thread) apontado para um SQLite temporário,
+semeia a massa sintética e dispara cada rota com `--concorrencia` clientes simultâneos:
+
+    python -m bench.carga --funcionarios 20000 --concorrencia 16 --saida bench.json
+    python -m bench.carga --baseline bench.json          # acusa regressões (código de saída 1)
+
+Para medir com MySQL/Postgres local use --database-url (mesmo formato de DATABASE_URL);
+para medir um servidor já no ar (ex.: Gunicorn) use --url, e a massa é enviada pela API.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from bench import dados, resultados
+
+
+class Cenario:
+    """
+    Uma rota a medir. `requisicao(i)` devolve (método, caminho, corpo, headers) da i-ésima chamada;
+    `coletar(i, status, corpo)` recebe as respostas (ex.: ids criados usados pelos cenários seguintes).
+    """
+
+    def __init__(self, nome, requisicao, quantidade, esperados=(200,), coletar=None, aquecer=True):
+        self.nome = nome
+        self.requisicao = requisicao
+        self.quantidade = quantidade
+        self.esperados = esperados
+        self.coletar = coletar
+        self.aquecer = aquecer
+
+
+class ClienteHTTP:
+    """Uma conexão keep-alive por thread (reaberta automaticamente se o servidor fechar)."""
+
+    def __init__(self, url):
+        alvo = urlparse(url)
+        self.host, self.port = alvo.hostname, alvo.port or 80
+        self._local = threading.local()
+
+    def enviar(self, metodo, caminho, corpo=None, headers=None):
+        status, conteudo, _ = self.enviar_completo(metodo, caminho, corpo, headers)
+        return status, conteudo
+
+    def enviar_completo(self, metodo, caminho, corpo=None, headers=None):
+        """Como enviar, devolvendo também os headers da resposta."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        headers = dict(headers or {})
+        if isinstance(corpo, (dict, list)):
+            corpo = json.dumps(corpo).encode()
+            headers.setdefault('Content-Type', 'application/json')
+        try:
+            conn.request(metodo, caminho, body=corpo, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.read(), resp.headers
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def executar(cliente, cenario, concorrencia, aquecimento):
+    erros = 0
+    trava = threading.Lock()
+
+    def chamar(i):
+        nonlocal erros
+        try:
+            # montar a requisição falha se ela depende de um cenário anterior filtrado por --rotas
+            metodo, caminho, corpo, headers = cenario.requisicao(i)
+            inicio = time.perf_counter()
+            status, conteudo = cliente.enviar(metodo, caminho, corpo, headers)
+            decorrido = time.perf_counter() - inicio
+        except Exception:
+            status, conteudo = None, b''
+        if status not in cenario.esperados:
+            with trava:
+                erros += 1
+            return None
+        if cenario.coletar:
+            cenario.coletar(i, status, conteudo)
+        return decorrido
+
+    if cenario.aquecer:
+        for i in range(min(aquecimento, cenario.quantidade)):
+            chamar(i)
+        erros = 0
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        latencias = [t for t in executor.map(chamar, range(cenario.quantidade)) if t is not None]
+    return resultados.resumir(latencias, time.perf_counter() - inicio, erros)
+
+
+def montar_cenarios(cliente, cargo_ids, cpfs_usados, n, seed=42):
+    """Leituras primeiro, depois escritas na ordem criar -> atualizar -> excluir."""
+    rnd = random.Random(seed)
+    amostra = dados.gerar_funcionarios(200, cargo_ids, seed + 1, dados.cpfs_unicos(200, seed + 1))
+    nomes = [f['nome'].split()[1] for f in amostra]
+    prefixos_cpf = [f['cpf'][:7] for f in amostra]
+    pesado = max(1, n // 10)
+
+    # cursor da 2ª página e ETag da listagem (para medir o caminho 304)
+    _, corpo, headers = cliente.enviar_completo('GET', '/api/funcionarios?limit=50')
+    proximo = json.loads(corpo).get('next_cursor')
+    etag_lista = headers.get('ETag')
+
+    get = lambda caminho: (lambda i: ('GET', caminho(i) if callable(caminho) else caminho, None, None))
+    cenarios = [
+        Cenario('GET /api/cargos', get('/api/cargos'), n),
+        Cenario('GET /api/cargos?limit', get('/api/cargos?limit=50'), n),
+        Cenario('GET /api/cargos/<id>', get(lambda i: f'/api/cargos/{cargo_ids[i % len(cargo_ids)]}'), n),
+        Cenario('GET /api/funcionarios', get('/api/funcionarios'), pesado),
+        Cenario('GET /api/funcionarios?stream', get('/api/funcionarios?stream=1'), pesado),
+        Cenario('GET /api/funcionarios?limit', get('/api/funcionarios?limit=50'), n),
+        Cenario('GET /api/funcionarios?after', get(f'/api/funcionarios?limit=50&after={proximo}'), n),
+        Cenario('GET /api/funcionarios (304)',
+                lambda i: ('GET', '/api/funcionarios?limit=50', None, {'If-None-Match': etag_lista}),
+                n, esperados=(304,)),
+        Cenario('GET /api/funcionarios?nome', get(lambda i: f'/api/funcionarios?limit=50&nome={nomes[i % len(nomes)]}'), n),
+        Cenario('GET /api/funcionarios?cpf', get(lambda i: f'/api/funcionarios?limit=50&cpf={prefixos_cpf[i % 200]}'), n),
+        Cenario('GET /api/funcionarios/busca?q=nome', get(lambda i: f'/api/funcionarios/busca?q={nomes[i % len(nomes)]}'), n),
+        Cenario('GET /api/funcionarios/busca?q=cpf', get(lambda i: f'/api/funcionarios/busca?q={prefixos_cpf[i % 200]}'), n),
+        Cenario('GET /api/relatorio', get('/api/relatorio?limit=50'), n),
+        Cenario('GET /api/relatorio?agregados',
+                get(lambda i: f'/api/relatorio?limit=50&agregados=1&cargo_id={cargo_ids[i % len(cargo_ids)]}'), n),
+        Cenario('GET /api/counts', get('/api/counts'), n),
+    ]
+
+    # escritas: CPFs novos, fora da massa semeada
+    novos_cpfs = [c for c in dados.cpfs_unicos(n * 2 + len(cpfs_usados), seed + 7) if c not in cpfs_usados]
+    novos = dados.gerar_funcionarios(n, cargo_ids, seed + 2, novos_cpfs[:n])
+    lotes = [novos_cpfs[n + i * 100:n + (i + 1) * 100] for i in range(max(1, min(pesado, (len(novos_cpfs) - n) // 100)))]
+    cargos_criados, funcionarios_criados = {}, {}
+
+    def guardar_id(destino):
+        def coletar(i, status, corpo):
+            destino[i] = json.loads(corpo)['id']
+        return coletar
+
+    def ids(destino):
+        return [destino[k] for k in sorted(destino)]
+
+    def editar_funcionario(i):
+        chave = sorted(funcionarios_criados)[i % len(funcionarios_criados)]
+        corpo = dict(novos[chave], telefone=f'(11) 9{i % 10000:04d}-0000')
+        return 'PUT', f'/api/funcionarios/{funcionarios_criados[chave]}', corpo, None
+
+    def corpo_bulk(i):
+        linhas = dados.gerar_funcionarios(len(lotes[i]), cargo_ids, seed + 100 + i, lotes[i])
+        return '\n'.join(json.dumps(l) for l in linhas).encode()
+
+    cenarios += [
+        Cenario('POST /api/cargos', lambda i: ('POST', '/api/cargos', {
+            'nome': f'Cargo carga {i}', 'salario': round(rnd.uniform(1500, 9000), 2), 'descricao': 'bench'}, None),
+            n, esperados=(201,), coletar=guardar_id(cargos_criados), aquecer=False),
+        Cenario('PUT /api/cargos/<id>', lambda i: ('PUT', f'/api/cargos/{ids(cargos_criados)[i % len(cargos_criados)]}', {
+            'nome': f'Cargo carga {i} (editado)', 'salario': 5000, 'descricao': 'bench'}, None), n),
+        Cenario('POST /api/funcionarios', lambda i: ('POST', '/api/funcionarios', novos[i], None),
+                n, esperados=(201,), coletar=guardar_id(funcionarios_criados), aquecer=False),
+        # o PUT substitui o registro inteiro: reenvia o funcionário criado com outro telefone
+        Cenario('PUT /api/funcionarios/<id>', lambda i: editar_funcionario(i), n),
+        Cenario('POST /api/funcionarios/bulk (100)', lambda i: (
+            'POST', '/api/funcionarios/bulk', corpo_bulk(i), {'Content-Type': 'application/x-ndjson'}),
+            len(lotes), aquecer=False),
+        Cenario('DELETE /api/funcionarios/<id>',
+                lambda i: ('DELETE', f'/api/funcionarios/{ids(funcionarios_criados)[i]}', None, None),
+                n, aquecer=False),
+        Cenario('DELETE /api/cargos/<id>',
+                lambda i: ('DELETE', f'/api/cargos/{ids(cargos_criados)[i]}', None, None),
+                n, aquecer=False),
+    ]
+    return cenarios
+
+
+def semear_via_api(cliente, cargos, funcionarios, seed):
+    """Massa enviada por POST /api/cargos e /api/funcionarios/bulk (servidor remoto)."""
+    cargo_ids = []
+    for cargo in dados.gerar_cargos(cargos, seed):
+        status, corpo = cliente.enviar('POST', '/api/cargos', cargo)
+        if status != 201:
+            raise RuntimeError(f"Falha ao criar cargo ({status}): {corpo[:200]!r}")
+        cargo_ids.append(json.loads(corpo)['id'])
+    cpfs = dados.cpfs_unicos(funcionarios, seed)
+    linhas = dados.gerar_funcionarios(funcionarios, cargo_ids, seed, cpfs)
+    for inicio in range(0, len(linhas), 5000):
+        corpo = '\n'.join(json.dumps(l) for l in linhas[inicio:inicio + 5000]).encode()
+        status, resposta = cliente.enviar('POST', '/api/funcionarios/bulk', corpo,
+                                          {'Content-Type': 'application/x-ndjson'})
+        if status != 200:
+            raise RuntimeError(f"Falha na importação ({status}): {resposta[:200]!r}")
+    return cargo_ids, set(cpfs)
+
+
+def subir_servidor_local(database_url):
+    """Importa o app com DATABASE_URL apontado para o banco de teste e o serve numa thread."""
+    os.environ['DATABASE_URL'] = database_url
+    from werkzeug.serving import make_server
+    import app as aplicacao
+
+    # o log de acesso do werkzeug (uma linha por requisição) distorceria a medição
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    servidor = make_server('127.0.0.1', 0, aplicacao.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, aplicacao.DB, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='servidor já no ar (ex.: http://localhost:5000); sem isso sobe um local')
+    parser.add_argument('--database-url', help='banco do servidor local (padrão: SQLite temporário)')
+    parser.add_argument('--cargos', type=int, default=20)
+    parser.add_argument('--funcionarios', type=int, default=10_000)
+    parser.add_argument('--sem-semente', action='store_true', help='não insere a massa (banco já populado)')
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--requisicoes', type=int, default=500, help='requisições por rota')
+    parser.add_argument('--aquecimento', type=int, default=20, help='requisições descartadas por rota de leitura')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rotas', help='mede só as rotas cujo nome contém este trecho')
+    resultados.adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    servidor, temporario = None, None
+    if args.url:
+        url = args.url.rstrip('/')
+        motor = 'remoto'
+    else:
+        database_url = args.database_url
+        if not database_url:
+            temporario = tempfile.mkdtemp(prefix='bench_')
+            database_url = f"sqlite:///{os.path.join(temporario, 'bench.db')}"
+        servidor, db, url = subir_servidor_local(database_url)
+        motor = db.kind
+    cliente = ClienteHTTP(url)
+
+    inicio = time.perf_counter()
+    if args.sem_semente:
+        _, corpo = cliente.enviar('GET', '/api/cargos')
+        cargo_ids, cpfs_usados = [c['id'] for c in json.loads(corpo)], set()
+    elif servidor:
+        cargo_ids, cpfs_usados = dados.semear(db, args.cargos, args.funcionarios, args.seed)
+    else:
+        cargo_ids, cpfs_usados = semear_via_api(cliente, args.cargos, args.funcionarios, args.seed)
+    print(f"Massa pronta em {time.perf_counter() - inicio:.1f}s: {len(cargo_ids)} cargos, "
+          f"{args.funcionarios if not args.sem_semente else '?'} funcionários ({url}, {motor})")
+
+    medidos = {}
+    for cenario in montar_cenarios(cliente, cargo_ids, cpfs_usados, args.requisicoes, args.seed):
+        if args.rotas and args.rotas not in cenario.nome:
+            continue
+        medidos[cenario.nome] = executar(cliente, cenario, args.concorrencia, args.aquecimento)
+        print(f"  {cenario.nome}: {medidos[cenario.nome]['vazao']} req/s")
+
+    meta = resultados.metadados(
+        tipo='carga', url=url, motor=motor, concorrencia=args.concorrencia, requisicoes=args.requisicoes,
+        cargos=args.cargos, funcionarios=args.funcionarios, seed=args.seed,
+    )
+    codigo = resultados.finalizar(args, meta, medidos)
+    if servidor:
+        servidor.shutdown()
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
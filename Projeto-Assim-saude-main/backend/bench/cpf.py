@@ -0,0 +1,69 @@
+"""
+Micro-benchmark da validação de CPF.
+
+Compara o validador antigo (loop por caractere, como era em Database.validar_cpf)
+com o caminho escalar e o lote vetorizado de services.cpf:
+
+    python -m bench.cpf --quantidade 1000000
+"""
+import argparse
+import time
+
+from services.cpf import carregar_numpy, gerar_cpfs, validar_cpf, validar_cpfs
+
+
+def validar_cpf_legado(cpf):
+    # implementação anterior, mantida aqui só como referência de desempenho
+    if not cpf:
+        return False
+    cpf = ''.join(filter(str.isdigit, str(cpf)))
+    if len(cpf) != 11 or cpf == cpf[0] * 11:
+        return False
+
+    def calc_digito(cpf, peso):
+        soma = 0
+        for i in range(peso - 1):
+            soma += int(cpf[i]) * (peso - i)
+        resto = (soma * 10) % 11
+        return resto if resto < 10 else 0
+
+    return calc_digito(cpf, 10) == int(cpf[9]) and calc_digito(cpf, 11) == int(cpf[10])
+
+
+def montar_amostra(quantidade, seed=42):
+    """Metade válidos formatados (000.000.000-00), metade com o último dígito alterado."""
+    amostra = []
+    for i, cpf in enumerate(gerar_cpfs(quantidade, seed=seed)):
+        if i % 2:
+            cpf = cpf[:10] + str((int(cpf[10]) + 1) % 10)
+        amostra.append(f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}")
+    return amostra
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quantidade', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    amostra = montar_amostra(args.quantidade)
+    print(f"{len(amostra)} CPFs (NumPy {'disponível' if carregar_numpy() is not None else 'ausente'})")
+
+    t_legado, esperado = cronometrar(lambda: [validar_cpf_legado(c) for c in amostra])
+    t_escalar, escalar = cronometrar(lambda: [validar_cpf(c) for c in amostra])
+    t_lote, (mascara, _) = cronometrar(validar_cpfs, amostra)
+
+    assert escalar == esperado, "caminho escalar divergiu do validador antigo"
+    assert list(map(bool, mascara)) == esperado, "lote divergiu do validador antigo"
+
+    for nome, tempo in (('legado (loop por dígito)', t_legado), ('escalar', t_escalar), ('lote', t_lote)):
+        print(f"{nome:<26} {tempo:8.3f}s  {len(amostra) / tempo:>12,.0f} CPFs/s  {t_legado / tempo:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
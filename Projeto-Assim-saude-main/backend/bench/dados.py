@@ -0,0 +1,117 @@
+"""
+Massa sintética para os benchmarks: cargos e funcionários com CPFs válidos e únicos.
+
+A geração é determinística pela `seed`, então duas rodadas com os mesmos parâmetros
+medem exatamente o mesmo conjunto de dados.
+"""
+import math
+import random
+
+from services.cpf import PESOS_1, PESOS_2, carregar_numpy, gerar_cpfs
+
+PRIMEIROS_NOMES = (
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+    'Karina', 'Lucas', 'Mariana', 'Nicolas', 'Olívia', 'Pedro', 'Rafaela', 'Samuel', 'Tatiane', 'Vitor',
+)
+SOBRENOMES = (
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa',
+)
+CARGOS = (
+    'Médico', 'Enfermeiro', 'Técnico de Enfermagem', 'Recepcionista', 'Farmacêutico', 'Fisioterapeuta',
+    'Nutricionista', 'Psicólogo', 'Analista Administrativo', 'Auxiliar de Limpeza',
+)
+
+
+def cpfs_unicos(quantidade, seed=42):
+    """`quantidade` CPFs válidos, distintos entre si (só dígitos)."""
+    return gerar_cpfs(quantidade, seed=seed)
+
+
+def iterar_cpfs_unicos(quantidade, seed=42, bloco=100_000):
+    """
+    Blocos de CPFs válidos e distintos entre si, sem guardar os já gerados: a i-ésima base de 9
+    dígitos é (a*i + b) mod 10^9, com `a` coprimo de 10^9 (uma permutação dos 10^9 valores
+    possíveis), e os dígitos verificadores vêm da base. Serve para dezenas de milhões de linhas.
+    """
+    rnd = random.Random(seed)
+    a = rnd.randrange(10 ** 8, 10 ** 9)
+    while math.gcd(a, 10) != 1:
+        a += 1
+    b = rnd.randrange(10 ** 9)
+    i = 0
+    while quantidade > 0:
+        # bases de dígitos todos iguais (CPF inválido) são puladas, então o bloco pode vir menor
+        cpfs = _cpfs_das_bases([(a * n + b) % 10 ** 9 for n in range(i, i + min(bloco, quantidade))])
+        i += min(bloco, quantidade)
+        cpfs = cpfs[:quantidade]
+        quantidade -= len(cpfs)
+        yield cpfs
+
+
+def _cpfs_das_bases(bases):
+    np = carregar_numpy()
+    if np is None:
+        cpfs = []
+        for base in bases:
+            digitos = [int(d) for d in f"{base:09d}"]
+            d1 = sum(p * v for p, v in zip(PESOS_1, digitos)) * 10 % 11 % 10
+            d2 = sum(p * v for p, v in zip(PESOS_2, digitos + [d1])) * 10 % 11 % 10
+            cpfs.append(f"{base:09d}{d1}{d2}")
+    else:
+        matriz = np.asarray(bases, dtype=np.int64)[:, None] // 10 ** np.arange(8, -1, -1, dtype=np.int64) % 10
+        d1 = (matriz @ np.asarray(PESOS_1, dtype=np.int64)) * 10 % 11 % 10
+        com_d1 = np.column_stack([matriz, d1])
+        d2 = (com_d1 @ np.asarray(PESOS_2, dtype=np.int64)) * 10 % 11 % 10
+        bruto = (np.column_stack([com_d1, d2]).astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+        cpfs = [bruto[i:i + 11] for i in range(0, len(bruto), 11)]
+    return [c for c in cpfs if c != c[0] * 11]
+
+
+def formatar_cpf(cpf):
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def gerar_cargos(quantidade, seed=42):
+    rnd = random.Random(seed)
+    return [
+        {
+            'nome': f"{CARGOS[i % len(CARGOS)]} {i // len(CARGOS) + 1}",
+            'salario': round(rnd.uniform(1500, 25000), 2),
+            'descricao': 'Cargo gerado para benchmark',
+        }
+        for i in range(quantidade)
+    ]
+
+
+def gerar_funcionarios(quantidade, cargo_ids, seed=42, cpfs=None):
+    """Dicts no formato aceito por POST /api/funcionarios e pela importação em massa."""
+    rnd = random.Random(seed)
+    cpfs = cpfs if cpfs is not None else cpfs_unicos(quantidade, seed)
+    funcionarios = []
+    for i, cpf in enumerate(cpfs[:quantidade]):
+        nome = f"{rnd.choice(PRIMEIROS_NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+        funcionarios.append({
+            'nome': nome,
+            'data_nascimento': f"{rnd.randint(1955, 2005)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            'endereco': f"Rua {rnd.choice(SOBRENOMES)}, {rnd.randint(1, 2000)}",
+            'cpf': formatar_cpf(cpf),
+            'email': f"func{i}@exemplo.com.br",
+            'telefone': f"(11) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}",
+            'cargo_id': rnd.choice(cargo_ids),
+        })
+    return funcionarios
+
+
+def semear(db, cargos=20, funcionarios=10_000, seed=42):
+    """
+    Popula o banco do `db` (services.db.Database) pela própria API de escrita.
+    Retorna (ids dos cargos criados, CPFs usados), para que a carga gere CPFs novos sem colisão.
+    """
+    cargo_ids = [db.inserir_cargo(c['nome'], c['salario'], c['descricao']) for c in gerar_cargos(cargos, seed)]
+    cpfs = cpfs_unicos(funcionarios, seed)
+    registros = list(enumerate(gerar_funcionarios(funcionarios, cargo_ids, seed, cpfs), start=1))
+    relatorio = db.importar_funcionarios(registros, tamanho_lote=1000)
+    if relatorio['erros']:
+        raise RuntimeError(f"Falha ao semear funcionários: {relatorio['erros'][:3]}")
+    return cargo_ids, set(cpfs)
@@ -0,0 +1,126 @@
+"""
+Gera a massa sintética em CSV para a carga em massa (services.carga_massa), em blocos e sem
+segurar o arquivo na memória: dezenas de milhões de funcionários com CPFs válidos e únicos.
+
+    python -m bench.massa --funcionarios 10000000 --cargos 50 --distribuicao zipf --pasta /tmp/massa
+    python -m services.carga_massa --cargos /tmp/massa/cargos.csv \\
+        --funcionarios /tmp/massa/funcionarios.csv --adiar-indices --adiar-fk
+
+`cargos.csv` sai com ids explícitos (a partir de --primeiro-cargo-id), para o arquivo de
+funcionários já apontar para eles; num banco que já tem cargos, use --cargo-ids com os ids
+existentes e só o `funcionarios.csv` é gerado. Distribuição dos funcionários entre os cargos:
+`uniforme`, `zipf` (o 1º cargo tem o dobro do 2º, o triplo do 3º...) ou pesos explícitos
+(`--distribuicao 60,30,10`, um por cargo).
+
+Os CPFs de uma `--seed` não se repetem entre si; gerações com seeds diferentes podem colidir.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+
+from bench import dados
+
+CABECALHO_CARGOS = ('id', 'nome', 'salario', 'descricao')
+CABECALHO_FUNCIONARIOS = ('nome', 'data_nascimento', 'endereco', 'cpf', 'email', 'telefone', 'cargo_id')
+
+
+def pesos_cargos(distribuicao, quantidade):
+    if distribuicao == 'uniforme':
+        return [1.0] * quantidade
+    if distribuicao == 'zipf':
+        return [1.0 / posicao for posicao in range(1, quantidade + 1)]
+    try:
+        pesos = [float(p) for p in distribuicao.split(',')]
+    except ValueError:
+        raise ValueError(f"Distribuição inválida: {distribuicao} (use uniforme, zipf ou pesos como 60,30,10)")
+    if len(pesos) != quantidade or min(pesos) < 0 or not sum(pesos):
+        raise ValueError(f"Informe {quantidade} pesos não negativos (um por cargo), recebidos {len(pesos)}")
+    return pesos
+
+
+def escrever_cargos(caminho, quantidade, primeiro_id=1, seed=42):
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        escritor = csv.writer(arquivo, lineterminator='\n')
+        escritor.writerow(CABECALHO_CARGOS)
+        for i, cargo in enumerate(dados.gerar_cargos(quantidade, seed)):
+            escritor.writerow((primeiro_id + i, cargo['nome'], f"{cargo['salario']:.2f}", cargo['descricao']))
+    return list(range(primeiro_id, primeiro_id + quantidade))
+
+
+def escrever_funcionarios(caminho, quantidade, cargo_ids, pesos, seed=42, bloco=100_000, progresso=None):
+    """Escreve `quantidade` funcionários; os atributos de cada bloco são sorteados coluna a coluna."""
+    rnd = random.Random(seed)
+    acumulados = []
+    total = 0.0
+    for peso in pesos:
+        total += peso
+        acumulados.append(total)
+    anos = range(1955, 2006)
+    escritos = 0
+    inicio = time.perf_counter()
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        escritor = csv.writer(arquivo, lineterminator='\n')
+        escritor.writerow(CABECALHO_FUNCIONARIOS)
+        for cpfs in dados.iterar_cpfs_unicos(quantidade, seed, bloco):
+            n = len(cpfs)
+            # random.choices sorteia a coluna inteira numa chamada (laço em C, não por linha)
+            colunas = zip(
+                rnd.choices(dados.PRIMEIROS_NOMES, k=n), rnd.choices(dados.SOBRENOMES, k=n),
+                rnd.choices(dados.SOBRENOMES, k=n), rnd.choices(anos, k=n), rnd.choices(range(1, 13), k=n),
+                rnd.choices(range(1, 29), k=n), rnd.choices(dados.SOBRENOMES, k=n),
+                rnd.choices(range(1, 2001), k=n), rnd.choices(range(1000, 10000), k=n),
+                rnd.choices(range(1000, 10000), k=n), rnd.choices(cargo_ids, cum_weights=acumulados, k=n),
+                cpfs, range(escritos, escritos + n),
+            )
+            escritor.writerows(
+                (f"{nome} {sobrenome1} {sobrenome2}", f"{ano}-{mes:02d}-{dia:02d}", f"Rua {rua}, {numero}",
+                 dados.formatar_cpf(cpf), f"func{i}@exemplo.com.br", f"(11) 9{tel1}-{tel2}", cargo_id)
+                for (nome, sobrenome1, sobrenome2, ano, mes, dia, rua, numero, tel1, tel2, cargo_id, cpf, i)
+                in colunas
+            )
+            escritos += n
+            if progresso:
+                progresso(escritos, time.perf_counter() - inicio)
+    return escritos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--funcionarios', type=int, default=1_000_000)
+    parser.add_argument('--cargos', type=int, default=20)
+    parser.add_argument('--cargo-ids', help='ids de cargos já existentes, separados por vírgula (não gera cargos.csv)')
+    parser.add_argument('--primeiro-cargo-id', type=int, default=1)
+    parser.add_argument('--distribuicao', default='uniforme', help='uniforme, zipf ou pesos (60,30,10)')
+    parser.add_argument('--pasta', default='.')
+    parser.add_argument('--bloco', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.pasta, exist_ok=True)
+    if args.cargo_ids:
+        cargo_ids = [int(c) for c in args.cargo_ids.split(',')]
+    else:
+        cargo_ids = escrever_cargos(os.path.join(args.pasta, 'cargos.csv'), args.cargos,
+                                    args.primeiro_cargo_id, args.seed)
+        print(f"✅ {len(cargo_ids)} cargos em {os.path.join(args.pasta, 'cargos.csv')}")
+    try:
+        pesos = pesos_cargos(args.distribuicao, len(cargo_ids))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    def progresso(linhas, segundos):
+        print(f"[Massa] {linhas:,}/{args.funcionarios:,} funcionários em {segundos:.1f}s")
+
+    caminho = os.path.join(args.pasta, 'funcionarios.csv')
+    inicio = time.perf_counter()
+    escritos = escrever_funcionarios(caminho, args.funcionarios, cargo_ids, pesos, args.seed, args.bloco, progresso)
+    print(f"✅ {escritos:,} funcionários em {caminho} ({time.perf_counter() - inicio:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
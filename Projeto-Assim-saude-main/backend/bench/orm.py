@@ -0,0 +1,69 @@
+"""
+Micro-benchmark do caminho ORM (services/orm.py) contra o carregamento preguiçoso do cargo.
+
+Semeia um SQLite temporário e lista todos os funcionários de três jeitos (mais o SQL direto
+do Database, como referência), contando as consultas enviadas pelo ORM:
+
+    python -m bench.orm --funcionarios 10000
+"""
+import argparse
+import os
+import tempfile
+
+from bench import dados
+from bench.serializacao import cronometrar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cargos', type=int, default=20)
+    parser.add_argument('--funcionarios', type=int, default=10_000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_'), 'bench.db')}"
+    from flask import Flask
+    from sqlalchemy import event, select
+    from sqlalchemy.orm import lazyload
+    from services import orm
+    from services.db import Database, db
+    from models.funcionario import Funcionario
+
+    banco = Database(aquecer=False)
+    dados.semear(banco, args.cargos, args.funcionarios)
+    app = Flask('bench_orm')
+    orm.configurar(app, banco)
+
+    with app.app_context():
+        consultas = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: consultas.append(1))
+
+        def preguicoso():
+            # o padrão antigo do modelo (lazy=True): uma consulta de cargo por funcionário não visto
+            db.session.expunge_all()
+            objetos = db.session.scalars(select(Funcionario).options(lazyload(Funcionario.cargo))).all()
+            return [f.to_dict() for f in objetos]
+
+        def ansioso():
+            db.session.expunge_all()
+            return [f.to_dict() for f in orm.funcionarios_com_cargo()]
+
+        casos = [
+            ('lazy (N+1)', preguicoso),
+            ('selectinload + load_only', ansioso),
+            ('tuplas (para_dicts)', lambda: orm.buscar_funcionarios()),
+        ]
+        print(f"{args.funcionarios} funcionários, {args.cargos} cargos (SQLite)")
+        print(f"{'caso':<26} {'tempo':>9} {'consultas':>10} {'linhas':>8}")
+        for nome, funcao in casos:
+            del consultas[:]
+            funcao()  # uma chamada só para contar as consultas (a sessão começa vazia)
+            quantidade = len(consultas)
+            tempo, linhas = cronometrar(funcao, args.repeticoes)
+            print(f"{nome:<26} {tempo * 1000:7.1f}ms {quantidade:>10} {len(linhas):>8}")
+        tempo, linhas = cronometrar(banco.buscar_funcionarios, args.repeticoes)
+        print(f"{'Database (SQL direto)':<26} {tempo * 1000:7.1f}ms {'1':>10} {len(linhas):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+"""
+Regressão de planos de execução das consultas do services.db.Database.
+
+Semeia a massa sintética (SQLite temporário ou o banco de DATABASE_URL, com --usar-database-url),
+executa cada operação do Database uma vez capturando os comandos SQL emitidos e roda EXPLAIN em
+cada um: EXPLAIN QUERY PLAN no SQLite, EXPLAIN (FORMAT JSON) no PostgreSQL e EXPLAIN FORMAT=JSON
+no MySQL. De cada plano registra, por tabela lida, o tipo de acesso, o índice usado e as linhas
+estimadas:
+
+    python -m bench.planos --saida planos.json
+    python -m bench.planos --baseline planos.json      # sai com código 1 se algum plano piorou
+    python -m bench.planos --sem-varreduras            # sai com código 1 se houver varredura inesperada
+
+Regressão: uma tabela que passou a ser varrida por completo (ou uma consulta nova que já nasce
+varrendo uma tabela) ou linhas estimadas acima de (1 + tolerância) x baseline. O SQLite não estima
+linhas: lá só o tipo de acesso é comparado. Compare sempre com um baseline do mesmo motor e da
+mesma massa (--funcionarios / --seed); os baselines versionados ficam em bench/baselines/.
+
+Leitura pela ordem do rowid/índice interrompida pelo LIMIT (primeira página de uma paginação) é
+'varredura_limitada' e não conta como varredura completa.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from bench import dados, resultados
+from services import metricas
+
+# comandos que o EXPLAIN aceita nos três motores (INSERT só quando lê de outra tabela)
+_EXPLICAVEIS = re.compile(r"^\s*(?:SELECT|WITH|UPDATE|DELETE|INSERT\b.*\bSELECT\b)", re.IGNORECASE | re.DOTALL)
+_SQLITE_ACESSO = re.compile(r"^(SCAN|SEARCH) (\S+)(.*)$")
+_SQLITE_INTERMEDIARIO = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\S+)")
+_SQLITE_INDICE = re.compile(r"USING (?:COVERING )?INDEX (\S+)")
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+# estimativas pequenas oscilam entre execuções do ANALYZE: abaixo disso a variação não conta
+FOLGA_LINHAS = 20
+# operações que leem a tabela inteira por definição (listagem sem filtro nem LIMIT, contagem,
+# conferência do resumo): ficam de fora do --sem-varreduras
+VARREDURAS_ESPERADAS = frozenset({
+    'buscar_cargos_por_nome',
+    'buscar_funcionarios',
+    'contar_registros (banco)',
+    'verificar_resumo',
+})
+# varrer uma tabela com até tantas linhas estimadas (ex.: cargos num hash join do Postgres) é barato
+LINHAS_TABELA_PEQUENA = 1000
+
+
+class _CursorCapturado(metricas.CursorInstrumentado):
+    """CursorInstrumentado que também guarda o primeiro (sql, params) de cada consulta distinta."""
+
+    def __init__(self, cursor, captura):
+        super().__init__(cursor)
+        self._captura = captura
+
+    def execute(self, sql, params=None):
+        self._captura.registrar(sql, params)
+        return super().execute(sql, params)
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        if seq_params:
+            self._captura.registrar(sql, seq_params[0])
+        return super().executemany(sql, seq_params)
+
+
+class Captura:
+    def __init__(self):
+        self.operacao = None
+        self.consultas = {}  # {impressão digital: (operação, sql, params)}
+
+    def registrar(self, sql, params):
+        if isinstance(sql, str) and _EXPLICAVEIS.match(sql):
+            digital, _ = metricas.impressao_digital(sql)
+            self.consultas.setdefault(digital, (self.operacao, sql, params))
+
+
+@contextmanager
+def capturar():
+    """Troca o cursor instrumentado das conexões do Database pelo que captura as consultas."""
+    captura = Captura()
+    original, habilitadas = metricas.CursorInstrumentado, metricas.HABILITADAS
+    metricas.CursorInstrumentado = lambda cursor: _CursorCapturado(cursor, captura)
+    metricas.HABILITADAS = True
+    try:
+        yield captura
+    finally:
+        metricas.CursorInstrumentado, metricas.HABILITADAS = original, habilitadas
+
+
+def cenarios(db, cargo_ids, cpfs_usados, seed):
+    """{nome: função sem argumentos} cobrindo as leituras e escritas do Database."""
+    from services import lote
+
+    amostra = dados.gerar_funcionarios(3, cargo_ids, seed + 1, dados.cpfs_unicos(3, seed + 1))
+    nome = amostra[0]['nome'].split()[1]
+    prefixo = amostra[0]['cpf'][:7]
+    novos_cpfs = [c for c in dados.cpfs_unicos(len(cpfs_usados) + 20, seed + 9) if c not in cpfs_usados]
+    novos = dados.gerar_funcionarios(10, cargo_ids, seed + 3, novos_cpfs)
+    cursor = db.paginar_funcionarios(limite=50)['next_cursor']
+    criados, cargos_criados = [], []
+
+    def inserir_funcionario():
+        f = novos[len(criados)]
+        criados.append(db.inserir_funcionario(f['nome'], f['data_nascimento'], f['endereco'], f['cpf'],
+                                              f['email'], f['telefone'], f['cargo_id']))
+
+    def lote_funcionarios():
+        ops = [lote.Operacao(0, 'criar', None, novos[5]),
+               lote.Operacao(1, 'atualizar', criados[0], dict(novos[0], telefone='(11) 90000-0000')),
+               lote.Operacao(2, 'excluir', criados[1])]
+        db.lote_funcionarios(ops)
+
+    def lote_cargos():
+        ops = [lote.Operacao(0, 'criar', None, {'nome': 'Cargo em lote', 'salario': 1000}),
+               lote.Operacao(1, 'atualizar', cargos_criados[0], {'nome': 'Cargo alterado', 'salario': 1100})]
+        db.lote_cargos(ops)
+
+    cargo = cargo_ids[0]
+    return {
+        'buscar_cargos_por_nome': lambda: db.buscar_cargos_por_nome(),
+        'buscar_cargos_por_nome (nome)': lambda: db.buscar_cargos_por_nome('Analista'),
+        'paginar_cargos': lambda: db.paginar_cargos(limite=10),
+        'buscar_cargo': lambda: db.buscar_cargo(cargo),
+        'buscar_funcionarios': lambda: db.buscar_funcionarios(),
+        'buscar_funcionarios (nome)': lambda: db.buscar_funcionarios(nome=nome),
+        'buscar_funcionarios (cpf)': lambda: db.buscar_funcionarios(cpf=prefixo),
+        'iterar_funcionarios': lambda: list(db.iterar_funcionarios(nome=nome)),
+        'paginar_funcionarios': lambda: db.paginar_funcionarios(limite=50),
+        'paginar_funcionarios (2ª página)': lambda: db.paginar_funcionarios(limite=50, apos=cursor),
+        'paginar_funcionarios (nome)': lambda: db.paginar_funcionarios(nome=nome, limite=50),
+        'paginar_funcionarios (cpf)': lambda: db.paginar_funcionarios(cpf=prefixo, limite=50),
+        'paginar_funcionarios (arquivados)': lambda: db.paginar_funcionarios(limite=50, incluir_arquivados=True),
+        'pesquisar_funcionarios (nome)': lambda: db.pesquisar_funcionarios(nome),
+        'pesquisar_funcionarios (cpf)': lambda: db.pesquisar_funcionarios(prefixo),
+        'pesquisar_funcionarios (arquivados)': lambda: db.pesquisar_funcionarios(nome, incluir_arquivados=True),
+        'gerar_relatorio': lambda: db.gerar_relatorio(limite=50),
+        'gerar_relatorio (nome, agregados)': lambda: db.gerar_relatorio(nome=nome, limite=50, agregados=True),
+        'gerar_relatorio (cargo, agregados)': lambda: db.gerar_relatorio(cargo_id=cargo, limite=50, agregados=True),
+        'contar_registros (banco)': lambda: db._contar_no_banco(),
+        'contar_desligados': lambda: db.contar_desligados(),
+        'resumo_cargos': lambda: db.resumo_cargos(),
+        'verificar_resumo': lambda: db.verificar_resumo(),
+        'inserir_cargo': lambda: cargos_criados.append(db.inserir_cargo('Cargo novo', 1000, '')),
+        'atualizar_cargo': lambda: db.atualizar_cargo(cargos_criados[0], 'Cargo novo', 1200, ''),
+        'lote_cargos': lote_cargos,
+        'deletar_cargo': lambda: db.deletar_cargo(cargos_criados[-1]),
+        'inserir_funcionario': lambda: [inserir_funcionario() for _ in range(3)],
+        'atualizar_funcionario': lambda: db.atualizar_funcionario(criados[0], novos[0]),
+        'upsert_funcionario': lambda: db.upsert_funcionario(novos[0]['cpf'], novos[0]),
+        'importar_funcionarios': lambda: db.importar_funcionarios(list(enumerate(novos[6:8], start=1))),
+        'lote_funcionarios': lote_funcionarios,
+        'deletar_funcionario': lambda: db.deletar_funcionario(criados[2]),
+        'arquivar_funcionarios': lambda: db.arquivar_funcionarios(dias=0) if db._arquivo_ativo() else 0,
+    }
+
+
+def explicar(db, sql, params):
+    """Plano de `sql` -> [{'tabela', 'acesso', 'indice', 'linhas'}], um item por tabela lida."""
+    prefixo = {'sqlite': "EXPLAIN QUERY PLAN ", 'postgres': "EXPLAIN (FORMAT JSON) "}.get(db.kind, "EXPLAIN FORMAT=JSON ")
+    with db.conexao() as conn, conn.cursor() as cur:
+        cur.execute(prefixo + sql, params)
+        linhas = cur.fetchall()
+    if db.kind == 'sqlite':
+        return _acessos_sqlite([(linha['id'], linha['parent'], linha['detail']) for linha in linhas],
+                               limitada=bool(_LIMIT.search(sql)))
+    plano = next(iter(linhas[0].values()))
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    if db.kind == 'postgres':
+        return _acessos_postgres(plano[0]['Plan'])
+    return _acessos_mysql(plano)
+
+
+def _acessos_sqlite(linhas, limitada=False):
+    """
+    linhas: (id, pai, detalhe) do EXPLAIN QUERY PLAN. Com LIMIT, o SCAN do laço externo de cada
+    SELECT cujo ORDER BY não precisou de B-tree temporária lê a tabela já na ordem pedida (rowid ou
+    índice) e para no LIMIT: vira 'varredura_limitada', não varredura completa.
+    """
+    acessos = []
+    intermediarios = set()
+    ordenados, externos = set(), {}
+    for id_, pai, detalhe in linhas:
+        if detalhe.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in detalhe:
+            ordenados.add(pai)
+        elif _SQLITE_ACESSO.match(detalhe) or _SQLITE_INTERMEDIARIO.match(detalhe):
+            externos.setdefault(pai, id_)
+    for id_, pai, detalhe in linhas:
+        intermediario = _SQLITE_INTERMEDIARIO.match(detalhe)
+        if intermediario:
+            intermediarios.add(intermediario.group(1))
+            continue
+        encontrado = _SQLITE_ACESSO.match(detalhe)
+        if not encontrado:
+            continue
+        tipo, tabela, resto = encontrado.groups()
+        # subconsultas, UNION e linhas constantes não são tabelas
+        if tabela.startswith('(') or tabela == 'CONSTANT' or tabela in intermediarios:
+            continue
+        indice = _SQLITE_INDICE.search(resto)
+        if 'VIRTUAL TABLE' in resto:
+            acesso, nome_indice = 'virtual', resto.split('INDEX', 1)[-1].strip()
+        elif 'AUTOMATIC' in resto:
+            # índice temporário montado a cada execução lendo a tabela inteira
+            acesso, nome_indice = 'varredura', 'automático'
+        elif tipo == 'SEARCH':
+            acesso, nome_indice = ('indice', indice.group(1)) if indice else ('pk', 'PRIMARY KEY')
+        elif indice:
+            acesso, nome_indice = 'varredura_indice', indice.group(1)
+        else:
+            acesso, nome_indice = 'varredura', 'PRIMARY KEY' if 'PRIMARY KEY' in resto else None
+        if acesso in ('varredura', 'varredura_indice') and nome_indice != 'automático' \
+                and limitada and externos.get(pai) == id_ and pai not in ordenados:
+            acesso, nome_indice = 'varredura_limitada', nome_indice or 'rowid'
+        acessos.append({'tabela': tabela, 'acesso': acesso, 'indice': nome_indice, 'linhas': None})
+    return acessos
+
+
+def _acessos_postgres(no, acessos=None):
+    acessos = [] if acessos is None else acessos
+    if 'Relation Name' in no:
+        tipo = no['Node Type']
+        indice = no.get('Index Name')
+        if tipo == 'Seq Scan':
+            acesso = 'varredura'
+        elif tipo == 'Bitmap Heap Scan':
+            acesso = 'indice'
+            indice = next((f.get('Index Name') for f in no.get('Plans', []) if f.get('Index Name')), None)
+        elif 'Index Cond' in no or 'Index' not in tipo:
+            acesso = 'indice'
+        else:
+            # índice lido do começo ao fim (ex.: só pela ordem do ORDER BY ... LIMIT)
+            acesso = 'varredura_indice'
+        acessos.append({'tabela': no['Relation Name'], 'acesso': acesso, 'indice': indice,
+                        'linhas': no.get('Plan Rows')})
+    for filho in no.get('Plans', []):
+        _acessos_postgres(filho, acessos)
+    return acessos
+
+
+def _acessos_mysql(no, acessos=None):
+    acessos = [] if acessos is None else acessos
+    if isinstance(no, list):
+        for item in no:
+            _acessos_mysql(item, acessos)
+    elif isinstance(no, dict):
+        tabela = no.get('table_name')
+        if tabela and 'access_type' in no and not tabela.startswith('<'):
+            tipo = no['access_type']
+            acesso = {'ALL': 'varredura', 'index': 'varredura_indice', 'const': 'pk', 'eq_ref': 'pk'}.get(tipo, 'indice')
+            acessos.append({'tabela': tabela, 'acesso': acesso, 'indice': no.get('key'),
+                            'linhas': no.get('rows_examined_per_scan')})
+        for valor in no.values():
+            _acessos_mysql(valor, acessos)
+    return acessos
+
+
+def resumir(operacao, sql, acessos):
+    estimadas = [a['linhas'] for a in acessos if a['linhas'] is not None]
+    _, texto = metricas.impressao_digital(sql)
+    return {
+        'operacao': operacao,
+        'sql': texto[:300],
+        'acessos': acessos,
+        'varreduras': sorted({a['tabela'] for a in acessos if a['acesso'] == 'varredura'}),
+        'linhas': sum(estimadas) if estimadas else None,
+    }
+
+
+def analisar(db):
+    """Estatísticas do otimizador atualizadas depois da semeadura (planos de uma massa realista)."""
+    with db.conexao() as conn, conn.cursor() as cur:
+        if db.kind == 'mysql':
+            for tabela in db.tabelas_existentes:
+                cur.execute(f"ANALYZE TABLE {tabela}")
+                cur.fetchall()
+        else:
+            cur.execute("ANALYZE")
+
+
+def imprimir(planos):
+    print(f"{'operação':<38} {'tabela':<22} {'acesso':<19} {'índice':<36} {'linhas':>9}")
+    for plano in planos.values():
+        for acesso in plano['acessos'] or [{'tabela': '-', 'acesso': '-', 'indice': None, 'linhas': None}]:
+            marca = '⚠️ ' if acesso['acesso'] == 'varredura' else ''
+            print(f"{plano['operacao']:<38} {acesso['tabela']:<22} {marca + acesso['acesso']:<19} "
+                  f"{acesso['indice'] or '-':<36} {acesso['linhas'] if acesso['linhas'] is not None else '-':>9}")
+    varreduras = sum(1 for p in planos.values() if p['varreduras'])
+    print(f"\n{len(planos)} consultas; {varreduras} com varredura completa de alguma tabela")
+
+
+def varreduras_inesperadas(planos, esperadas=VARREDURAS_ESPERADAS, tabela_pequena=LINHAS_TABELA_PEQUENA):
+    """Varreduras completas fora das operações em `esperadas`, sem precisar de baseline."""
+    mensagens = []
+    for digital, plano in planos.items():
+        if plano['operacao'] in esperadas:
+            continue
+        tabelas = sorted({a['tabela'] for a in plano['acessos'] if a['acesso'] == 'varredura'
+                          and (a['linhas'] is None or a['linhas'] > tabela_pequena)})
+        if tabelas:
+            mensagens.append(f"{plano['operacao']} [{digital}]: varre {', '.join(tabelas)} por completo")
+    return mensagens
+
+
+def comparar(planos, baseline, tolerancia=0.2):
+    """Mensagens de regressão em relação a um baseline salvo (vazia se nenhum plano piorou)."""
+    regressoes = []
+    anteriores = baseline.get('resultados', {})
+    for digital, atual in planos.items():
+        rotulo = f"{atual['operacao']} [{digital}]"
+        antes = anteriores.get(digital)
+        if antes is None:
+            if atual['varreduras']:
+                regressoes.append(f"{rotulo}: consulta nova com varredura completa de {', '.join(atual['varreduras'])}")
+            continue
+        novas = sorted(set(atual['varreduras']) - set(antes['varreduras']))
+        if novas:
+            regressoes.append(f"{rotulo}: passou a varrer {', '.join(novas)} por completo")
+        if antes.get('linhas') is not None and atual.get('linhas') is not None \
+                and atual['linhas'] > antes['linhas'] * (1 + tolerancia) + FOLGA_LINHAS:
+            regressoes.append(f"{rotulo}: linhas estimadas {antes['linhas']} -> {atual['linhas']}")
+    return regressoes
+
+
+def coletar(cargos=20, funcionarios=20_000, seed=42, usar_database_url=False):
+    """Semeia a massa, executa os cenários e devolve (motor, {impressão digital: plano})."""
+    if not usar_database_url:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='planos_'), 'planos.db')}"
+    from services.db import Database
+
+    db = Database()
+    try:
+        inicio = time.perf_counter()
+        cargo_ids, cpfs_usados = dados.semear(db, cargos, funcionarios, seed)
+        analisar(db)
+        print(f"Massa pronta em {time.perf_counter() - inicio:.1f}s ({funcionarios} funcionários, {db.kind})")
+
+        operacoes = cenarios(db, cargo_ids, cpfs_usados, seed)
+        with capturar() as captura:
+            for nome, funcao in operacoes.items():
+                captura.operacao = nome
+                funcao()
+        planos = {digital: resumir(operacao, sql, explicar(db, sql, params))
+                  for digital, (operacao, sql, params) in captura.consultas.items()}
+    finally:
+        db.pool.fechar()
+    return db.kind, planos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cargos', type=int, default=20)
+    parser.add_argument('--funcionarios', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--usar-database-url', action='store_true',
+                        help='analisa o banco de DATABASE_URL em vez de um SQLite temporário')
+    parser.add_argument('--sem-varreduras', action='store_true',
+                        help='sai com código 1 se alguma consulta fora de VARREDURAS_ESPERADAS varrer uma tabela '
+                             'por completo (não precisa de baseline)')
+    resultados.adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    motor, planos = coletar(args.cargos, args.funcionarios, args.seed, args.usar_database_url)
+    imprimir(planos)
+
+    meta = resultados.metadados(tipo='planos', motor=motor, cargos=args.cargos,
+                                funcionarios=args.funcionarios, seed=args.seed)
+    if args.saida:
+        resultados.salvar(args.saida, meta, planos)
+    codigo = 0
+    if args.sem_varreduras:
+        inesperadas = varreduras_inesperadas(planos)
+        if inesperadas:
+            print(f"\n❌ {len(inesperadas)} consulta(s) com varredura completa inesperada:")
+            for msg in inesperadas:
+                print(f"  - {msg}")
+            codigo = 1
+        else:
+            print("\n✅ Nenhuma varredura completa fora das esperadas")
+    if not args.baseline:
+        return codigo
+    baseline = resultados.carregar(args.baseline)
+    if baseline.get('meta', {}).get('motor') != motor:
+        print(f"\n❌ {args.baseline} foi gerado em outro motor ({baseline.get('meta', {}).get('motor')})")
+        return 1
+    regressoes = comparar(planos, baseline, args.tolerancia)
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} plano(s) pior(es) que em {args.baseline}:")
+        for msg in regressoes:
+            print(f"  - {msg}")
+        return 1
+    print(f"\n✅ Nenhum plano piorou em relação a {args.baseline}")
+    return codigo
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Estatísticas, gravação e comparação de resultados de benchmark.
+
+Todos os benchmarks do pacote produzem o mesmo formato JSON:
+
+    {"meta": {...}, "resultados": {"<nome>": {"n", "erros", "vazao", "p50", "p95", "p99", ...}}}
+
+com latências em milissegundos e vazão em operações por segundo. Um arquivo salvo
+com --saida pode ser usado depois como --baseline para acusar regressões.
+"""
+import json
+import math
+import platform
+import sys
+import time
+
+# Operações abaixo disso (ex.: acerto de cache) são ruído de relógio: ganham folga absoluta no p95
+# e não têm a vazão comparada
+FOLGA_MS = 0.05
+
+
+def percentil(ordenados, p):
+    """Percentil por posição mais próxima sobre uma lista já ordenada."""
+    if not ordenados:
+        return None
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def resumir(latencias, duracao, erros=0):
+    """latencias em segundos; duracao é o tempo de parede total da rodada."""
+    ordenados = sorted(latencias)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        'n': len(ordenados),
+        'erros': erros,
+        'duracao_s': round(duracao, 3),
+        'vazao': round(len(ordenados) / duracao, 1) if duracao > 0 else None,
+        'media': ms(sum(ordenados) / len(ordenados)) if ordenados else None,
+        'p50': ms(percentil(ordenados, 50)),
+        'p95': ms(percentil(ordenados, 95)),
+        'p99': ms(percentil(ordenados, 99)),
+        'max': ms(ordenados[-1]) if ordenados else None,
+    }
+
+
+def metadados(**extras):
+    return {
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        **extras,
+    }
+
+
+def imprimir(resultados):
+    print(f"{'operação':<34} {'n':>7} {'erros':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for nome, r in resultados.items():
+        print(f"{nome:<34} {r['n']:>7} {r['erros']:>6} {r['vazao'] or 0:>10,.1f} "
+              f"{r['p50'] or 0:>9.2f} {r['p95'] or 0:>9.2f} {r['p99'] or 0:>9.2f}")
+
+
+def salvar(caminho, meta, resultados):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'resultados': resultados}, f, ensure_ascii=False, indent=2)
+    print(f"Resultados salvos em {caminho}")
+
+
+def carregar(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def comparar(resultados, baseline, tolerancia=0.2):
+    """
+    Compara com um baseline salvo. Regressão = p95 acima de (1 + tolerancia) x baseline + FOLGA_MS,
+    vazão abaixo de (1 - tolerancia) x baseline ou erros onde antes não havia.
+    Retorna a lista de mensagens de regressão (vazia se está tudo dentro da tolerância).
+    """
+    regressoes = []
+    anteriores = baseline.get('resultados', {})
+    for nome, atual in resultados.items():
+        antes = anteriores.get(nome)
+        if not antes:
+            continue
+        if antes.get('p95') and atual.get('p95') and atual['p95'] > antes['p95'] * (1 + tolerancia) + FOLGA_MS:
+            regressoes.append(f"{nome}: p95 {antes['p95']:.2f} -> {atual['p95']:.2f} ms")
+        mensuravel = (antes.get('p50') or 0) >= FOLGA_MS
+        if mensuravel and antes.get('vazao') and atual.get('vazao') and atual['vazao'] < antes['vazao'] * (1 - tolerancia):
+            regressoes.append(f"{nome}: vazão {antes['vazao']:.1f} -> {atual['vazao']:.1f} ops/s")
+        if atual.get('erros') and not antes.get('erros'):
+            regressoes.append(f"{nome}: {atual['erros']} erro(s), baseline sem erros")
+    return regressoes
+
+
+def finalizar(args, meta, resultados):
+    """Imprime, salva (--saida) e compara com o baseline (--baseline). Retorna o código de saída."""
+    imprimir(resultados)
+    if args.saida:
+        salvar(args.saida, meta, resultados)
+    if not args.baseline:
+        return 0
+    regressoes = comparar(resultados, carregar(args.baseline), args.tolerancia)
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} regressão(ões) em relação a {args.baseline}:")
+        for msg in regressoes:
+            print(f"  - {msg}")
+        return 1
+    print(f"\n✅ Dentro da tolerância de {args.tolerancia:.0%} em relação a {args.baseline}")
+    return 0
+
+
+def adicionar_argumentos(parser):
+    parser.add_argument('--saida', help='arquivo JSON onde salvar os resultados')
+    parser.add_argument('--baseline', help='JSON de uma rodada anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='piora relativa aceita antes de acusar regressão (padrão: 0.2)')
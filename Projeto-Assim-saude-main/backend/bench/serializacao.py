@@ -0,0 +1,83 @@
+"""
+Micro-benchmark da serialização de listagens.
+
+Compara o jsonify padrão do Flask com services.serializacao (orjson, formato colunar e gzip)
+sobre linhas iguais às do DictCursor no MySQL (salário Decimal, datas date/datetime):
+
+    python -m bench.serializacao --linhas 20000
+"""
+import argparse
+import datetime
+import decimal
+import gzip
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from bench import dados
+from services import serializacao
+
+
+def linhas_mysql(quantidade, seed=42):
+    """Funcionários como o pymysql devolve do JOIN da listagem."""
+    criado = datetime.datetime(2024, 5, 17, 10, 30, 0)
+    linhas = []
+    for i, f in enumerate(dados.gerar_funcionarios(quantidade, list(range(1, 21)), seed), start=1):
+        linhas.append({
+            'id': i, 'nome': f['nome'],
+            'data_nascimento': datetime.date.fromisoformat(f['data_nascimento']),
+            'endereco': f['endereco'], 'cpf': f['cpf'], 'email': f['email'], 'telefone': f['telefone'],
+            'cargo_id': f['cargo_id'], 'criado_em': criado,
+            'cpf_digitos': f['cpf'].replace('.', '').replace('-', ''),
+            'cargo_nome': f"Cargo {f['cargo_id']}",
+            'cargo_salario': decimal.Decimal(f"{1500 + f['cargo_id'] * 250}.00"),
+        })
+    return linhas
+
+
+def cronometrar(funcao, repeticoes):
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=20_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    linhas = linhas_mysql(args.linhas)
+    padrao = Flask('padrao')
+    padrao.json = DefaultJSONProvider(padrao)
+    rapido = Flask('rapido')
+    rapido.json = serializacao.ProvedorJSON(rapido)
+
+    def jsonify_com(app, valor):
+        with app.app_context():
+            return app.json.response(valor).get_data()
+
+    casos = [
+        ('jsonify padrão do Flask', lambda: jsonify_com(padrao, linhas)),
+        ('ProvedorJSON', lambda: jsonify_com(rapido, linhas)),
+        ('ProvedorJSON colunar', lambda: jsonify_com(rapido, serializacao.colunar(linhas))),
+    ]
+    print(f"{args.linhas} linhas (orjson {'disponível' if serializacao.orjson is not None else 'ausente'})")
+    print(f"{'caso':<26} {'tempo':>9} {'vs padrão':>10} {'bytes':>12} {'gzip bytes':>12} {'gzip tempo':>11}")
+    base = None
+    for nome, funcao in casos:
+        tempo, corpo = cronometrar(funcao, args.repeticoes)
+        t_gzip, comprimido = cronometrar(
+            lambda: gzip.compress(corpo, compresslevel=serializacao.GZIP_NIVEL, mtime=0), args.repeticoes)
+        base = base or tempo
+        print(f"{nome:<26} {tempo * 1000:7.1f}ms {base / tempo:9.1f}x {len(corpo):>12,} {len(comprimido):>12,} "
+              f"{t_gzip * 1000:9.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Na raiz do backend: o pytest põe este diretório no sys.path, e os testes importam `services.*`
+# como o app.py faz.
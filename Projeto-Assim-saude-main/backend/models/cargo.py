@@ -4,7 +4,6 @@ models/cargo.py
 Modelo ORM SQLAlchemy para tabela 'cargos'.
 """
 
-from datetime import datetime
 from services.db import db
 
 
@@ -12,18 +11,16 @@ class Cargo(db.Model):
     __tablename__ = "cargos"
 
     id = db.Column(db.Integer, primary_key=True)
-    nome = db.Column(db.String(150), nullable=False, unique=True)
-    salario = db.Column(db.Numeric(12, 2), nullable=False)
-    ativo = db.Column(db.Boolean, nullable=False, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    nome = db.Column(db.String(255), nullable=False)
+    salario = db.Column(db.Numeric(10, 2), nullable=False)
+    descricao = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, server_default=db.func.now())
 
     def to_dict(self):
         return {
             "id": self.id,
             "nome": self.nome,
             "salario": float(self.salario),
-            "ativo": bool(self.ativo),
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "descricao": self.descricao,
+            "criado_em": self.criado_em.isoformat() if self.criado_em else None,
         }
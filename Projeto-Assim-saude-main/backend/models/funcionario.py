@@ -4,39 +4,63 @@ models/funcionario.py
 Modelo ORM SQLAlchemy para tabela 'funcionarios'.
 """
 
-from datetime import datetime
+from sqlalchemy import inspect
+
 from services.db import db
+from models.cargo import Cargo
 
 
 class Funcionario(db.Model):
     __tablename__ = "funcionarios"
 
     id = db.Column(db.Integer, primary_key=True)
-    nome = db.Column(db.String(200), nullable=False)
-    cpf = db.Column(db.String(20), nullable=False, unique=True)
+    nome = db.Column(db.String(255), nullable=False)
     data_nascimento = db.Column(db.Date, nullable=True)
     endereco = db.Column(db.Text, nullable=True)
-    email = db.Column(db.String(150), nullable=True)
-    telefone = db.Column(db.String(50), nullable=True)
-    cargo_id = db.Column(db.Integer, db.ForeignKey("cargos.id", ondelete="SET NULL"), nullable=True)
-    ativo = db.Column(db.Boolean, nullable=False, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    cpf = db.Column(db.String(14), nullable=False, unique=True)
+    email = db.Column(db.String(255), nullable=True)
+    telefone = db.Column(db.String(20), nullable=True)
+    cargo_id = db.Column(db.Integer, db.ForeignKey("cargos.id", ondelete="RESTRICT"), nullable=False)
+    criado_em = db.Column(db.DateTime, server_default=db.func.now())
+    # coluna gerada pelo banco (CPF só com dígitos): nunca escrita pelo ORM
+    cpf_digitos = db.Column(db.String(11), server_default=db.FetchedValue(), server_onupdate=db.FetchedValue())
+    # migração 004 (desligamento): adiadas, para o modelo seguir funcionando em bancos sem elas
+    ativo = db.deferred(db.Column(db.Boolean, nullable=False, server_default=db.true()))
+    desligado_em = db.deferred(db.Column(db.DateTime, nullable=True))
+
+    # cargo_id é NOT NULL: o cargo vem no mesmo SELECT (INNER JOIN), nunca numa consulta por funcionário
+    cargo = db.relationship(Cargo, lazy="joined", innerjoin=True,
+                            backref=db.backref("funcionarios", lazy="select"))
 
-    cargo = db.relationship("Cargo", backref=db.backref("funcionarios", lazy=True))
+    # colunas das listagens, na ordem das tuplas lidas por `para_dicts` (mesmo formato da API)
+    CAMPOS_LISTA = ("id", "nome", "data_nascimento", "endereco", "cpf", "email", "telefone",
+                    "cargo_id", "criado_em", "cpf_digitos", "cargo_nome", "cargo_salario")
+    # idem, com as colunas da migração 004 (mesma ordem do `f.*` do Database)
+    CAMPOS_LISTA_ATIVOS = CAMPOS_LISTA[:-2] + ("ativo", "desligado_em") + CAMPOS_LISTA[-2:]
 
     def to_dict(self):
-        return {
+        # os mesmos tipos das linhas do Database no MySQL/Postgres (date/datetime, Decimal, bool);
+        # o formato do JSON fica com services.serializacao. `ativo` só com a migração 004, quando
+        # a coluna foi carregada
+        dados = {
             "id": self.id,
             "nome": self.nome,
-            "cpf": self.cpf,
-            "data_nascimento": self.data_nascimento.isoformat() if self.data_nascimento else None,
+            "data_nascimento": self.data_nascimento,
             "endereco": self.endereco,
+            "cpf": self.cpf,
             "email": self.email,
             "telefone": self.telefone,
             "cargo_id": self.cargo_id,
-            "cargo": self.cargo.nome if self.cargo else None,
-            "ativo": bool(self.ativo),
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "criado_em": self.criado_em,
+            "cargo_nome": self.cargo.nome if self.cargo else None,
+            "cargo_salario": self.cargo.salario if self.cargo else None,
         }
+        if "ativo" not in inspect(self).unloaded:
+            dados["ativo"] = self.ativo
+        return dados
+
+    @classmethod
+    def para_dicts(cls, linhas, campos=None):
+        """to_dict em lote direto das tuplas de `campos` (padrão CAMPOS_LISTA), sem hidratar objetos do ORM."""
+        campos = campos or cls.CAMPOS_LISTA
+        return [dict(zip(campos, linha)) for linha in linhas]
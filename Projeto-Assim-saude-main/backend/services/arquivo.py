@@ -0,0 +1,136 @@
+# services/arquivo.py
+"""
+Funcionários ativos x desligados (migração 004: colunas `ativo` / `desligado_em` e tabela
+`funcionarios_arquivo`).
+
+ - DELETE de funcionário vira desligamento: `ativo = FALSE` e `desligado_em` preenchido; a linha
+   sai das listagens, buscas, contagens, relatório e resumo por cargo, mas o histórico fica.
+ - Desligados há mais de N dias são movidos para `funcionarios_arquivo` por um job em lotes
+   (abaixo), então a tabela quente cresce com o quadro ativo, não com todo mundo que já passou
+   pela empresa. O CPF arquivado fica livre para uma readmissão (novo id).
+ - `include_archived=1` nas rotas de leitura inclui os desligados e o arquivo.
+
+Sem a migração o Database segue com o comportamento anterior (DELETE remove a linha).
+
+Arquivamento (agende no cron; repetir é seguro):
+
+    python -m services.arquivo              # desligados há mais de ARQUIVO_DIAS (30) dias
+    python -m services.arquivo --dias 0     # todos os desligados
+"""
+import argparse
+import os
+import sys
+
+from services.busca import filtro_funcionarios, filtro_varredura, parece_cpf
+
+DIAS_PADRAO = int(os.getenv("ARQUIVO_DIAS", 30))
+LOTE_PADRAO = 1000
+
+# colunas copiadas para o arquivo (cpf_digitos é gerada em `funcionarios` e comum no arquivo)
+COLUNAS = ('id', 'nome', 'data_nascimento', 'endereco', 'cpf', 'email', 'telefone', 'cargo_id',
+           'criado_em', 'cpf_digitos', 'desligado_em')
+
+# mesmas colunas e ordem do `f.*` das listagens, nas duas origens
+_SELECAO_ATUAIS = """f.id, f.nome, f.data_nascimento, f.endereco, f.cpf, f.email, f.telefone, f.cargo_id,
+                     f.criado_em, f.cpf_digitos, f.ativo, f.desligado_em,
+                     c.nome AS cargo_nome, c.salario AS cargo_salario"""
+_SELECAO_ARQUIVO = """a.id, a.nome, a.data_nascimento, a.endereco, a.cpf, a.email, a.telefone, a.cargo_id,
+                      a.criado_em, a.cpf_digitos, FALSE AS ativo, a.desligado_em,
+                      c.nome AS cargo_nome, c.salario AS cargo_salario"""
+
+
+def sql_desligar(quantidade=1):
+    """Desliga os funcionários ativos de `quantidade` ids (params: os ids)."""
+    marcadores = ', '.join(['%s'] * quantidade)
+    return f"""UPDATE funcionarios SET ativo = FALSE, desligado_em = CURRENT_TIMESTAMP
+               WHERE id IN ({marcadores}) AND ativo = TRUE"""
+
+
+def sql_mover(quantidade):
+    """(INSERT no arquivo, DELETE de `funcionarios`) de `quantidade` ids; os dois recebem os ids como params."""
+    marcadores = ', '.join(['%s'] * quantidade)
+    colunas = ', '.join(COLUNAS)
+    return (f"""INSERT INTO funcionarios_arquivo ({colunas})
+                SELECT {colunas} FROM funcionarios WHERE id IN ({marcadores})""",
+            f"DELETE FROM funcionarios WHERE id IN ({marcadores})")
+
+
+def sql_desligados_do_cargo(kind):
+    """Ids dos desligados ainda em `funcionarios` com o cargo `%s`, travados para a exclusão do cargo."""
+    trava = "" if kind == 'sqlite' else " FOR UPDATE"  # no SQLite o BEGIN IMMEDIATE já trava
+    return f"SELECT id FROM funcionarios WHERE cargo_id = %s AND ativo = FALSE{trava}"
+
+
+def sql_corte(kind):
+    """Instante, no relógio do banco, de `%s` dias atrás (mesmo relógio do CURRENT_TIMESTAMP)."""
+    if kind == 'sqlite':
+        return "datetime('now', '-' || %s || ' days')"
+    if kind == 'postgres':
+        return "NOW() - %s * INTERVAL '1 day'"
+    return "NOW() - INTERVAL %s DAY"
+
+
+def consulta_com_arquivo(kind, nome='', cpf='', apos_id=None, limite=None):
+    """
+    Listagem com ativos, desligados e arquivados, em id DESC (os ids do arquivo são os originais).
+    Cada lado já sai ordenado e limitado; a união só intercala as duas páginas.
+    """
+    partes, params = [], []
+    for selecao, origem, juncao, alias, filtro in (
+        (_SELECAO_ATUAIS, "funcionarios f", "JOIN", 'f', filtro_funcionarios),
+        (_SELECAO_ARQUIVO, "funcionarios_arquivo a", "LEFT JOIN", 'a', filtro_varredura),
+    ):
+        clausulas, parte_params = filtro(kind, nome, cpf, alias=alias)
+        if apos_id is not None:
+            clausulas.append(f"{alias}.id < %s")
+            parte_params.append(apos_id)
+        sql = f"SELECT {selecao} FROM {origem} {juncao} cargos c ON {alias}.cargo_id = c.id"
+        if clausulas:
+            sql += " WHERE " + " AND ".join(clausulas)
+        sql += f" ORDER BY {alias}.id DESC"
+        if limite is not None:
+            sql += " LIMIT %s"
+            parte_params.append(limite)
+        # subconsulta: o SQLite não aceita ORDER BY/LIMIT direto num membro do UNION
+        partes.append(f"SELECT * FROM ({sql}) {alias}_pagina")
+        params.extend(parte_params)
+    sql = f"SELECT * FROM ({' UNION ALL '.join(partes)}) todos ORDER BY id DESC"
+    if limite is not None:
+        sql += " LIMIT %s"
+        params.append(limite)
+    return sql, params
+
+
+def consulta_pesquisa_arquivo(kind, termo, limite):
+    """Complemento da busca ranqueada com os arquivados (relevância 0, mais recentes primeiro)."""
+    clausulas, params = filtro_varredura(kind, cpf=termo) if parece_cpf(termo) else filtro_varredura(kind, nome=termo)
+    if not clausulas:
+        return None, None
+    return (f"""SELECT {_SELECAO_ARQUIVO}, 0 AS relevancia
+                FROM funcionarios_arquivo a
+                LEFT JOIN cargos c ON a.cargo_id = c.id
+                WHERE {' AND '.join(clausulas)}
+                ORDER BY a.id DESC
+                LIMIT %s""", params + [limite])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=DIAS_PADRAO, help='arquiva quem foi desligado há mais que isso')
+    parser.add_argument('--lote', type=int, default=LOTE_PADRAO, help='funcionários movidos por transação')
+    args = parser.parse_args(argv)
+
+    from services.db import Database
+
+    db = Database(aquecer=False)
+    try:
+        total = db.arquivar_funcionarios(args.dias, args.lote)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ {total} funcionário(s) desligado(s) há mais de {args.dias} dia(s) movido(s) para o arquivo")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# services/busca.py
+"""
+SQL de busca de funcionários por nome e CPF usando índices, por dialeto.
+
+ - nome: FULLTEXT com parser ngram no MySQL, índice GIN pg_trgm no Postgres
+   (ver database/migracoes/001_busca_funcionarios_*.sql) e FTS5 trigram no SQLite
+ - CPF: coluna gerada `cpf_digitos` (só dígitos) com busca por prefixo em índice B-tree
+"""
+import re
+
+# No MySQL o parser ngram usa ngram_token_size=2 por padrão: termos menores não geram tokens
+TAMANHO_MINIMO_NGRAM = 2
+# O tokenizer trigram do FTS5 (SQLite) precisa de ao menos 3 caracteres
+TAMANHO_MINIMO_TRIGRAM = 3
+
+_NAO_DIGITO = re.compile(r'\D')
+_FORMATO_CPF = re.compile(r'[\d.\-\s]*\d[\d.\-\s]*')
+_RESERVADOS_BOOLEAN = re.compile(r'["+\-<>()~*@]')
+
+
+def somente_digitos(valor) -> str:
+    return _NAO_DIGITO.sub('', str(valor or ''))
+
+
+def escapar_like(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _frase_fulltext(nome: str) -> str:
+    # frase entre aspas no BOOLEAN MODE: com ngram, casa os n-gramas em sequência (substring)
+    return '"' + ' '.join(_RESERVADOS_BOOLEAN.sub(' ', nome).split()) + '"'
+
+
+def _frase_fts5(nome: str) -> str:
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def parece_cpf(termo) -> bool:
+    """Termo da caixa de pesquisa que é (início de) um CPF, com ou sem pontuação."""
+    return bool(_FORMATO_CPF.fullmatch((termo or '').strip()))
+
+
+def filtro_funcionarios(kind, nome='', cpf='', alias='f', somente_ativos=False):
+    """
+    Retorna (lista de condições SQL, parâmetros) para filtrar por nome e prefixo de CPF.
+    `somente_ativos` deixa de fora os desligados (bancos com a migração 004, ver services.arquivo).
+    """
+    # `= TRUE` explícito: é o predicado dos índices parciais e, no MySQL, limita a faixa do índice
+    clausulas, params = ([f"{alias}.ativo = TRUE"] if somente_ativos else []), []
+    nome = (nome or '').strip()
+    digitos = somente_digitos(cpf)
+
+    if nome:
+        if kind == 'postgres':
+            # ILIKE '%x%' é atendido pelo índice GIN gin_trgm_ops
+            clausulas.append(f"{alias}.nome ILIKE %s")
+            params.append(f"%{escapar_like(nome)}%")
+        elif kind == 'sqlite':
+            if len(nome) >= TAMANHO_MINIMO_TRIGRAM:
+                clausulas.append(f"{alias}.id IN (SELECT rowid FROM funcionarios_fts WHERE funcionarios_fts MATCH %s)")
+                params.append(_frase_fts5(nome))
+            else:
+                # curto demais para o trigram: trecho por LIKE (varredura), mesmo resultado do '%x%'
+                # original; o SQLite não tem caractere de escape padrão no LIKE
+                clausulas.append(f"{alias}.nome LIKE %s ESCAPE '\\'")
+                params.append(f"%{escapar_like(nome)}%")
+        elif len(nome) >= TAMANHO_MINIMO_NGRAM:
+            clausulas.append(f"MATCH({alias}.nome) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(_frase_fulltext(nome))
+        else:
+            # uma letra só não gera n-grama: trecho por LIKE (varredura), como o '%x%' original
+            clausulas.append(f"{alias}.nome LIKE %s")
+            params.append(f"%{escapar_like(nome)}%")
+
+    if digitos:
+        if kind == 'sqlite':
+            # LIKE no SQLite ignora maiúsculas e não usa o índice BINARY; GLOB usa
+            clausulas.append(f"{alias}.cpf_digitos GLOB %s")
+            params.append(f"{digitos}*")
+        else:
+            clausulas.append(f"{alias}.cpf_digitos LIKE %s")
+            params.append(f"{digitos}%")
+
+    return clausulas, params
+
+
+def filtro_varredura(kind, nome='', cpf='', alias='a'):
+    """
+    Como filtro_funcionarios, para tabelas sem índice de texto (funcionarios_arquivo): trecho do
+    nome por LIKE e prefixo de CPF. Lê a tabela inteira; serve para consultas eventuais.
+    """
+    clausulas, params = [], []
+    nome = (nome or '').strip()
+    digitos = somente_digitos(cpf)
+    if nome:
+        if kind == 'postgres':
+            clausulas.append(f"{alias}.nome ILIKE %s")
+        elif kind == 'sqlite':
+            clausulas.append(f"{alias}.nome LIKE %s ESCAPE '\\'")
+        else:
+            clausulas.append(f"{alias}.nome LIKE %s")
+        params.append(f"%{escapar_like(nome)}%")
+    if digitos:
+        clausulas.append(f"{alias}.cpf_digitos LIKE %s")
+        params.append(f"{digitos}%")
+    return clausulas, params
+
+
+def consulta_ranqueada(kind, termo, limite, somente_ativos=False):
+    """
+    Busca única para a caixa de pesquisa: termo só com dígitos procura por prefixo de CPF,
+    qualquer outro termo procura no nome. Resultados ordenados por relevância (`relevancia`).
+    """
+    termo = (termo or '').strip()
+    base = """SELECT f.*, c.nome AS cargo_nome, c.salario AS cargo_salario, {relevancia} AS relevancia
+              FROM funcionarios f
+              JOIN cargos c ON f.cargo_id = c.id
+              WHERE {filtro}
+              ORDER BY relevancia DESC, f.id DESC
+              LIMIT %s"""
+
+    if parece_cpf(termo):
+        clausulas, params = filtro_funcionarios(kind, cpf=termo, somente_ativos=somente_ativos)
+        # todos casam o mesmo prefixo: a ordem fica por id (mais novos primeiro)
+        return base.format(relevancia="1", filtro=' AND '.join(clausulas)), params + [limite]
+
+    clausulas, params = filtro_funcionarios(kind, nome=termo)
+    if not clausulas:
+        return None, None
+    if somente_ativos:
+        # depois do teste acima: sem termo de nome não há busca, mesmo com o filtro de ativos
+        clausulas.insert(0, "f.ativo = TRUE")
+    if kind == 'postgres':
+        relevancia, rel_params = "word_similarity(%s, f.nome)", [termo]
+    elif kind == 'sqlite':
+        if len(termo) >= TAMANHO_MINIMO_TRIGRAM:
+            # o FTS5 entra no FROM: o bm25 (`rank`) sai da mesma varredura do MATCH, em vez de
+            # uma subconsulta correlacionada que repetiria o MATCH para cada linha
+            sql = base.replace("FROM funcionarios f", "FROM funcionarios_fts JOIN funcionarios f ON f.id = funcionarios_fts.rowid")
+            filtro = "funcionarios_fts MATCH %s" + (" AND f.ativo = TRUE" if somente_ativos else "")
+            sql = sql.format(relevancia="-funcionarios_fts.rank", filtro=filtro)
+            return sql, [_frase_fts5(termo), limite]
+        relevancia, rel_params = "1", []
+    elif len(termo) >= TAMANHO_MINIMO_NGRAM:
+        relevancia, rel_params = "MATCH(f.nome) AGAINST (%s IN NATURAL LANGUAGE MODE)", [termo]
+    else:
+        relevancia, rel_params = "1", []
+    return base.format(relevancia=relevancia, filtro=' AND '.join(clausulas)), rel_params + params + [limite]
@@ -0,0 +1,84 @@
+# services/cache.py
+"""
+Cache LRU com expiração por tempo (TTL), thread-safe, com contadores de acerto/erro.
+
+Usado pelo Database para os cargos (tabela pequena e lida o tempo todo). As escritas
+invalidam as chaves afetadas; mudanças feitas por outros workers chegam pela versão
+da tabela (services.versoes), que limpa o cache inteiro quando muda.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    def __init__(self, maximo=256, ttl=300.0):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()  # chave -> (expira_em, valor)
+        self._geracao = 0  # muda a cada invalidação
+        self.acertos = 0
+        self.erros = 0
+        self.remocoes = 0
+
+    def obter(self, chave, carregar):
+        """Valor em cache ou, se ausente/expirado, o resultado de `carregar()` (que é guardado)."""
+        valor = self._buscar(chave)
+        if valor is not _AUSENTE:
+            return valor
+        geracao = self._geracao
+        valor = carregar()
+        # uma invalidação durante a carga pode ter tornado o valor obsoleto: não guarda
+        self.guardar(chave, valor, geracao)
+        return valor
+
+    def guardar(self, chave, valor, geracao=None):
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                return
+            self._itens[chave] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+                self.remocoes += 1
+
+    def invalidar(self, chave):
+        with self._lock:
+            self._geracao += 1
+            self._itens.pop(chave, None)
+
+    def invalidar_se(self, condicao):
+        """Remove as chaves para as quais `condicao(chave)` é verdadeira."""
+        with self._lock:
+            self._geracao += 1
+            for chave in [c for c in self._itens if condicao(c)]:
+                del self._itens[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._geracao += 1
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'itens': len(self._itens),
+                'acertos': self.acertos,
+                'erros': self.erros,
+                'remocoes': self.remocoes,
+            }
+
+    def _buscar(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._itens[chave]
+                self.erros += 1
+                return _AUSENTE
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
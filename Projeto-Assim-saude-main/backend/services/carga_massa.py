@@ -0,0 +1,315 @@
+# services/carga_massa.py
+"""
+Carga em massa de CSV em `cargos` / `funcionarios` pelo carregador nativo de cada motor:
+
+    MySQL    -> LOAD DATA LOCAL INFILE (o servidor precisa de local_infile=ON)
+    Postgres -> COPY ... FROM STDIN
+    SQLite   -> executemany (não há carregador nativo; roda dentro do processo)
+
+É o caminho para milhões de linhas (semear ambientes de benchmark, migrar a base de um cliente),
+onde o POST /api/funcionarios/bulk não escala. O arquivo é lido em blocos de `bloco` linhas, cada
+um confirmado na sua transação, com o progresso impresso a cada bloco. O conteúdo entra como
+está: CPF e cargo não são validados linha a linha (o UNIQUE do CPF continua valendo; a massa de
+`python -m bench.massa` já sai válida). Se a carga falhar no meio, os blocos já confirmados ficam.
+
+Opcionalmente:
+ - adiar_indices: remove os índices secundários da tabela (não os únicos nem os que sustentam
+   FKs) e os recria no fim, numa passada só em vez de uma atualização por linha;
+ - adiar_fk: desliga a checagem de FK durante a carga e valida tudo no fim (órfãos viram erro).
+
+No fim, `versoes_tabelas` é incrementada (caches de todos os workers), o resumo por cargo é
+recontado e as estatísticas do otimizador são atualizadas (ANALYZE).
+
+    python -m services.carga_massa --cargos cargos.csv --funcionarios funcionarios.csv
+    python -m services.carga_massa --funcionarios funcionarios.csv --adiar-indices --adiar-fk --bloco 200000
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import tempfile
+import time
+
+from services.db import Database
+
+COLUNAS = {
+    'cargos': ('id', 'nome', 'salario', 'descricao'),
+    'funcionarios': ('id',) + Database.COLUNAS_FUNCIONARIO,
+}
+OBRIGATORIAS = {
+    'cargos': ('nome', 'salario'),
+    'funcionarios': ('nome', 'cpf', 'cargo_id'),
+}
+BLOCO_PADRAO = 100_000
+
+# funcionários cujo cargo não existe (a FK que ficou desligada durante a carga)
+SQL_ORFAOS = """SELECT COUNT(*) AS total FROM funcionarios f
+                WHERE NOT EXISTS (SELECT 1 FROM cargos c WHERE c.id = f.cargo_id)"""
+
+# SHOW CREATE TABLE do MySQL: "  FULLTEXT KEY `ftx` (`nome`) /*!50100 WITH PARSER `ngram` */,"
+_INDICE_MYSQL = re.compile(r'^\s*((FULLTEXT |SPATIAL )?KEY `([^`]+)` \(`([^`]+)`.*?),?$')
+_FK_MYSQL = re.compile(r'FOREIGN KEY \(`([^`]+)`\)')
+
+
+class CargaInvalida(Exception):
+    """A carga terminou, mas deixou dados que a validação final recusa (ex.: FK órfã)."""
+
+
+def ler_blocos(caminho, tabela, bloco=BLOCO_PADRAO):
+    """
+    Lê o CSV (com cabeçalho; ',' ou ';') -> (colunas, gerador de listas de até `bloco` linhas).
+    As colunas do cabeçalho precisam ser da tabela; a ordem é livre.
+    """
+    arquivo = open(caminho, encoding='utf-8-sig', newline='')
+    primeira = arquivo.readline()
+    arquivo.seek(0)
+    delimitador = ';' if primeira.count(';') > primeira.count(',') else ','
+    leitor = csv.reader(arquivo, delimiter=delimitador)
+    colunas = tuple(c.strip() for c in next(leitor, ()))
+    desconhecidas = [c for c in colunas if c not in COLUNAS[tabela]]
+    faltando = [c for c in OBRIGATORIAS[tabela] if c not in colunas]
+    if desconhecidas or faltando or not colunas:
+        arquivo.close()
+        raise ValueError(f"{caminho}: cabeçalho inválido para {tabela} "
+                         f"(desconhecidas: {desconhecidas or '-'}, faltando: {faltando or '-'}; "
+                         f"aceitas: {', '.join(COLUNAS[tabela])})")
+
+    def gerar():
+        with arquivo:
+            linhas = []
+            for linha in leitor:
+                if not linha:
+                    continue
+                linhas.append(linha)
+                if len(linhas) >= bloco:
+                    yield linhas
+                    linhas = []
+            if linhas:
+                yield linhas
+
+    return colunas, gerar()
+
+
+def carregar(db, tabela, caminho, bloco=BLOCO_PADRAO, adiar_indices=False, adiar_fk=False, progresso=None):
+    """
+    Carrega o CSV `caminho` em `tabela` ('cargos' ou 'funcionarios').
+    `progresso(linhas_lidas, segundos)` é chamado a cada bloco confirmado.
+    Retorna {'tabela', 'lidas', 'gravadas', 'segundos'} (lidas - gravadas = puladas pelo MySQL).
+    """
+    if tabela not in COLUNAS:
+        raise ValueError(f"Tabela não suportada: {tabela}")
+    colunas, blocos = ler_blocos(caminho, tabela, bloco)
+    # local_infile: o pymysql só envia o arquivo se a conexão pedir
+    conn = db.conexao_exclusiva(**({'local_infile': True} if db.kind == 'mysql' else {}))
+    inicio = time.perf_counter()
+    lidas = gravadas = 0
+    indices = chaves = []
+    try:
+        if adiar_indices:
+            indices = _remover_indices(conn, tabela)
+        if adiar_fk:
+            chaves = _desligar_fk(conn, tabela)
+        for linhas in blocos:
+            gravadas += _carregar_bloco(conn, tabela, colunas, linhas)
+            lidas += len(linhas)
+            if progresso:
+                progresso(lidas, time.perf_counter() - inicio)
+    finally:
+        try:
+            # os índices voltam mesmo se a carga falhou no meio
+            if indices:
+                _recriar_indices(conn, tabela, indices)
+            if adiar_fk:
+                _religar_fk(conn, tabela, chaves)
+            _finalizar(conn, tabela, colunas)
+        finally:
+            conn.close()
+    return {'tabela': tabela, 'lidas': lidas, 'gravadas': gravadas,
+            'segundos': round(time.perf_counter() - inicio, 2)}
+
+
+def _carregar_bloco(conn, tabela, colunas, linhas):
+    if conn.kind == 'sqlite':
+        conn.begin()
+        try:
+            with conn.cursor() as cur:
+                conn.inserir_varios(cur, tabela, colunas, [[v or None for v in linha] for linha in linhas])
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return len(linhas)
+
+    # o carregador nativo lê de arquivo: o bloco é regravado já no formato esperado (vírgula, sem cabeçalho)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.csv', delete=False) as tmp:
+        csv.writer(tmp, lineterminator='\n').writerows(linhas)
+    try:
+        conn.begin()
+        try:
+            gravadas = conn.carregar_csv(tabela, colunas, tmp.name)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return gravadas
+    finally:
+        os.unlink(tmp.name)
+
+
+# ----------------------------
+# ÍNDICES
+# ----------------------------
+def _executar(conn, sql, params=()):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall() if cur.description else None
+
+
+def _remover_indices(conn, tabela):
+    """Remove os índices secundários não únicos de `tabela`; retorna [(nome, sql para recriar)]."""
+    if conn.kind == 'sqlite':
+        # os gatilhos que alimentam o FTS5 (busca por nome) também saem: o índice é reconstruído no fim
+        indices = [(l['type'], l['name'], l['sql']) for l in _executar(conn, """
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND tbl_name = %s AND sql IS NOT NULL""", (tabela,))
+            if not l['sql'].upper().startswith('CREATE UNIQUE')]
+        for tipo, nome, _ in indices:
+            _executar(conn, f"DROP {tipo.upper()} {nome}")
+        indices = [(nome, sql) for _, nome, sql in indices]
+    elif conn.kind == 'postgres':
+        # índices de PRIMARY KEY / UNIQUE pertencem a uma constraint e ficam
+        indices = [(l['nome'], l['sql']) for l in _executar(conn, """
+            SELECT i.indexname AS nome, i.indexdef AS sql FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = %s
+              AND i.indexdef NOT LIKE 'CREATE UNIQUE%%'
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)""", (tabela,))]
+        for nome, _ in indices:
+            _executar(conn, f"DROP INDEX {nome}")
+    else:
+        criacao = _executar(conn, f"SHOW CREATE TABLE {tabela}")[0]['Create Table']
+        colunas_fk = set(_FK_MYSQL.findall(criacao))
+        indices = []
+        for linha in criacao.splitlines():
+            encontrado = _INDICE_MYSQL.match(linha)
+            # o InnoDB exige um índice na coluna da FK: esse fica
+            if encontrado and encontrado.group(4) not in colunas_fk:
+                indices.append((encontrado.group(3), encontrado.group(1)))
+        if indices:
+            _executar(conn, f"ALTER TABLE {tabela} " + ', '.join(f"DROP INDEX `{nome}`" for nome, _ in indices))
+    if indices:
+        print(f"[Carga] {tabela}: {len(indices)} índice(s) removido(s) até o fim da carga")
+    return indices
+
+
+def _recriar_indices(conn, tabela, indices):
+    inicio = time.perf_counter()
+    if conn.kind == 'mysql':
+        # o InnoDB cria um FULLTEXT por ALTER; os demais vão juntos, numa reconstrução só
+        comuns = [sql for _, sql in indices if not sql.startswith('FULLTEXT')]
+        if comuns:
+            _executar(conn, f"ALTER TABLE {tabela} " + ', '.join(f"ADD {sql}" for sql in comuns))
+        fulltext = [sql for _, sql in indices if sql.startswith('FULLTEXT')]
+        if fulltext:
+            # como no script.sql: o ngram sem stopwords (a configuração vale no momento da criação)
+            _executar(conn, "SET SESSION innodb_ft_enable_stopword = OFF")
+        for sql in fulltext:
+            _executar(conn, f"ALTER TABLE {tabela} ADD {sql}")
+    else:
+        for _, sql in indices:
+            _executar(conn, sql)
+        if conn.kind == 'sqlite' and any(nome.startswith(f'{tabela}_fts') for nome, _ in indices):
+            _executar(conn, f"INSERT INTO {tabela}_fts({tabela}_fts) VALUES ('rebuild')")
+    print(f"[Carga] {tabela}: {len(indices)} índice(s) recriado(s) em {time.perf_counter() - inicio:.1f}s")
+
+
+# ----------------------------
+# CHAVES ESTRANGEIRAS
+# ----------------------------
+def _desligar_fk(conn, tabela):
+    """Desliga a checagem de FK da carga; no Postgres as FKs de `tabela` são removidas (retorna quais)."""
+    if conn.kind == 'sqlite':
+        _executar(conn, "PRAGMA foreign_keys = OFF")
+        return []
+    if conn.kind == 'mysql':
+        _executar(conn, "SET SESSION foreign_key_checks = 0")
+        return []
+    # sem superusuário não dá para desligar os gatilhos de FK: remove e recria no fim
+    chaves = [(l['nome'], l['definicao']) for l in _executar(conn, """
+        SELECT conname AS nome, pg_get_constraintdef(oid) AS definicao FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'""", (tabela,))]
+    for nome, _ in chaves:
+        _executar(conn, f"ALTER TABLE {tabela} DROP CONSTRAINT {nome}")
+    return chaves
+
+
+def _religar_fk(conn, tabela, chaves):
+    """Religa a checagem e valida de uma vez o que foi carregado sem ela."""
+    orfaos = _executar(conn, SQL_ORFAOS)[0]['total'] if tabela == 'funcionarios' else 0
+    if conn.kind == 'sqlite':
+        _executar(conn, "PRAGMA foreign_keys = ON")
+    elif conn.kind == 'mysql':
+        _executar(conn, "SET SESSION foreign_key_checks = 1")
+    else:
+        for nome, definicao in chaves:
+            # NOT VALID já vale para as próximas escritas; a validação das linhas existentes é à parte
+            _executar(conn, f"ALTER TABLE {tabela} ADD CONSTRAINT {nome} {definicao} NOT VALID")
+            if not orfaos:
+                _executar(conn, f"ALTER TABLE {tabela} VALIDATE CONSTRAINT {nome}")
+    if orfaos:
+        raise CargaInvalida(
+            f"{orfaos} funcionário(s) com cargo_id inexistente. Corrija ou remova com "
+            f"DELETE FROM funcionarios WHERE cargo_id NOT IN (SELECT id FROM cargos)"
+        )
+
+
+def _finalizar(conn, tabela, colunas):
+    if conn.kind == 'postgres' and 'id' in colunas:
+        # ids explícitos não avançam a sequência do SERIAL
+        _executar(conn, f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {tabela}), 1))", (tabela,))
+    _executar(conn, f"ANALYZE TABLE {tabela}" if conn.kind == 'mysql' else f"ANALYZE {tabela}")
+
+
+def _imprimir_progresso(tabela):
+    def imprimir(linhas, segundos):
+        print(f"[Carga] {tabela}: {linhas:,} linhas em {segundos:.1f}s ({linhas / max(segundos, 1e-9):,.0f}/s)")
+    return imprimir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cargos', help='CSV de cargos (carregado antes dos funcionários)')
+    parser.add_argument('--funcionarios', help='CSV de funcionários')
+    parser.add_argument('--bloco', type=int, default=BLOCO_PADRAO, help='linhas por transação')
+    parser.add_argument('--adiar-indices', action='store_true', help='remove os índices secundários e recria no fim')
+    parser.add_argument('--adiar-fk', action='store_true', help='checa as FKs só no fim da carga')
+    args = parser.parse_args(argv)
+    if not args.cargos and not args.funcionarios:
+        parser.error('informe --cargos e/ou --funcionarios')
+
+    db = Database(aquecer=False, pool_min=0, pool_max=2)
+    carregadas = []
+    try:
+        for tabela, caminho in (('cargos', args.cargos), ('funcionarios', args.funcionarios)):
+            if not caminho:
+                continue
+            carregadas.append(tabela)
+            r = carregar(db, tabela, caminho, args.bloco, args.adiar_indices, args.adiar_fk,
+                         progresso=_imprimir_progresso(tabela))
+            puladas = r['lidas'] - r['gravadas']
+            print(f"✅ {tabela}: {r['gravadas']:,} linhas gravadas em {r['segundos']}s"
+                  + (f" ({puladas:,} puladas: chave duplicada)" if puladas else ""))
+    except (CargaInvalida, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if carregadas:
+            divergencias = db.registrar_carga(carregadas)
+            if divergencias:
+                print(f"[Carga] resumo por cargo recontado ({len(divergencias)} cargo(s) atualizado(s))")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
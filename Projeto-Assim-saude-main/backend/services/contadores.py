@@ -0,0 +1,77 @@
+# services/contadores.py
+"""
+Contagens por tabela mantidas em memória para o /api/counts.
+
+As escritas feitas por este processo ajustam os valores na hora (inserir +1, deletar -1);
+o recarregamento no banco só acontece depois de `ttl` segundos, o que também absorve
+as escritas feitas por outros workers. Cada snapshot carrega um ETag derivado dos
+valores, então polls sem mudança viram 304 sem tocar no banco.
+"""
+import hashlib
+import json
+import threading
+import time
+
+
+class ContadorTabelas:
+    def __init__(self, carregar, ttl=30.0):
+        """
+        carregar -> callable sem argumentos que consulta o banco e devolve {tabela: total}
+                    (None: quem usa recarrega por fora, com `atual` + `definir`, como o AsyncDatabase)
+        ttl      -> segundos que um snapshot vale antes de ser recarregado
+        """
+        self._carregar = carregar
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._recarga = threading.Lock()
+        self._valores = None
+        self._etag = None
+        self._carregado_em = 0.0
+
+    def obter(self):
+        """Retorna (valores, etag), recarregando do banco só quando o snapshot expirou."""
+        snapshot = self.atual()
+        if snapshot:
+            return snapshot
+        # uma única thread recarrega; as demais aguardam e reaproveitam o resultado
+        with self._recarga:
+            return self.atual() or self.definir(self._carregar())
+
+    def atual(self):
+        """(valores, etag) se o snapshot ainda está dentro do TTL; senão None."""
+        with self._lock:
+            if self._valores is not None and time.monotonic() - self._carregado_em < self.ttl:
+                return dict(self._valores), self._etag
+        return None
+
+    def definir(self, valores):
+        """Guarda valores recém-lidos do banco como snapshot novo; retorna (valores, etag)."""
+        with self._lock:
+            self._definir(valores)
+            self._carregado_em = time.monotonic()
+            return dict(self._valores), self._etag
+
+    def ajustar(self, tabela, delta):
+        """Aplica uma escrita local; sem snapshot carregado não há o que ajustar."""
+        with self._lock:
+            if self._valores is None or self._valores.get(tabela) is None:
+                return
+            valores = dict(self._valores)
+            valores[tabela] = max(0, valores[tabela] + delta)
+            self._definir(valores)
+
+    def ultimo(self):
+        """Último snapshot (valores, etag) mesmo que vencido, sem consultar o banco; None se nunca carregou."""
+        with self._lock:
+            if self._valores is None:
+                return None
+            return dict(self._valores), self._etag
+
+    def invalidar(self):
+        with self._lock:
+            self._carregado_em = 0.0
+
+    def _definir(self, valores):
+        self._valores = valores
+        bruto = json.dumps(valores, sort_keys=True, separators=(',', ':')).encode()
+        self._etag = hashlib.sha1(bruto).hexdigest()[:16]
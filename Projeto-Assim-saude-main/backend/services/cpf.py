@@ -0,0 +1,162 @@
+# services/cpf.py
+"""
+Validação de CPF compartilhada pela API, pela importação em massa e por varreduras de qualidade.
+
+ - validar_cpf(cpf): caminho escalar, com tabelas de pesos pré-calculadas
+ - validar_cpfs(cpfs): lote; com NumPy os dois dígitos verificadores de todos os CPFs
+   são calculados de uma vez como operações de matriz (sem NumPy cai no caminho escalar)
+"""
+import re
+from operator import mul
+
+# Dependência opcional, importada só na primeira validação em lote: o `import numpy` custa
+# dezenas de ms e a maioria dos processos (API atendendo cadastros avulsos) nunca precisa dele
+np = None
+_numpy_verificado = False
+
+PESOS_1 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_2 = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+
+_NAO_DIGITO = re.compile(r'\D')
+# pontuação usual de CPF ("000.000.000-00"), removida sem regex
+_PONTUACAO = str.maketrans('', '', '.- /')
+# bytes ASCII '0'..'9' -> valores 0..9 numa chamada só, sem int() por caractere
+_ASCII_PARA_VALOR = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+
+def normalizar_cpf(cpf) -> str:
+    """CPF só com dígitos ('' para vazio/None)."""
+    if not cpf:
+        return ''
+    cpf = str(cpf).translate(_PONTUACAO)
+    if cpf.isascii() and cpf.isdigit():
+        return cpf
+    return _NAO_DIGITO.sub('', cpf)
+
+
+def carregar_numpy():
+    """Importa o NumPy na primeira chamada; devolve o módulo ou None se não estiver instalado."""
+    global np, _numpy_verificado
+    if not _numpy_verificado:
+        try:
+            import numpy
+            np = numpy
+        except Exception:
+            np = None
+        _numpy_verificado = True
+    return np
+
+
+def _digito_verificador(soma):
+    # equivalente a: resto = soma % 11 -> 0 se resto < 2, senão 11 - resto
+    return (soma * 10) % 11 % 10
+
+
+def validar_cpf(cpf) -> bool:
+    digitos = normalizar_cpf(cpf)
+    if len(digitos) != 11 or not digitos.isascii():
+        return False
+    valores = digitos.encode().translate(_ASCII_PARA_VALOR)
+    if valores.count(valores[0]) == 11:
+        return False
+    if _digito_verificador(sum(map(mul, PESOS_1, valores))) != valores[9]:
+        return False
+    return _digito_verificador(sum(map(mul, PESOS_2, valores))) == valores[10]
+
+
+def validar_cpfs(cpfs):
+    """
+    Valida uma sequência de CPFs de uma vez.
+    Retorna (máscara booleana, lista com os CPFs só com dígitos); a máscara é um
+    numpy.ndarray quando NumPy está instalado e uma lista de bool caso contrário.
+    """
+    if carregar_numpy() is None:
+        normalizados = [normalizar_cpf(cpf) for cpf in cpfs]
+        return [validar_cpf(d) for d in normalizados], normalizados
+
+    textos = [str(cpf) if cpf else '' for cpf in cpfs]
+    total = len(textos)
+    if not total:
+        return np.zeros(0, dtype=bool), []
+    bruto = '\n'.join(textos)
+    if bruto.count('\n') != total - 1 or not bruto.isascii():
+        # quebra de linha dentro de um valor, ou caracteres não ASCII (dígitos de outros alfabetos
+        # somem da máscara de bytes e o CPF passaria): normaliza item a item, como validar_cpf
+        return validar_cpfs_normalizados([normalizar_cpf(t) for t in textos])
+
+    # Todos os CPFs num único buffer de bytes separados por '\n': os dígitos de cada um são
+    # extraídos por máscara, sem laço em Python por caractere.
+    buffer = np.frombuffer(bruto.encode('utf-8'), dtype=np.uint8)
+    separadores = buffer == ord('\n')
+    digito = (buffer >= ord('0')) & (buffer <= ord('9'))
+    normalizados = buffer[digito | separadores].tobytes().decode('ascii').split('\n')
+    return _validar_matriz(normalizados, buffer[digito], np.cumsum(separadores)[digito], total)
+
+
+def validar_cpfs_normalizados(normalizados):
+    """Como validar_cpfs, para CPFs que já estão só com dígitos."""
+    if carregar_numpy() is None:
+        return [validar_cpf(d) for d in normalizados], list(normalizados)
+    normalizados = list(normalizados)
+    # só dígitos ASCII entram na matriz; o resto já é inválido
+    limpos = [d if d.isascii() and d.isdigit() else '' for d in normalizados]
+    bruto = ''.join(limpos).encode('ascii')
+    tamanhos = np.fromiter(map(len, limpos), dtype=np.int64, count=len(limpos))
+    ids = np.repeat(np.arange(len(normalizados)), tamanhos)
+    return _validar_matriz(normalizados, np.frombuffer(bruto, dtype=np.uint8), ids, len(normalizados))
+
+
+def _validar_matriz(normalizados, digitos, ids, total):
+    """digitos: bytes ASCII de todos os CPFs concatenados; ids: a que CPF pertence cada byte."""
+    quantidade = np.bincount(ids, minlength=total)
+    candidatos = quantidade == 11
+    mascara = np.zeros(total, dtype=bool)
+    if not candidatos.any():
+        return mascara, normalizados
+
+    matriz = (digitos[candidatos[ids]] - ord('0')).astype(np.int32).reshape(-1, 11)
+    d1 = (matriz[:, :9] @ np.asarray(PESOS_1, dtype=np.int32)) * 10 % 11 % 10
+    d2 = (matriz[:, :10] @ np.asarray(PESOS_2, dtype=np.int32)) * 10 % 11 % 10
+    repetidos = (matriz == matriz[:, :1]).all(axis=1)
+    mascara[candidatos] = (d1 == matriz[:, 9]) & (d2 == matriz[:, 10]) & ~repetidos
+    return mascara, normalizados
+
+
+def gerar_cpfs(quantidade, seed=None):
+    """
+    Gera `quantidade` CPFs válidos e distintos entre si (só dígitos), úteis para massa de teste e
+    benchmarks. Sorteia em rodadas até completar: repetidos e os de dígitos todos iguais (inválidos
+    por regra) são descartados.
+    """
+    if quantidade > 10 ** 9 - 10:
+        raise ValueError("Existem só 10^9 - 10 CPFs válidos")
+    if carregar_numpy() is None:
+        import random
+        rnd = random.Random(seed)
+
+        def sortear(n):
+            gerados = []
+            for _ in range(n):
+                base = [rnd.randrange(10) for _ in range(9)]
+                d1 = _digito_verificador(sum(p * v for p, v in zip(PESOS_1, base)))
+                d2 = _digito_verificador(sum(p * v for p, v in zip(PESOS_2, base + [d1])))
+                gerados.append(''.join(map(str, base + [d1, d2])))
+            return gerados
+    else:
+        rng = np.random.default_rng(seed)
+        pesos_1, pesos_2 = np.asarray(PESOS_1, dtype=np.int32), np.asarray(PESOS_2, dtype=np.int32)
+
+        def sortear(n):
+            base = rng.integers(0, 10, size=(n, 9), dtype=np.int32)
+            d1 = (base @ pesos_1) * 10 % 11 % 10
+            com_d1 = np.column_stack([base, d1])
+            d2 = (com_d1 @ pesos_2) * 10 % 11 % 10
+            bruto = (np.column_stack([com_d1, d2]).astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+            return [bruto[i:i + 11] for i in range(0, len(bruto), 11)]
+
+    unicos = {}
+    while len(unicos) < quantidade:
+        falta = quantidade - len(unicos)
+        # folga pequena: com 10^9 bases, repetidos só pesam perto do limite
+        unicos.update(dict.fromkeys(c for c in sortear(falta + falta // 100 + 1) if c != c[0] * 11))
+    return list(unicos)[:quantidade]
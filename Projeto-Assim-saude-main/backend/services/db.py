@@ -1,10 +1,28 @@
 # services/db.py
+import contextvars
 import os
-from sqlite3 import IntegrityError
+import random
+import sqlite3
+import threading
 import time
+import uuid
+from collections import Counter
 from urllib.parse import urlparse
 from contextlib import contextmanager
 
+from services.busca import consulta_ranqueada, filtro_funcionarios
+from services.cache import CacheLRU
+from services.contadores import ContadorTabelas
+from services.eventos import Publicador, maximo_conexoes
+from services import metricas
+from services.metricas import medido
+from services.cpf import normalizar_cpf, validar_cpf, validar_cpfs
+from services.paginacao import LIMITE_PADRAO, decodificar_cursor, montar_pagina
+from services import arquivo, lote, resumo, sqlite
+from services.pool import ConnectionPool, PoolEsgotado
+from services.replicas import ConjuntoReplicas, Replica
+from services.versoes import VersoesTabelas
+
 # Dependências opcionais
 try:
     import pymysql
@@ -19,146 +37,631 @@ try:
 except Exception:
     psycopg2 = None
 
-# Wrapper para normalizar comportamento de cursor entre MySQL e Postgres
+
+def __getattr__(nome):
+    # `from services.db import db` (models/): o Flask-SQLAlchemy só é importado por quem usa o ORM
+    if nome == 'db':
+        global db
+        from flask_sqlalchemy import SQLAlchemy
+        db = SQLAlchemy()
+        return db
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+# Exceções que indicam conexão perdida (o pool descarta a conexão em vez de reaproveitá-la)
+ERROS_CONEXAO = tuple(
+    erro
+    for driver, nomes in ((pymysql, ('OperationalError', 'InterfaceError')),
+                          (psycopg2, ('OperationalError', 'InterfaceError')))
+    if driver is not None
+    for erro in (getattr(driver, nome, None) for nome in nomes)
+    if erro is not None
+)
+
+# Violação de UNIQUE/FK em qualquer driver instalado
+ERROS_INTEGRIDADE = (sqlite3.IntegrityError,) + tuple(
+    getattr(driver, 'IntegrityError')
+    for driver in (pymysql, psycopg2)
+    if driver is not None and hasattr(driver, 'IntegrityError')
+)
+
+
+# códigos de violação de FK: MySQL (1452/1216: linha filha sem pai) e Postgres (SQLSTATE 23503)
+_ERROS_FK_MYSQL = (1216, 1452)
+_SQLSTATE_FK = '23503'
+
+
+def violacao_de_fk(erro):
+    """O erro de ERROS_INTEGRIDADE é de chave estrangeira (ex.: cargo_id inexistente)?"""
+    if isinstance(erro, sqlite3.IntegrityError):
+        return 'FOREIGN KEY' in str(erro)
+    if getattr(erro, 'pgcode', None) is not None:
+        return erro.pgcode == _SQLSTATE_FK
+    return bool(erro.args) and erro.args[0] in _ERROS_FK_MYSQL
+
+
+class _CargoAnteriorDesconhecido(Exception):
+    """Upsert que atualizou uma linha sem conseguir ler o cargo anterior (desfaz e repete)."""
+
+NOMES_MOTORES = {'mysql': 'MySQL', 'postgres': 'Postgres', 'sqlite': 'SQLite'}
+# segundos para abrir uma conexão: um banco fora do ar não prende a requisição (ou o /readyz)
+TIMEOUT_CONEXAO = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
+
+# A requisição atual já escreveu no primário? (leituras seguintes não vão para réplicas)
+_escreveu_no_primario = contextvars.ContextVar('db_escreveu_no_primario', default=False)
+# Eventos de escritas feitas dentro de `transacao()`: só são publicados depois do commit
+_eventos_pendentes = contextvars.ContextVar('db_eventos_pendentes', default=None)
+
+# Wrapper para normalizar comportamento de cursor entre MySQL, Postgres e SQLite
 class ConnWrapper:
     def __init__(self, conn, kind):
         self._conn = conn
-        self.kind = kind  # 'mysql' ou 'postgres'
+        self.kind = kind  # 'mysql', 'postgres' ou 'sqlite'
+        # marcadores usados pelo ConnectionPool
+        self.quebrada = False
+        self.pid = os.getpid()
+        self.criado_em = self.usado_em = time.monotonic()
 
     @contextmanager
-    def cursor(self, *args, **kwargs):
+    def cursor(self, *args, servidor=False, **kwargs):
         """
-        Retorna um contexto para usar: `with self.conn.cursor() as cur:`
+        Retorna um contexto para usar: `with self.conexao() as conn, conn.cursor() as cur:`
         Garante cursor dict-like em ambos os DBs.
+
+        servidor=True abre um cursor sem buffer no servidor (SSDictCursor no MySQL,
+        cursor nomeado no Postgres) para ler resultados grandes com `fetchmany`
+        sem carregar tudo na memória.
         """
-        if self.kind == 'postgres':
-            cur = self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            try:
-                yield cur
-            finally:
-                try:
-                    cur.close()
-                except Exception:
-                    pass
+        if self.kind == 'sqlite':
+            # o sqlite3 já avança o resultado sob demanda em fetchmany: não há cursor de servidor
+            cur = sqlite.CursorSQLite(self._conn.cursor())
+        elif self.kind == 'postgres':
+            if servidor:
+                # cursor nomeado só existe dentro de uma transação
+                self._conn.autocommit = False
+                cur = self._conn.cursor(name=f"stream_{uuid.uuid4().hex}",
+                                        cursor_factory=psycopg2.extras.RealDictCursor)
+            else:
+                cur = self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         else:
             # pymysql: se a conexão foi criada com cursorclass=DictCursor, o cursor padrão já é dict-like
-            cur = self._conn.cursor()
-            try:
-                yield cur
-            finally:
+            cur = self._conn.cursor(pymysql.cursors.SSDictCursor) if servidor else self._conn.cursor()
+        if metricas.HABILITADAS:
+            cur = metricas.CursorInstrumentado(cur)
+
+        try:
+            yield cur
+        except BaseException:
+            if servidor and self.kind != 'sqlite':
+                # Abandonado no meio (erro ou cliente desconectou): fechar o cursor drenaria
+                # o resto do resultado, então derrubamos a conexão e o pool abre outra.
+                self.quebrada = True
                 try:
-                    cur.close()
+                    self._conn.close()
                 except Exception:
                     pass
+            raise
+        finally:
+            try:
+                cur.close()
+            except Exception:
+                pass
+            if servidor and self.kind == 'postgres' and not self.quebrada:
+                self.commit()
+
+    def ping(self) -> bool:
+        """Confere se a conexão ainda responde (usado pelo pool antes de reaproveitar)."""
+        try:
+            if self.kind == 'sqlite':
+                self._conn.execute("SELECT 1")
+            elif self.kind == 'postgres':
+                with self._conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+            else:
+                self._conn.ping(reconnect=False)
+            return True
+        except Exception:
+            self.quebrada = True
+            return False
+
+    def em_transacao(self) -> bool:
+        try:
+            if self.kind == 'sqlite':
+                return self._conn.in_transaction
+            if self.kind == 'postgres':
+                return self._conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            return bool(self._conn.server_status & pymysql.constants.SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+        except Exception:
+            return False
+
+    def begin(self):
+        """Abre uma transação explícita (as conexões ficam em autocommit fora dela)."""
+        if self.kind == 'sqlite':
+            # IMMEDIATE: pega o lock de escrita já no início, evitando deadlock de upgrade
+            self._conn.execute("BEGIN IMMEDIATE")
+        elif self.kind == 'postgres':
+            self._conn.autocommit = False
+        else:
+            self._conn.begin()
 
     def commit(self):
-        return self._conn.commit()
+        try:
+            return self._conn.commit()
+        finally:
+            self._restaurar_autocommit()
 
     def rollback(self):
-        return self._conn.rollback()
+        try:
+            return self._conn.rollback()
+        finally:
+            self._restaurar_autocommit()
+
+    def _restaurar_autocommit(self):
+        if self.kind == 'postgres' and not self._conn.closed:
+            self._conn.autocommit = True
+
+    def inserir_varios(self, cur, tabela, colunas, linhas):
+        """INSERT de várias linhas num comando só (execute_values no Postgres, executemany no pymysql)."""
+        nomes = ', '.join(colunas)
+        if self.kind == 'postgres':
+            psycopg2.extras.execute_values(cur, f"INSERT INTO {tabela} ({nomes}) VALUES %s",
+                                           linhas, page_size=max(len(linhas), 1))
+        else:
+            # pymysql reescreve executemany de INSERT ... VALUES em um único INSERT multi-linha;
+            # no SQLite o executemany roda dentro do processo, sem ida e volta de rede
+            marcadores = ', '.join(['%s'] * len(colunas))
+            cur.executemany(f"INSERT INTO {tabela} ({nomes}) VALUES ({marcadores})", linhas)
+
+    def executar_varios(self, cur, sql, linhas):
+        """Mesmo comando para várias linhas (UPDATE/DELETE): execute_batch agrupa as idas ao Postgres."""
+        if self.kind == 'postgres':
+            psycopg2.extras.execute_batch(cur, sql, linhas, page_size=100)
+        else:
+            cur.executemany(sql, linhas)
+
+    def carregar_csv(self, tabela, colunas, caminho):
+        """
+        Carrega um CSV (sem cabeçalho, separado por vírgula, aspas duplas) pelo carregador nativo do
+        motor: LOAD DATA LOCAL INFILE no MySQL, COPY FROM STDIN no Postgres. Campo vazio vira NULL.
+        Retorna as linhas gravadas (no MySQL, linhas com chave duplicada são puladas com aviso).
+        """
+        nomes = ', '.join(colunas)
+        if self.kind == 'postgres':
+            # cursor cru: o CursorInstrumentado não expõe copy_expert
+            with self._conn.cursor() as cur, open(caminho, encoding='utf-8') as arquivo:
+                cur.copy_expert(f"COPY {tabela} ({nomes}) FROM STDIN WITH (FORMAT csv)", arquivo)
+                return cur.rowcount
+        if self.kind == 'mysql':
+            variaveis = ', '.join(f"@c{i}" for i in range(len(colunas)))
+            atribuicoes = ', '.join(f"{c} = NULLIF(@c{i}, '')" for i, c in enumerate(colunas))
+            with self._conn.cursor() as cur:
+                cur.execute(f"""LOAD DATA LOCAL INFILE %s INTO TABLE {tabela} CHARACTER SET utf8mb4
+                                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                                LINES TERMINATED BY '\\n'
+                                ({variaveis}) SET {atribuicoes}""", (caminho,))
+                return cur.rowcount
+        raise RuntimeError("SQLite não tem carregador nativo de CSV")
 
     def close(self):
         return self._conn.close()
 
 
 class Database:
-    def __init__(self, retries: int = 10, delay: int = 3):
+    def __init__(self, retries=None, delay=0.5, host=None, port=None, user=None, password=None,
+                 database=None, pool_min=None, pool_max=None, pool_timeout=None, pool_reciclar=None,
+                 aquecer=True, atraso_maximo=30.0, replicas=None):
         """
         Conecta automaticamente:
          - Se DATABASE_URL estiver definido -> usa essa URL (Postgres ou MySQL compatível)
          - Senão -> usa variáveis locais (DB_HOST/DB_PORT/DB_USER/DB_PASSWORD/DB_NAME) para MySQL
+
+        As conexões ficam num ConnectionPool (DB_POOL_MIN/DB_POOL_MAX/DB_POOL_TIMEOUT/DB_POOL_RECICLAR);
+        cada método pega uma conexão emprestada pelo tempo da chamada.
+
+        O construtor não abre conexão nem bloqueia: com `aquecer`, uma thread aquece o pool em
+        segundo plano com backoff exponencial + jitter (base `delay`, teto `atraso_maximo`, até
+        `retries` tentativas; None = até conseguir). Enquanto isso, qualquer método conecta sob demanda.
+
+        `replicas` (ou DATABASE_REPLICA_URLS, separadas por vírgula) lista réplicas de leitura do
+        mesmo motor: as leituras vão para elas, as escritas e o que vem depois de uma escrita ficam
+        no primário (ver `leitura`).
         """
-        db_url = os.getenv("DATABASE_URL") or os.getenv("CLEARDB_DATABASE_URL")
+        self.kind, self._parametros = self._resolver_parametros(host, port, user, password, database)
+        self._schema_sqlite_pronto = False
+        self.pool = ConnectionPool(
+            self._nova_conexao,
+            minimo=pool_min if pool_min is not None else int(os.getenv("DB_POOL_MIN", 1)),
+            maximo=pool_max if pool_max is not None else int(os.getenv("DB_POOL_MAX", 10)),
+            timeout=pool_timeout if pool_timeout is not None else float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            reciclar=pool_reciclar if pool_reciclar is not None else int(os.getenv("DB_POOL_RECICLAR", 1800)),
+            erros_conexao=ERROS_CONEXAO,
+        )
+        # tabelas opcionais (ex.: relatorios) são descobertas uma vez, na primeira conexão
+        self.tabelas_existentes = None
+        # upsert por CPF: ON CONFLICT (cpf_digitos) quando o índice único existe (descoberto no 1º uso)
+        self._conflito_cpf_digitos = None
+        self.inicializado = False
+        self.ultimo_erro = None
+        self._lock_inicializacao = threading.RLock()
+        self.contadores = ContadorTabelas(self._contar_no_banco, ttl=float(os.getenv("COUNTS_TTL", 30)))
+        # versão por tabela (compartilhada entre workers se existir a tabela versoes_tabelas)
+        self.versoes = VersoesTabelas(self.conexao, intervalo=float(os.getenv("CACHE_VERSAO_INTERVALO", 1)))
+        self.cache_cargos = CacheLRU(
+            maximo=int(os.getenv("CACHE_CARGOS_MAX", 256)),
+            ttl=float(os.getenv("CACHE_CARGOS_TTL", 300)),
+        )
+        self._versao_cache_cargos = None
+        self.replicas = self._montar_replicas(replicas)
+        # leituras de uma tabela escrita há menos que isso (s) ficam no primário (atraso das réplicas)
+        self.janela_primario = float(os.getenv("DB_REPLICA_JANELA", self.replicas.atraso_maximo))
+        # /api/events: escritas deste processo publicam na hora; as dos outros workers chegam pelo observador
+        self.eventos = Publicador(
+            observar=self._observar_mudancas,
+            estado_inicial=self._estado_eventos,
+            intervalo=float(os.getenv("SSE_INTERVALO", 1)),
+            heartbeat=float(os.getenv("SSE_HEARTBEAT", 15)),
+            maximo_assinantes=maximo_conexoes(),
+        )
+        self._lock_eventos = threading.Lock()
+        self._contagens_publicadas = None
+        self._versoes_observadas = None
+        self._alteradas_localmente = set()
 
-        attempt = 0
+        if aquecer:
+            threading.Thread(
+                target=self._aquecer, args=(retries, delay, atraso_maximo), name='db-aquecimento', daemon=True,
+            ).start()
+
+    def _aquecer(self, tentativas, atraso_base, atraso_maximo):
+        """Abre o pool em segundo plano; falhas esperam um backoff exponencial com jitter."""
+        tentativa = 0
         while True:
             try:
-                if db_url:
-                    # Produção: parse da URL
-                    url = urlparse(db_url)
-                    scheme = url.scheme or ''
-                    # postgres://... ou postgresql://...
-                    if scheme.startswith('postgres'):
-                        if not psycopg2:
-                            raise RuntimeError("psycopg2 não instalado. Rode: pip install psycopg2-binary")
-                        host = url.hostname
-                        port = url.port or 5432
-                        user = url.username
-                        password = url.password
-                        database = url.path.lstrip('/')
-                        # Conecta com SSL requerido em serviços na nuvem
-                        pg_conn = psycopg2.connect(
-                            host=host,
-                            port=port,
-                            user=user,
-                            password=password,
-                            dbname=database,
-                            sslmode="require"
-                        )
-                        # deixa autocommit True para evitar surpresas com transações pendentes
-                        pg_conn.autocommit = True
-                        self.conn = ConnWrapper(pg_conn, 'postgres')
-                    else:
-                        # Assume MySQL-style URL (mysql:// ou mysql+pymysql://)
-                        if not pymysql:
-                            raise RuntimeError("pymysql não instalado. Rode: pip install PyMySQL")
-                        host = url.hostname
-                        port = url.port or 3306
-                        user = url.username
-                        password = url.password
-                        database = url.path.lstrip('/')
-                        mysql_conn = pymysql.connect(
-                            host=host,
-                            port=port,
-                            user=user,
-                            password=password,
-                            database=database,
-                            cursorclass=DictCursor,
-                            autocommit=True,
-                        )
-                        self.conn = ConnWrapper(mysql_conn, 'mysql')
+                self._inicializar()
+                self.pool.preencher()
+                self.ultimo_erro = None
+                print(f"[Database] ✅ Conectado com sucesso ({NOMES_MOTORES[self.kind]})")
+                return
+            except Exception as e:
+                tentativa += 1
+                self.ultimo_erro = str(e) or type(e).__name__
+                if tentativas is not None and tentativa >= tentativas:
+                    print(f"[Database] ❌ Aquecimento encerrado após {tentativa} tentativas: {e} "
+                          f"(as conexões seguem sendo tentadas sob demanda)")
+                    return
+                # jitter "cheio": workers que subiram juntos não reconectam todos no mesmo instante
+                espera = random.uniform(0, min(atraso_maximo, atraso_base * 2 ** tentativa))
+                print(f"[Database] ❌ Falha na conexão (tentativa {tentativa}): {e}; nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+
+    def _inicializar(self):
+        """Descobre as tabelas existentes na primeira conexão (uma vez por processo)."""
+        if self.inicializado:
+            return
+        with self._lock_inicializacao:
+            if self.inicializado:
+                return
+            with self.pool.conexao() as conn:
+                tabelas = self._listar_tabelas(conn)
+            self.tabelas_existentes = tabelas
+            self.versoes.ativar_compartilhamento(tabelas)
+            self.inicializado = True
+
+    def verificar_prontidao(self, timeout=2.0):
+        """
+        Para o /readyz: (pronto, detalhes). Pronto = banco respondendo a um ping e pool
+        aquecido (ao menos DB_POOL_MIN conexões abertas).
+        """
+        detalhes = {'motor': self.kind}
+        try:
+            self._inicializar()
+            with self.pool.conexao(timeout=timeout) as conn:
+                if not conn.ping():
+                    raise RuntimeError("ping sem resposta")
+            detalhes['banco'] = 'ok'
+        except Exception as e:
+            detalhes['banco'] = 'indisponivel'
+            detalhes['erro'] = str(e) or type(e).__name__
+        detalhes['pool'] = self.pool.estatisticas()
+        aquecido = detalhes['pool']['total'] >= detalhes['pool']['minimo']
+        detalhes['pool_aquecido'] = aquecido
+        if self.replicas:
+            # réplicas fora não tiram o processo de rotação: as leituras caem para o primário
+            detalhes['replicas'] = self.replicas.estatisticas()
+        return detalhes['banco'] == 'ok' and aquecido, detalhes
+
+    def _resolver_parametros(self, host=None, port=None, user=None, password=None, database=None):
+        """Decide o driver e os parâmetros de conexão; nada é aberto aqui."""
+        db_url = os.getenv("DATABASE_URL") or os.getenv("CLEARDB_DATABASE_URL")
+
+        if db_url:
+            # Produção: parse da URL
+            return self._parametros_da_url(db_url)
+
+        # Local (Docker / MySQL Workbench)
+        return 'mysql', dict(
+            host=host or os.getenv("DB_HOST", "localhost"),
+            port=int(port or os.getenv("DB_PORT", 3306)),
+            user=user or os.getenv("DB_USER", "root"),
+            password=password if password is not None else os.getenv("DB_PASSWORD", "root"),
+            database=database or os.getenv("DB_NAME", "assim_saude"),
+        )
+
+    @staticmethod
+    def _parametros_da_url(db_url):
+        url = urlparse(db_url)
+        scheme = url.scheme or ''
+        # sqlite:///arquivo.db (embutido, sem servidor)
+        if scheme.startswith('sqlite'):
+            alvo, uri = sqlite.resolver_caminho(url.path)
+            return 'sqlite', dict(alvo=alvo, uri=uri)
+        # postgres://... ou postgresql://...
+        if scheme.startswith('postgres'):
+            return 'postgres', dict(
+                host=url.hostname,
+                port=url.port or 5432,
+                user=url.username,
+                password=url.password,
+                dbname=url.path.lstrip('/'),
+                # Conecta com SSL requerido em serviços na nuvem
+                sslmode="require",
+            )
+        # Assume MySQL-style URL (mysql:// ou mysql+pymysql://)
+        return 'mysql', dict(
+            host=url.hostname,
+            port=url.port or 3306,
+            user=url.username,
+            password=url.password,
+            database=url.path.lstrip('/'),
+        )
+
+    def _nova_conexao(self):
+        """Fábrica do pool do primário: abre uma conexão física nova."""
+        if self.kind == 'sqlite':
+            sqlite_conn = sqlite.conectar(**self._parametros)
+            with self._lock_inicializacao:
+                if not self._schema_sqlite_pronto:
+                    sqlite.criar_schema(sqlite_conn)
+                    self._schema_sqlite_pronto = True
+            return ConnWrapper(sqlite_conn, 'sqlite')
+        return self._abrir_conexao(self._parametros)
+
+    def _abrir_conexao(self, parametros):
+        """Conexão física com o motor deste Database (primário ou réplica)."""
+        if self.kind == 'sqlite':
+            return ConnWrapper(sqlite.conectar(**parametros), 'sqlite')
+
+        if self.kind == 'postgres':
+            if not psycopg2:
+                raise RuntimeError("psycopg2 não instalado. Rode: pip install psycopg2-binary")
+            pg_conn = psycopg2.connect(**parametros, connect_timeout=TIMEOUT_CONEXAO)
+            # deixa autocommit True para evitar surpresas com transações pendentes
+            pg_conn.autocommit = True
+            return ConnWrapper(pg_conn, 'postgres')
+
+        if not pymysql:
+            raise RuntimeError("pymysql não instalado. Rode: pip install PyMySQL")
+        mysql_conn = pymysql.connect(
+            **parametros,
+            connect_timeout=TIMEOUT_CONEXAO,
+            cursorclass=DictCursor,
+            autocommit=True,
+        )
+        return ConnWrapper(mysql_conn, 'mysql')
+
+    def conexao_exclusiva(self, **extras):
+        """
+        Conexão física nova, fora do pool, para trabalhos longos que mudam o estado da sessão
+        (services.carga_massa). `extras` vão para o driver (ex.: local_infile=True no pymysql).
+        Quem abre fecha.
+        """
+        self._inicializar()
+        if self.kind == 'sqlite':
+            return self._nova_conexao()
+        return self._abrir_conexao(dict(self._parametros, **extras))
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão do pool: `with self.conexao() as conn, conn.cursor() as cur:`"""
+        self._inicializar()
+        with self.pool.conexao() as conn:
+            yield conn
+
+    @contextmanager
+    def transacao(self):
+        """Empresta uma conexão já dentro de uma transação: commit ao sair do bloco, rollback em erro."""
+        self._inicializar()
+        pendentes = []
+        token = _eventos_pendentes.set(pendentes)
+        try:
+            with self.pool.conexao() as conn:
+                conn.begin()
+                try:
+                    yield conn
+                except BaseException:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        conn.quebrada = True
+                    raise
+                conn.commit()
+        finally:
+            _eventos_pendentes.reset(token)
+        # só o que foi confirmado chega à versão local, aos caches e aos eventos (no rollback a
+        # exceção sobe antes daqui e os pendentes são descartados)
+        for tabela, delta, chave in pendentes:
+            self.versoes.confirmar(tabela)
+            if delta is not None:
+                self._aplicar_escrita(tabela, delta, chave)
+
+    # ----------------------------
+    # RÉPLICAS DE LEITURA
+    # ----------------------------
+    def _montar_replicas(self, urls):
+        if urls is None:
+            urls = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(',') if u.strip()]
+        replicas = []
+        for i, url in enumerate(urls):
+            kind, parametros = self._parametros_da_url(url)
+            if kind != self.kind:
+                raise ValueError(f"Réplica {i} é {NOMES_MOTORES[kind]}, mas o primário é {NOMES_MOTORES[self.kind]}")
+            # minimo=0: uma réplica fora do ar não atrasa a subida do processo
+            pool = ConnectionPool(
+                lambda parametros=parametros: self._abrir_conexao(parametros),
+                minimo=0,
+                maximo=int(os.getenv("DB_REPLICA_POOL_MAX", self.pool.maximo)),
+                timeout=float(os.getenv("DB_REPLICA_POOL_TIMEOUT", 1)),
+                reciclar=self.pool.reciclar,
+                erros_conexao=ERROS_CONEXAO,
+            )
+            replicas.append(Replica(f"{parametros.get('host') or parametros.get('alvo')}#{i}", pool))
+        return ConjuntoReplicas(
+            replicas,
+            estrategia=os.getenv("DB_REPLICAS_ESTRATEGIA", "round_robin"),
+            ejecao=float(os.getenv("DB_REPLICA_EJECAO", 30)),
+            atraso_maximo=float(os.getenv("DB_REPLICA_ATRASO_MAXIMO", 5)),
+            intervalo=float(os.getenv("DB_REPLICA_VERIFICACAO", 5)),
+            medir_atraso=self._medir_atraso,
+        )
+
+    def _medir_atraso(self, conn):
+        """Segundos que a réplica está atrás do primário (None quando o banco não informa)."""
+        with conn.cursor() as cur:
+            if self.kind == 'postgres':
+                # primário ocioso não gera WAL: réplica com tudo aplicado está em dia
+                cur.execute("""
+                    SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+                                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                           END AS atraso
+                """)
+                return float(cur.fetchone()['atraso'] or 0)
+            if self.kind == 'mysql':
+                for comando in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):  # 8.0.22+ / anteriores
+                    try:
+                        cur.execute(comando)
+                        linha = cur.fetchone()
+                        break
+                    except Exception:
+                        # versão sem o comando ou usuário sem REPLICATION CLIENT: atraso desconhecido
+                        linha = None
                 else:
-                    # Local (Docker / MySQL Workbench)
-                    if not pymysql:
-                        raise RuntimeError("pymysql não instalado. Rode: pip install PyMySQL")
-                    host = os.getenv("DB_HOST", "localhost")
-                    port = int(os.getenv("DB_PORT", 3306))
-                    user = os.getenv("DB_USER", "root")
-                    password = os.getenv("DB_PASSWORD", "root")
-                    database = os.getenv("DB_NAME", "assim_saude")
-                    mysql_conn = pymysql.connect(
-                        host=host,
-                        port=port,
-                        user=user,
-                        password=password,
-                        database=database,
-                        cursorclass=DictCursor,
-                        autocommit=True,
-                    )
-                    self.conn = ConnWrapper(mysql_conn, 'mysql')
-
-                print(f"[Database] ✅ Conectado com sucesso ({'Postgres' if self.conn.kind == 'postgres' else 'MySQL'})")
-                break
+                    return None
+                if not linha:
+                    return None
+                atraso = linha.get('Seconds_Behind_Source', linha.get('Seconds_Behind_Master'))
+                # NULL = replicação parada: a réplica não alcança mais o primário
+                return float('inf') if atraso is None else float(atraso)
+        return None
+
+    def nova_requisicao(self):
+        """Início de uma requisição HTTP: esquece as escritas da requisição anterior nesta thread."""
+        _escreveu_no_primario.set(False)
+
+    def _replica_para(self, tabelas):
+        if not self.replicas or _escreveu_no_primario.get():
+            return None
+        # tabela escrita há pouco (aqui ou, com versoes_tabelas, por outro worker): a réplica
+        # pode ainda não ter a escrita, e a resposta sairia com o ETag novo e o corpo antigo
+        if self.versoes.mudou_ha_menos_de(self.janela_primario, tabelas):
+            return None
+        return self.replicas.escolher()
 
+    @contextmanager
+    def leitura(self, *tabelas):
+        """
+        Empresta uma conexão para uma leitura de `tabelas`: uma réplica saudável, ou o primário
+        quando não há réplicas, quando esta requisição já escreveu, quando uma das tabelas mudou
+        há pouco ou quando a réplica escolhida não conecta.
+        """
+        self._inicializar()
+        replica = self._replica_para(tabelas)
+        if replica is not None:
+            entregue = False
+            try:
+                with replica.pool.conexao() as conn:
+                    entregue = True
+                    yield conn
+                return
             except Exception as e:
-                attempt += 1
-                if attempt >= retries:
-                    print(f"[Database] ❌ Não foi possível conectar depois de {retries} tentativas: {e}")
+                if entregue:
+                    # erro na própria leitura: só conexão perdida conta contra a réplica
+                    if isinstance(e, ERROS_CONEXAO):
+                        self.replicas.falhou(replica, e)
                     raise
-                print(f"[Database] ❌ Falha na conexão (tentativa {attempt}/{retries}): {e}")
-                time.sleep(delay)
+                if not isinstance(e, PoolEsgotado):
+                    self.replicas.falhou(replica, e)
+                # a réplica não conectou (ou só está saturada): esta leitura vai para o primário
+        with self.conexao() as conn:
+            yield conn
 
-    # Exemplo de uso dos métodos já existentes no seu arquivo:
+    # Leituras de cargos passam pelo cache (os resultados são compartilhados: não altere)
+    @medido
     def buscar_cargos_por_nome(self, nome=''):
-        with self.conn.cursor() as cur:
-            sql = "SELECT * FROM cargos WHERE nome LIKE %s ORDER BY id DESC"
-            cur.execute(sql, (f"%{nome}%",))
+        return self._cargos_em_cache(('lista', nome), lambda: self._ler_cargos(nome))
+
+    @medido
+    def paginar_cargos(self, nome='', limite=LIMITE_PADRAO, apos=None):
+        """Página de cargos em `id DESC` a partir do cursor `apos`: {'itens', 'next_cursor'}."""
+        apos_id = decodificar_cursor(apos)
+        return self._cargos_em_cache(
+            ('pagina', nome, limite, apos_id),
+            lambda: montar_pagina(self._ler_cargos(nome, apos_id, limite + 1), limite),
+        )
+
+    @medido
+    def buscar_cargo(self, cargo_id):
+        """Cargo pelo id, ou None se não existir (ausências não ficam em cache)."""
+        chave = ('id', cargo_id)
+        cargo = self._cargos_em_cache(chave, lambda: self._ler_cargo(cargo_id))
+        if cargo is None:
+            self.cache_cargos.invalidar(chave)
+        return cargo
+
+    def _ler_cargos(self, nome='', apos_id=None, limite=None):
+        with self.leitura('cargos') as conn, conn.cursor() as cur:
+            cur.execute(*self._consulta_cargos(nome, apos_id, limite))
             return cur.fetchall()
 
+    def _ler_cargo(self, cargo_id):
+        with self.leitura('cargos') as conn, conn.cursor() as cur:
+            cur.execute("SELECT * FROM cargos WHERE id = %s", (cargo_id,))
+            return cur.fetchone()
+
+    def _cargos_em_cache(self, chave, carregar):
+        # escrita de outro worker (versão compartilhada mudou): descarta tudo
+        versao = self.versoes.atual('cargos')
+        if versao != self._versao_cache_cargos:
+            self.cache_cargos.limpar()
+            self._versao_cache_cargos = versao
+        return self.cache_cargos.obter(chave, carregar)
+
+    def _invalidar_cache_cargos(self, cargo_id=None):
+        # listas sempre caem (qualquer cargo pode entrar/sair de um filtro); por id, só os afetados
+        ids = set(cargo_id) if isinstance(cargo_id, (list, tuple, set)) else {cargo_id}
+        self.cache_cargos.invalidar_se(lambda chave: chave[0] != 'id' or chave[1] in ids)
+        if self._versao_cache_cargos is not None:
+            # acompanha o incremento feito por esta própria escrita
+            self._versao_cache_cargos += 1
+
+    def _consulta_cargos(self, nome='', apos_id=None, limite=None):
+        sql = "SELECT * FROM cargos WHERE nome LIKE %s"
+        params = [f"%{nome}%"]
+        if apos_id is not None:
+            sql += " AND id < %s"
+            params.append(apos_id)
+        sql += " ORDER BY id DESC"
+        if limite is not None:
+            sql += " LIMIT %s"
+            params.append(limite)
+        return sql, params
+
+    @medido
     def inserir_cargo(self, nome, salario, descricao):
-        with self.conn.cursor() as cur:
+        with self.conexao() as conn, conn.cursor() as cur:
             sql = "INSERT INTO cargos (nome, salario, descricao) VALUES (%s, %s, %s)"
             cur.execute(sql, (nome, salario, descricao))
+            self._registrar_escrita(cur, 'cargos', +1, chave=getattr(cur, 'lastrowid', None))
             # para psycopg2, o lastrowid não existe; usamos RETURNING id em SQL ao precisar do id
             try:
                 return cur.lastrowid
@@ -166,58 +669,307 @@ class Database:
                 # tenta pegar id via cursor (Postgres precisa de RETURNING id na query)
                 return None
 
+    @medido
     def atualizar_cargo(self, cargo_id, nome, salario, descricao):
-        with self.conn.cursor() as cur:
+        # o resumo por cargo não muda: a folha é quantidade x salário, calculada na leitura
+        with self.conexao() as conn, conn.cursor() as cur:
             sql = "UPDATE cargos SET nome=%s, salario=%s, descricao=%s WHERE id=%s"
             cur.execute(sql, (nome, salario, descricao, cargo_id))
-            return cur.rowcount > 0
+            atualizado = cur.rowcount > 0
+            if atualizado:
+                self._registrar_escrita(cur, 'cargos', chave=cargo_id)
+            return atualizado
 
+    @medido
     def deletar_cargo(self, cargo_id):
+        """
+        Só funcionários ativos impedem a exclusão (violação de FK, como antes). Com a migração 004,
+        os desligados ainda ligados ao cargo vão para o arquivo na mesma transação, que não tem FK
+        para cargos e é lido com LEFT JOIN; se a exclusão falhar, a movimentação é desfeita junto.
+        """
         try:
-            with self.conn.cursor() as cursor:
-                sql = "DELETE FROM cargos WHERE id = %s"
-                linhas = cursor.execute(sql, (cargo_id,))
-                self.conn.commit()
-                return linhas > 0
+            with self.transacao() as conn, conn.cursor() as cursor:
+                if self._arquivar_desligados_do_cargo(cursor, [cargo_id]):
+                    # como no arquivamento: listagens padrão não mudam, só a versão
+                    self._registrar_versao(cursor, 'funcionarios')
+                cursor.execute("DELETE FROM cargos WHERE id = %s", (cargo_id,))
+                deletado = cursor.rowcount > 0
+                if deletado:
+                    self._registrar_escrita(cursor, 'cargos', -1, chave=cargo_id)
+            return deletado
         except Exception as e:
-            self.conn.rollback()
             print("Erro ao deletar cargo:", e)
             raise
 
+    def _arquivar_desligados_do_cargo(self, cursor, cargo_ids):
+        """Move para o arquivo os desligados ainda ligados aos cargos (migração 004). Retorna quantos."""
+        if not self._arquivo_ativo():
+            return 0
+        movidos = 0
+        for cargo_id in cargo_ids:
+            cursor.execute(arquivo.sql_desligados_do_cargo(self.kind), (cargo_id,))
+            desligados = [linha['id'] for linha in cursor.fetchall()]
+            if desligados:
+                for sql in arquivo.sql_mover(len(desligados)):
+                    cursor.execute(sql, desligados)
+                movidos += len(desligados)
+        return movidos
+
+    # ----------------------------
+    # CONTADORES
+    # ----------------------------
+    def estatisticas(self):
+        """Estado do pool, do cache de cargos, das réplicas e dos eventos (gauges no /metrics)."""
+        return {'pool': self.pool.estatisticas(), 'cache_cargos': self.cache_cargos.estatisticas(),
+                'eventos': self.eventos.estatisticas(), **self.replicas.estatisticas()}
+
+    TABELAS_CONTADAS = ('cargos', 'funcionarios', 'relatorios')
+
+    @medido
+    def contar_registros(self):
+        """
+        Retorna ({tabela: total}, etag) a partir do cache em memória; o banco só é
+        consultado quando o snapshot expira (COUNTS_TTL). Tabelas inexistentes viram None.
+        """
+        return self.contadores.obter()
+
+    def _contar_no_banco(self):
+        resultado = {}
+        with self.leitura(*self.TABELAS_CONTADAS) as conn, conn.cursor() as cur:
+            for tabela in self.TABELAS_CONTADAS:
+                if tabela not in self.tabelas_existentes:
+                    resultado[tabela] = None
+                    continue
+                filtro = " WHERE ativo = TRUE" if tabela == 'funcionarios' and self._arquivo_ativo() else ""
+                cur.execute(f"SELECT COUNT(*) AS total FROM {tabela}{filtro}")
+                resultado[tabela] = cur.fetchone()['total']
+        return resultado
+
+    @medido
+    def contar_desligados(self):
+        """{'funcionarios_inativos', 'funcionarios_arquivados'}: desligados ainda na tabela e já arquivados."""
+        if not self._arquivo_ativo():
+            return {'funcionarios_inativos': 0, 'funcionarios_arquivados': 0}
+        with self.leitura('funcionarios') as conn, conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS total FROM funcionarios WHERE ativo = FALSE")
+            inativos = cur.fetchone()['total']
+            cur.execute("SELECT COUNT(*) AS total FROM funcionarios_arquivo")
+            return {'funcionarios_inativos': inativos, 'funcionarios_arquivados': cur.fetchone()['total']}
+
+    def _listar_tabelas(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(self._sql_tabelas())
+            return {linha['nome'] for linha in cur.fetchall()}
+
+    def _sql_tabelas(self):
+        if self.kind == 'sqlite':
+            return "SELECT name AS nome FROM sqlite_master WHERE type = 'table'"
+        if self.kind == 'postgres':
+            return """
+                SELECT table_name AS nome FROM information_schema.tables
+                WHERE table_schema = current_schema()
+            """
+        return """
+            SELECT table_name AS nome FROM information_schema.tables
+            WHERE table_schema = DATABASE()
+        """
+
+    def _registrar_escrita(self, cur, tabela, delta=0, chave=None):
+        """
+        Chamado com o cursor da escrita, logo após ela ter sucesso: incrementa a versão da
+        tabela e mantém coerentes os caches em memória (contagens e cargos).
+        `delta` é a variação no número de linhas; `chave`, o id alterado/removido (ou a lista de
+        ids, nos lotes). Dentro de transacao() só o UPDATE da versão compartilhada roda aqui;
+        o resto espera o COMMIT.
+        """
+        pendentes = _eventos_pendentes.get()
+        self.versoes.incrementar(cur, tabela, confirmar=pendentes is None)
+        _escreveu_no_primario.set(True)
+        if pendentes is not None:
+            pendentes.append((tabela, delta, chave))
+        else:
+            self._aplicar_escrita(tabela, delta, chave)
+
+    def _registrar_versao(self, cur, tabela):
+        """
+        Como _registrar_escrita, mas só a versão: contagens, caches e eventos não mudam (ex.:
+        desligados movidos para o arquivo, que já estavam fora das listagens padrão).
+        """
+        pendentes = _eventos_pendentes.get()
+        self.versoes.incrementar(cur, tabela, confirmar=pendentes is None)
+        _escreveu_no_primario.set(True)
+        if pendentes is not None:
+            pendentes.append((tabela, None, None))
+
+    def _aplicar_escrita(self, tabela, delta, chave):
+        # escrita já confirmada no banco: caches em memória e eventos
+        if delta:
+            self.contadores.ajustar(tabela, delta)
+        if tabela == 'cargos':
+            self._invalidar_cache_cargos(chave)
+        self._notificar_escrita(tabela, delta, chave)
+
+    # ----------------------------
+    # EVENTOS (/api/events)
+    # ----------------------------
+    TABELAS_OBSERVADAS = ('cargos', 'funcionarios')
+
+    def _notificar_escrita(self, tabela, delta, chave):
+        acao = 'criado' if delta > 0 else 'removido' if delta < 0 else 'atualizado'
+        dados = {'tabela': tabela, 'acao': acao}
+        if isinstance(chave, list):
+            dados['ids'] = chave
+        elif chave is not None:
+            dados['id'] = chave
+        if abs(delta) > 1:
+            dados['quantidade'] = abs(delta)
+        self._alteradas_localmente.add(tabela)
+        self.eventos.publicar('alteracao', dados)
+        if delta:
+            # o snapshot em memória já foi ajustado: contagens sem consultar o banco
+            contagens = self._contagens_alteradas(*(self.contadores.ultimo() or (None, None)))
+            if contagens:
+                self.eventos.publicar('contagens', contagens)
+
+    def _contagens_alteradas(self, valores, etag):
+        """Evento de contagens com o delta desde o último publicado, ou None se nada mudou."""
+        if valores is None:
+            return None
+        with self._lock_eventos:
+            anteriores, self._contagens_publicadas = self._contagens_publicadas, (valores, etag)
+        if anteriores is None or anteriores[1] == etag:
+            return None
+        delta = {t: (v or 0) - (anteriores[0].get(t) or 0) for t, v in valores.items()
+                 if v != anteriores[0].get(t)}
+        return {**valores, 'delta': delta}
+
+    def _estado_eventos(self):
+        """Enviado a cada (re)conexão: as contagens atuais."""
+        valores, etag = self.contar_registros()
+        with self._lock_eventos:
+            if self._contagens_publicadas is None:
+                self._contagens_publicadas = (valores, etag)
+        return [('contagens', valores)]
+
+    def _observar_mudancas(self):
+        """Chamado pelo observador do Publicador: escritas feitas por outros workers."""
+        versoes = self.versoes.atuais(self.TABELAS_OBSERVADAS)
+        locais, self._alteradas_localmente = self._alteradas_localmente, set()
+        anteriores, self._versoes_observadas = self._versoes_observadas, versoes
+        eventos = []
+        for tabela, antes, agora in zip(self.TABELAS_OBSERVADAS, anteriores or versoes, versoes):
+            # escrita deste processo já foi publicada, com os detalhes
+            if antes != agora and tabela not in locais:
+                eventos.append(('alteracao', {'tabela': tabela}))
+                self.contadores.invalidar()
+        # sem versoes_tabelas, as contagens de outros workers chegam com o COUNTS_TTL
+        contagens = self._contagens_alteradas(*self.contar_registros())
+        if contagens:
+            eventos.append(('contagens', contagens))
+        return eventos
+
     # ----------------------------
     # MÉTODOS DE FUNCIONÁRIO
     # ----------------------------
-    def buscar_funcionarios(self, nome='', cpf=''):
-        with self.conn.cursor() as cur:
-            sql = """SELECT f.*, c.nome AS cargo_nome, c.salario AS cargo_salario
-                     FROM funcionarios f
-                     JOIN cargos c ON f.cargo_id = c.id
-                     WHERE f.nome LIKE %s AND f.cpf LIKE %s
-                     ORDER BY f.id DESC"""
-            cur.execute(sql, (f"%{nome}%", f"%{cpf}%"))
+    @medido
+    def buscar_funcionarios(self, nome='', cpf='', incluir_arquivados=False):
+        with self.leitura('funcionarios', 'cargos') as conn, conn.cursor() as cur:
+            cur.execute(*self._consulta_funcionarios(nome, cpf, incluir_arquivados=incluir_arquivados))
             return cur.fetchall()
 
+    @medido
+    def iterar_funcionarios(self, nome='', cpf='', lote=1000, incluir_arquivados=False):
+        """
+        Gera lotes (listas de até `lote` linhas) da listagem completa usando cursor do
+        lado do servidor: memória constante e primeiras linhas disponíveis de imediato.
+        """
+        with self.leitura('funcionarios', 'cargos') as conn, conn.cursor(servidor=True) as cur:
+            cur.execute(*self._consulta_funcionarios(nome, cpf, incluir_arquivados=incluir_arquivados))
+            while True:
+                linhas = cur.fetchmany(lote)
+                if not linhas:
+                    break
+                yield linhas
+
+    @medido
+    def paginar_funcionarios(self, nome='', cpf='', limite=LIMITE_PADRAO, apos=None, incluir_arquivados=False):
+        """Página de funcionários em `id DESC` a partir do cursor `apos`: {'itens', 'next_cursor'}."""
+        with self.leitura('funcionarios', 'cargos') as conn, conn.cursor() as cur:
+            cur.execute(*self._consulta_funcionarios(nome, cpf, decodificar_cursor(apos), limite + 1,
+                                                     incluir_arquivados))
+            return montar_pagina(cur.fetchall(), limite)
+
+    def _consulta_funcionarios(self, nome='', cpf='', apos_id=None, limite=None, incluir_arquivados=False):
+        if self._arquivo_ativo() and incluir_arquivados:
+            return arquivo.consulta_com_arquivo(self.kind, nome, cpf, apos_id, limite)
+        clausulas, params = filtro_funcionarios(self.kind, nome, cpf, somente_ativos=self._arquivo_ativo())
+        if apos_id is not None:
+            clausulas.append("f.id < %s")
+            params.append(apos_id)
+        sql = """SELECT f.*, c.nome AS cargo_nome, c.salario AS cargo_salario
+                 FROM funcionarios f
+                 JOIN cargos c ON f.cargo_id = c.id"""
+        if clausulas:
+            sql += " WHERE " + " AND ".join(clausulas)
+        sql += " ORDER BY f.id DESC"
+        if limite is not None:
+            sql += " LIMIT %s"
+            params.append(limite)
+        return sql, params
+
+    @medido
+    def pesquisar_funcionarios(self, termo, limite=20, incluir_arquivados=False):
+        """
+        Busca por nome (índice full-text/trigram) ou prefixo de CPF, ordenada por relevância.
+        `incluir_arquivados` completa o resultado com os arquivados (varredura, relevância 0).
+        """
+        incluir_arquivados = incluir_arquivados and self._arquivo_ativo()
+        sql, params = consulta_ranqueada(self.kind, termo, limite,
+                                         somente_ativos=self._arquivo_ativo() and not incluir_arquivados)
+        if sql is None:
+            return []
+        with self.leitura('funcionarios', 'cargos') as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            linhas = cur.fetchall()
+            if incluir_arquivados and len(linhas) < limite:
+                cur.execute(*arquivo.consulta_pesquisa_arquivo(self.kind, termo, limite - len(linhas)))
+                linhas = list(linhas) + list(cur.fetchall())
+            return linhas
+
+    @medido
     def inserir_funcionario(self, nome, data_nascimento, endereco, cpf, email, telefone, cargo_id):
         if not self.validar_cpf(cpf):
             raise ValueError("CPF inválido")
-        with self.conn.cursor() as cur:
+        with self.transacao() as conn, conn.cursor() as cur:
             sql = """INSERT INTO funcionarios
                      (nome, data_nascimento, endereco, cpf, email, telefone, cargo_id)
                      VALUES (%s, %s, %s, %s, %s, %s, %s)"""
             try:
                 cur.execute(sql, (nome, data_nascimento, endereco, cpf, email, telefone, cargo_id))
-                return cur.lastrowid
-            except IntegrityError as e:
+                func_id = cur.lastrowid
+                self._ajustar_resumo(cur, {cargo_id: +1})
+                self._registrar_escrita(cur, 'funcionarios', +1, chave=func_id)
+                return func_id
+            except ERROS_INTEGRIDADE:
                 raise
 
+    @medido
     def atualizar_funcionario(self, func_id, data):
         cpf = data.get('cpf')
         if cpf and not self.validar_cpf(cpf):
             raise ValueError("CPF inválido")
-        with self.conn.cursor() as cur:
+        with self.transacao() as conn, conn.cursor() as cur:
+            anterior = None
+            if self._resumo_ativo():
+                anterior = self._cargo_do_funcionario(cur, func_id)
+                if anterior is None:
+                    return False
             sql = """UPDATE funcionarios
                      SET nome=%s, data_nascimento=%s, endereco=%s, cpf=%s, email=%s, telefone=%s, cargo_id=%s
                      WHERE id=%s"""
+            if self._arquivo_ativo():
+                # desligado não é editado (readmissão é pelo upsert por CPF)
+                sql += " AND ativo = TRUE"
             cur.execute(sql, (
                 data.get('nome'),
                 data.get('data_nascimento'),
@@ -228,33 +980,576 @@ class Database:
                 data.get('cargo_id'),
                 func_id
             ))
-            return cur.rowcount > 0
+            atualizado = cur.rowcount > 0
+            if atualizado:
+                novo = data.get('cargo_id')
+                if anterior is not None and str(anterior) != str(novo):
+                    # troca de cargo: sai de um, entra no outro
+                    self._ajustar_resumo(cur, {anterior: -1, novo: +1})
+                self._registrar_escrita(cur, 'funcionarios', chave=func_id)
+            return atualizado
+
+    @medido
+    def upsert_funcionario(self, cpf, data):
+        """
+        Cria ou substitui (como o PUT) o funcionário do CPF: ON DUPLICATE KEY UPDATE no MySQL,
+        ON CONFLICT ... RETURNING no Postgres/SQLite. Idempotente; a chave são os
+        dígitos do CPF (`cpf_digitos`, UNIQUE desde a migração 005), como na importação em massa:
+        '529.982.247-25' e '52998224725' são o mesmo funcionário. Retorna (id, criado).
+        """
+        if not self.validar_cpf(cpf):
+            raise ValueError("CPF inválido")
+        # gravado só com dígitos: a coluna gerada cpf_digitos fica igual à chave em todos os bancos
+        cpf = normalizar_cpf(cpf)
+        valores = tuple(cpf if c == 'cpf' else data.get(c) or None for c in self.COLUNAS_FUNCIONARIO)
+        try:
+            return self._upsert_em_transacao(cpf, valores)
+        except _CargoAnteriorDesconhecido:
+            # a linha foi inserida por outra transação depois do nosso snapshot (Postgres) e o
+            # cargo anterior não veio: repete uma vez, agora com ela visível
+            return self._upsert_em_transacao(cpf, valores)
 
+    def _upsert_em_transacao(self, cpf, valores):
+        with self.transacao() as conn, conn.cursor() as cur:
+            func_id, criado, anterior, estava_ativo = self._executar_upsert(cur, cpf, valores)
+            novo = valores[-1]  # cargo_id é a última de COLUNAS_FUNCIONARIO
+            if criado:
+                self._ajustar_resumo(cur, {novo: +1})
+            elif estava_ativo is False:
+                # readmissão de um desligado: volta a contar, como um cadastro novo
+                self._ajustar_resumo(cur, {novo: +1})
+                self._registrar_escrita(cur, 'funcionarios', +1, chave=func_id)
+                return func_id, criado
+            elif anterior is None and self._resumo_ativo():
+                raise _CargoAnteriorDesconhecido()
+            elif anterior is not None and str(anterior) != str(novo):
+                self._ajustar_resumo(cur, {anterior: -1, novo: +1})
+            self._registrar_escrita(cur, 'funcionarios', +1 if criado else 0, chave=func_id)
+            return func_id, criado
+
+    def _executar_upsert(self, cur, cpf, valores):
+        """
+        Comando do upsert de upsert_funcionario -> (id, criado, cargo_id anterior ou None,
+        se a linha anterior estava ativa: True/False, ou None sem a migração 004 / sem linha).
+        Um desligado com o mesmo CPF é readmitido (volta a ativo).
+        """
+        colunas = ', '.join(self.COLUNAS_FUNCIONARIO)
+        marcadores = ', '.join(['%s'] * len(valores))
+        com_ativo = self._arquivo_ativo()
+        lidas = "cargo_id, ativo" if com_ativo else "cargo_id"
+        if self.kind == 'mysql':
+            # o MySQL não devolve valores antigos: o cargo/ativo anteriores vêm de uma leitura
+            # travada pelo índice único (sem linha, o FOR UPDATE trava o intervalo do CPF)
+            cur.execute(f"SELECT id, {lidas} FROM funcionarios WHERE cpf_digitos = %s FOR UPDATE", (cpf,))
+            linha = cur.fetchone()
+            # alias de linha (MySQL 8.0.19+) no lugar de VALUES(col), obsoleto desde o 8.0.20
+            atribuicoes = ', '.join(f"{c}=novo.{c}" for c in self.COLUNAS_FUNCIONARIO if c != 'cpf')
+            if com_ativo:
+                atribuicoes += ", ativo=TRUE, desligado_em=NULL"
+            cur.execute(f"""INSERT INTO funcionarios ({colunas}) VALUES ({marcadores}) AS novo
+                            ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id), {atribuicoes}""", valores)
+            # linhas afetadas: 1 = inserida, 2 = alterada, 0 = reenvio idêntico
+            if cur.rowcount == 1:
+                return cur.lastrowid, True, None, None
+            if linha is None:
+                # outra chave única (ex.: `cpf` sem a migração 005) disparou o UPDATE: anterior desconhecido
+                return cur.lastrowid, False, None, None
+            return linha['id'], False, linha['cargo_id'], bool(linha['ativo']) if com_ativo else None
+
+        alvo = 'cpf_digitos' if self._cpf_digitos_unico() else 'cpf'
+        atribuicoes = ', '.join(f"{c}=excluded.{c}" for c in self.COLUNAS_FUNCIONARIO if c != 'cpf')
+        if com_ativo:
+            atribuicoes += ", ativo=TRUE, desligado_em=NULL"
+        sql_upsert = f"""INSERT INTO funcionarios ({colunas}) VALUES ({marcadores})
+                         ON CONFLICT ({alvo}) DO UPDATE SET {atribuicoes}"""
+        if self.kind == 'postgres':
+            # xmax = 0 só na linha recém-inserida; a CTE trava e lê o cargo anterior no mesmo comando
+            cur.execute(f"""WITH anterior AS (SELECT {lidas} FROM funcionarios WHERE {alvo} = %s FOR UPDATE)
+                            {sql_upsert}
+                            RETURNING id, (xmax = 0) AS criado, (SELECT cargo_id FROM anterior) AS anterior,
+                                      {"(SELECT ativo FROM anterior)" if com_ativo else "NULL"} AS estava_ativo""",
+                        (cpf,) + valores)
+            linha = cur.fetchone()
+            return linha['id'], linha['criado'], linha['anterior'], linha['estava_ativo']
+        # SQLite: o BEGIN IMMEDIATE já trava o banco, a leitura anterior não disputa com ninguém
+        cur.execute(f"SELECT {lidas} FROM funcionarios WHERE {alvo} = %s", (cpf,))
+        linha = cur.fetchone()
+        anterior = linha['cargo_id'] if linha else None
+        estava_ativo = bool(linha['ativo']) if linha and com_ativo else None
+        cur.execute(sql_upsert + " RETURNING id", valores)
+        return cur.fetchone()['id'], linha is None, anterior, estava_ativo
+
+    def _cpf_digitos_unico(self):
+        """O ON CONFLICT pode usar cpf_digitos? (índice único da migração 005; sempre no SQLite)"""
+        if self._conflito_cpf_digitos is None:
+            if self.kind != 'postgres':
+                self._conflito_cpf_digitos = True
+            else:
+                with self.conexao() as conn, conn.cursor() as cur:
+                    cur.execute("""SELECT 1 FROM pg_indexes
+                                   WHERE schemaname = current_schema() AND indexname = 'uq_funcionarios_cpf_digitos'""")
+                    self._conflito_cpf_digitos = cur.fetchone() is not None
+        return self._conflito_cpf_digitos
+
+    @medido
     def deletar_funcionario(self, func_id):
-        with self.conn.cursor() as cur:
-            sql = "DELETE FROM funcionarios WHERE id=%s"
+        """Com a migração 004 é um desligamento (a linha fica, inativa, até o arquivamento)."""
+        with self.transacao() as conn, conn.cursor() as cur:
+            cargo_id = self._cargo_do_funcionario(cur, func_id) if self._resumo_ativo() else None
+            sql = arquivo.sql_desligar() if self._arquivo_ativo() else "DELETE FROM funcionarios WHERE id=%s"
             cur.execute(sql, (func_id,))
-            return cur.rowcount > 0
+            deletado = cur.rowcount > 0
+            if deletado:
+                if cargo_id is not None:
+                    self._ajustar_resumo(cur, {cargo_id: -1})
+                self._registrar_escrita(cur, 'funcionarios', -1, chave=func_id)
+        return deletado
 
     # ----------------------------
-    # VALIDAÇÃO DE CPF
+    # ATIVOS / ARQUIVO
     # ----------------------------
-    def validar_cpf(self, cpf: str) -> bool:
-        if not cpf:
-            return False
-        cpf = ''.join(filter(str.isdigit, str(cpf)))
-        if len(cpf) != 11 or cpf == cpf[0] * 11:
-            return False
+    def _arquivo_ativo(self):
+        # bancos sem a migração 004 seguem com o DELETE físico e sem coluna `ativo`
+        return 'funcionarios_arquivo' in (self.tabelas_existentes or ())
+
+    def arquivar_funcionarios(self, dias=arquivo.DIAS_PADRAO, lote=arquivo.LOTE_PADRAO):
+        """
+        Move para `funcionarios_arquivo` os desligados há mais de `dias` dias, `lote` por transação
+        (escritas concorrentes esperam no máximo um lote). Retorna quantos foram movidos.
+        """
+        self._inicializar()
+        if not self._arquivo_ativo():
+            raise RuntimeError("Tabela funcionarios_arquivo não existe (aplique database/migracoes/004_arquivo_funcionarios_*.sql)")
+        trava = "" if self.kind == 'sqlite' else " FOR UPDATE"
+        total = 0
+        while True:
+            with self.transacao() as conn, conn.cursor() as cur:
+                # sem ORDER BY: ordenar por id levaria o otimizador a varrer a chave primária em
+                # vez do índice (parcial) dos desligados
+                cur.execute(f"""SELECT id FROM funcionarios
+                                WHERE ativo = FALSE AND desligado_em <= {arquivo.sql_corte(self.kind)}
+                                LIMIT %s{trava}""", (dias, lote))
+                ids = [linha['id'] for linha in cur.fetchall()]
+                if not ids:
+                    return total
+                for sql in arquivo.sql_mover(len(ids)):
+                    cur.execute(sql, ids)
+                # as listagens padrão não mudam (só ativos): só a versão, sem evento nem contagem
+                self.versoes.incrementar(cur, 'funcionarios', confirmar=False)
+            self.versoes.confirmar('funcionarios')
+            total += len(ids)
+            if len(ids) < lote:
+                return total
+
+    # ----------------------------
+    # RESUMO POR CARGO
+    # ----------------------------
+    def _resumo_ativo(self):
+        # bancos sem a migração 003 seguem funcionando, com o resumo calculado por agregação
+        return 'resumo_cargos' in (self.tabelas_existentes or ())
+
+    def _cargo_do_funcionario(self, cur, func_id):
+        """
+        cargo_id atual do funcionário, travando a linha até o fim da transação (None se não existe
+        ou está desligado).
+        """
+        trava = "" if self.kind == 'sqlite' else " FOR UPDATE"  # no SQLite o BEGIN IMMEDIATE já trava
+        ativo = " AND ativo = TRUE" if self._arquivo_ativo() else ""
+        cur.execute(f"SELECT cargo_id FROM funcionarios WHERE id = %s{ativo}{trava}", (func_id,))
+        linha = cur.fetchone()
+        return linha['cargo_id'] if linha else None
+
+    def _ajustar_resumo(self, cur, deltas):
+        """Aplica {cargo_id: delta} ao resumo, na transação da escrita que o causou."""
+        if not self._resumo_ativo():
+            return
+        # ordem fixa de cargo_id: duas transações trocando cargos não se travam mutuamente
+        for cargo_id, delta in sorted((int(c), d) for c, d in deltas.items() if d):
+            cur.execute(resumo.sql_ajuste(self.kind), (cargo_id, delta))
+
+    @medido
+    def resumo_cargos(self):
+        """Quantidade de funcionários e folha (quantidade x salário) por cargo, em ordem de nome."""
+        sql = resumo.SQL_RESUMO if self._resumo_ativo() else resumo.so_ativos(resumo.SQL_RESUMO_AGREGADO,
+                                                                               self._arquivo_ativo())
+        with self.leitura('funcionarios', 'cargos') as conn, conn.cursor() as cur:
+            cur.execute(sql + " ORDER BY c.nome, c.id")
+            return cur.fetchall()
+
+    def verificar_resumo(self, corrigir=False):
+        """
+        Reconta os funcionários por cargo e compara com `resumo_cargos`. Retorna as divergências
+        [{'cargo_id', 'registrado', 'esperado'}]; com `corrigir`, regrava esses cargos.
+        """
+        self._inicializar()
+        if not self._resumo_ativo():
+            raise RuntimeError("Tabela resumo_cargos não existe (aplique database/migracoes/003_resumo_cargos_*.sql)")
+        with self.transacao() as conn, conn.cursor() as cur:
+            if self.kind != 'sqlite':
+                # escritas concorrentes esperam a correção terminar em vez de se perderem nela
+                cur.execute("SELECT cargo_id FROM resumo_cargos FOR UPDATE")
+            cur.execute(resumo.so_ativos(resumo.SQL_RECONTAGEM, self._arquivo_ativo()))
+            esperado = {linha['cargo_id']: int(linha['quantidade']) for linha in cur.fetchall()}
+            cur.execute("SELECT cargo_id, quantidade FROM resumo_cargos")
+            registrado = {linha['cargo_id']: int(linha['quantidade']) for linha in cur.fetchall()}
+            divergencias = [
+                {'cargo_id': cargo_id, 'registrado': registrado.get(cargo_id, 0), 'esperado': quantidade}
+                for cargo_id, quantidade in sorted(esperado.items())
+                if registrado.get(cargo_id, 0) != quantidade
+            ]
+            if corrigir:
+                for d in divergencias:
+                    cur.execute(resumo.sql_definir(self.kind), (d['cargo_id'], d['esperado']))
+        return divergencias
+
+    def registrar_carga(self, tabelas):
+        """
+        Depois de uma carga feita por fora dos métodos de escrita (services.carga_massa): incrementa
+        a versão das tabelas, para os caches e contagens de todos os workers se renovarem, e reconta
+        o resumo por cargo se houve carga de funcionários.
+        """
+        self._inicializar()
+        with self.transacao() as conn, conn.cursor() as cur:
+            for tabela in tabelas:
+                self._registrar_escrita(cur, tabela)
+        self.contadores.invalidar()
+        if 'funcionarios' in tabelas and self._resumo_ativo():
+            return self.verificar_resumo(corrigir=True)
+        return []
+
+    COLUNAS_FUNCIONARIO = ('nome', 'data_nascimento', 'endereco', 'cpf', 'email', 'telefone', 'cargo_id')
+
+    @medido
+    def importar_funcionarios(self, registros, tamanho_lote=500):
+        """
+        Importação em massa. `registros` é uma lista de (linha, dict) vinda de services.importacao.
+        Valida todos os CPFs de uma vez, descarta duplicados (no arquivo e no banco) com consultas
+        por conjunto e insere em lotes multi-linha, uma transação por lote.
+        Retorna {'total', 'inseridos', 'erros': [{'linha', 'erro'}]}.
+        """
+        erros = []
+        candidatos = []
+        for linha, dados in registros:
+            faltando = next((c for c in ('nome', 'cpf', 'cargo_id') if not dados.get(c)), None)
+            if faltando:
+                erros.append({'linha': linha, 'erro': f'Campo {faltando} é obrigatório'})
+            else:
+                candidatos.append((linha, dados))
 
-        def calc_digito(cpf, peso):
-            soma = 0
-            for i in range(peso - 1):
-                soma += int(cpf[i]) * (peso - i)
-            resto = (soma * 10) % 11
-            return resto if resto < 10 else 0
+        validos, digitos = validar_cpfs([dados['cpf'] for _, dados in candidatos])
+        vistos = {}
+        aceitos = []
+        for (linha, dados), valido, cpf in zip(candidatos, validos, digitos):
+            if not valido:
+                erros.append({'linha': linha, 'erro': 'CPF inválido'})
+            elif cpf in vistos:
+                erros.append({'linha': linha, 'erro': f'CPF repetido no arquivo (linha {vistos[cpf]})'})
+            else:
+                vistos[cpf] = linha
+                aceitos.append((linha, dados, cpf))
 
+        existentes = self._valores_existentes("funcionarios", "cpf_digitos", [cpf for _, _, cpf in aceitos])
+        cargos = self._valores_existentes("cargos", "id", {str(d['cargo_id']) for _, d, _ in aceitos}, int)
+        prontos = []
+        for linha, dados, cpf in aceitos:
+            if cpf in existentes:
+                erros.append({'linha': linha, 'erro': 'CPF já cadastrado'})
+            elif not str(dados['cargo_id']).isdigit() or int(dados['cargo_id']) not in cargos:
+                erros.append({'linha': linha, 'erro': 'Cargo não encontrado'})
+            else:
+                prontos.append((linha, tuple(dados.get(c) or None for c in self.COLUNAS_FUNCIONARIO)))
+
+        inseridos = 0
+        for inicio in range(0, len(prontos), tamanho_lote):
+            lote = prontos[inicio:inicio + tamanho_lote]
+            try:
+                with self.transacao() as conn, conn.cursor() as cur:
+                    conn.inserir_varios(cur, 'funcionarios', self.COLUNAS_FUNCIONARIO, [v for _, v in lote])
+                    # cargo_id é a última de COLUNAS_FUNCIONARIO
+                    self._ajustar_resumo(cur, Counter(int(v[-1]) for _, v in lote))
+                    self._registrar_escrita(cur, 'funcionarios', len(lote))
+                inseridos += len(lote)
+            except ERROS_INTEGRIDADE:
+                # corrida com outro cadastro no meio da importação: isola a(s) linha(s) culpada(s)
+                inseridos += self._inserir_individualmente(lote, erros)
+
+        erros.sort(key=lambda e: e['linha'])
+        return {'total': len(registros), 'inseridos': inseridos, 'erros': erros}
+
+    def _inserir_individualmente(self, lote, erros):
+        inseridos = 0
+        for linha, valores in lote:
+            try:
+                with self.transacao() as conn, conn.cursor() as cur:
+                    conn.inserir_varios(cur, 'funcionarios', self.COLUNAS_FUNCIONARIO, [valores])
+                    self._ajustar_resumo(cur, {valores[-1]: +1})
+                    self._registrar_escrita(cur, 'funcionarios', +1)
+                inseridos += 1
+            except ERROS_INTEGRIDADE:
+                erros.append({'linha': linha, 'erro': 'CPF já cadastrado'})
+        return inseridos
+
+    def _valores_existentes(self, tabela, coluna, valores, tipo=str, bloco=1000):
+        """Quais `valores` já existem em tabela.coluna, em consultas IN por blocos."""
+        with self.conexao() as conn, conn.cursor() as cur:
+            return {tipo(linha['valor']) for linha in self._linhas_por_valores(cur, tabela, coluna, valores, tipo, bloco)}
+
+    def _linhas_por_valores(self, cur, tabela, coluna, valores, tipo=str, bloco=1000, colunas=None, travar=False,
+                            filtro=None):
+        """
+        Linhas de `tabela` cujo `coluna` está em `valores` (consultas IN por blocos), com `colunas`
+        (padrão: só `coluna` AS valor) e a condição extra `filtro`. `travar` faz FOR UPDATE, para
+        uso dentro de transações.
+        """
+        valores = [v for v in valores if tipo is str or str(v).isdigit()]
+        selecao = colunas or f"{coluna} AS valor"
+        extra = f" AND {filtro}" if filtro else ""
+        trava = " FOR UPDATE" if travar and self.kind != 'sqlite' else ""  # no SQLite o BEGIN IMMEDIATE já trava
+        linhas = []
+        for inicio in range(0, len(valores), bloco):
+            parte = valores[inicio:inicio + bloco]
+            marcadores = ', '.join(['%s'] * len(parte))
+            cur.execute(f"SELECT {selecao} FROM {tabela} WHERE {coluna} IN ({marcadores}){extra}{trava}",
+                        [tipo(v) for v in parte])
+            linhas.extend(cur.fetchall())
+        return linhas
+
+    # ----------------------------
+    # LOTES (/api/*/batch)
+    # ----------------------------
+    @medido
+    def lote_funcionarios(self, operacoes, tudo_ou_nada=True):
+        """
+        Aplica uma lista de lote.Operacao (criar/atualizar/excluir) numa única transação, com os
+        comandos de cada tipo agrupados. `tudo_ou_nada`: qualquer erro desfaz o lote inteiro;
+        senão, só as operações com erro ficam de fora. Retorna o relatório de lote.resultado.
+        """
+        lote.validar_funcionarios(operacoes)
+        return self._executar_lote(operacoes, tudo_ou_nada, self._aplicar_lote_funcionarios)
+
+    @medido
+    def lote_cargos(self, operacoes, tudo_ou_nada=True):
+        """Como lote_funcionarios, para cargos."""
+        lote.validar_cargos(operacoes)
+        return self._executar_lote(operacoes, tudo_ou_nada, self._aplicar_lote_cargos)
+
+    def _executar_lote(self, operacoes, tudo_ou_nada, aplicar):
+        if any(op.erro for op in operacoes) if tudo_ou_nada else all(op.erro for op in operacoes):
+            # erro de validação (em por_item, em todas as operações): o banco nem é tocado
+            return lote.resultado(operacoes, aplicado=False)
         try:
-            return (calc_digito(cpf, 10) == int(cpf[9]) and
-                    calc_digito(cpf, 11) == int(cpf[10]))
-        except Exception:
-            return False
+            with self.transacao() as conn, conn.cursor() as cur:
+                tabela, delta, chaves, deltas_resumo = aplicar(conn, cur, [op for op in operacoes if not op.erro])
+                if tudo_ou_nada and any(op.erro for op in operacoes):
+                    raise lote.LoteRejeitado()
+                if chaves:
+                    self._ajustar_resumo(cur, deltas_resumo)
+                    # uma versão/evento por lote, não por operação
+                    self._registrar_escrita(cur, tabela, delta, chave=chaves)
+        except lote.LoteRejeitado:
+            return lote.resultado(operacoes, aplicado=False)
+        # por_item em que todas falharam no banco: nada foi gravado, não é sucesso
+        return lote.resultado(operacoes, aplicado=not all(op.erro for op in operacoes))
+
+    def _em_grupo(self, cur, itens, agrupado, individual, erro):
+        """
+        Executa `itens` [(operacao, parametros)] com um comando agrupado. Se ele violar UNIQUE/FK,
+        refaz item a item sob savepoints para marcar só as operações culpadas (com `erro`).
+        Retorna as operações aplicadas.
+        """
+        if not itens:
+            return []
+        cur.execute("SAVEPOINT lote")
+        try:
+            agrupado([params for _, params in itens])
+            cur.execute("RELEASE SAVEPOINT lote")
+            return [op for op, _ in itens]
+        except ERROS_INTEGRIDADE:
+            cur.execute("ROLLBACK TO SAVEPOINT lote")
+        aplicadas = []
+        for op, params in itens:
+            cur.execute("SAVEPOINT item")
+            try:
+                individual(params)
+            except ERROS_INTEGRIDADE:
+                cur.execute("ROLLBACK TO SAVEPOINT item")
+                op.erro = erro
+                continue
+            cur.execute("RELEASE SAVEPOINT item")
+            aplicadas.append(op)
+        cur.execute("RELEASE SAVEPOINT lote")
+        return aplicadas
+
+    def _aplicar_lote_funcionarios(self, conn, cur, operacoes):
+        criar = [op for op in operacoes if op.op == 'criar']
+        alterar = [op for op in operacoes if op.op != 'criar']
+
+        # uma leitura (travada) para todos os ids: existência e cargo anterior de cada funcionário
+        # (desligados contam como inexistentes)
+        somente_ativos = "ativo = TRUE" if self._arquivo_ativo() else None
+        atuais = {linha['id']: linha['cargo_id'] for linha in self._linhas_por_valores(
+            cur, 'funcionarios', 'id', [op.id for op in alterar], int, colunas='id, cargo_id', travar=True,
+            filtro=somente_ativos)}
+        cargos = {int(linha['valor']) for linha in self._linhas_por_valores(
+            cur, 'cargos', 'id', {op.dados['cargo_id'] for op in operacoes if op.op != 'excluir'}, int)}
+        for op in operacoes:
+            if op.op != 'criar' and op.id not in atuais:
+                op.erro = 'Funcionário não encontrado'
+            elif op.op != 'excluir' and int(op.dados['cargo_id']) not in cargos:
+                op.erro = 'Cargo não encontrado'
+
+        def valores(op):
+            return tuple(op.dados.get(c) or None for c in self.COLUNAS_FUNCIONARIO)
+
+        colunas = self.COLUNAS_FUNCIONARIO
+        criados = self._em_grupo(
+            cur, [(op, valores(op)) for op in criar if not op.erro],
+            lambda linhas: conn.inserir_varios(cur, 'funcionarios', colunas, linhas),
+            lambda linha: conn.inserir_varios(cur, 'funcionarios', colunas, [linha]),
+            'CPF já cadastrado',
+        )
+        # ids dos criados pelo CPF (único), numa consulta só
+        por_cpf = {linha['cpf']: linha['id'] for linha in self._linhas_por_valores(
+            cur, 'funcionarios', 'cpf', [op.dados['cpf'] for op in criados], colunas='id, cpf')}
+        for op in criados:
+            op.id_criado = por_cpf.get(op.dados['cpf'])
+
+        atribuicoes = ', '.join(f"{c}=%s" for c in colunas)
+        sql_atualizar = f"UPDATE funcionarios SET {atribuicoes} WHERE id=%s"
+        atualizados = self._em_grupo(
+            cur, [(op, valores(op) + (op.id,)) for op in alterar if op.op == 'atualizar' and not op.erro],
+            lambda linhas: conn.executar_varios(cur, sql_atualizar, linhas),
+            lambda linha: cur.execute(sql_atualizar, linha),
+            'CPF já cadastrado',
+        )
+
+        excluir = [op for op in alterar if op.op == 'excluir' and not op.erro]
+        if excluir:
+            for inicio in range(0, len(excluir), 1000):
+                parte = [op.id for op in excluir[inicio:inicio + 1000]]
+                if somente_ativos:
+                    cur.execute(arquivo.sql_desligar(len(parte)), parte)
+                else:
+                    cur.execute(f"DELETE FROM funcionarios WHERE id IN ({', '.join(['%s'] * len(parte))})", parte)
+
+        deltas = Counter()
+        for op in criados:
+            deltas[int(op.dados['cargo_id'])] += 1
+        for op in atualizados:
+            deltas[atuais[op.id]] -= 1
+            deltas[int(op.dados['cargo_id'])] += 1
+        for op in excluir:
+            deltas[atuais[op.id]] -= 1
+        chaves = [op.id_criado for op in criados] + [op.id for op in atualizados + excluir]
+        return 'funcionarios', len(criados) - len(excluir), chaves, deltas
+
+    def _aplicar_lote_cargos(self, conn, cur, operacoes):
+        alterar = [op for op in operacoes if op.op != 'criar']
+        existentes = {int(linha['valor']) for linha in self._linhas_por_valores(
+            cur, 'cargos', 'id', [op.id for op in alterar], int, travar=True)}
+        for op in alterar:
+            if op.id not in existentes:
+                op.erro = 'Cargo não encontrado'
+
+        def valores(op):
+            return (op.dados.get('nome'), op.dados.get('salario'), op.dados.get('descricao'))
+
+        # cada criação precisa do id gerado: um INSERT por cargo, mas todos na mesma transação
+        sql_inserir = "INSERT INTO cargos (nome, salario, descricao) VALUES (%s, %s, %s)"
+        criados = [op for op in operacoes if op.op == 'criar']
+        for op in criados:
+            if self.kind == 'postgres':
+                cur.execute(sql_inserir + " RETURNING id", valores(op))
+                op.id_criado = cur.fetchone()['id']
+            else:
+                cur.execute(sql_inserir, valores(op))
+                op.id_criado = cur.lastrowid
+
+        sql_atualizar = "UPDATE cargos SET nome=%s, salario=%s, descricao=%s WHERE id=%s"
+        atualizados = [op for op in alterar if op.op == 'atualizar' and not op.erro]
+        if atualizados:
+            conn.executar_varios(cur, sql_atualizar, [valores(op) + (op.id,) for op in atualizados])
+
+        arquivados = {}
+
+        def excluir_varios(ids):
+            # dentro do savepoint: se a exclusão falhar, a ida dos desligados para o arquivo é desfeita junto
+            for cargo_id in ids:
+                arquivados[cargo_id] = self._arquivar_desligados_do_cargo(cur, [cargo_id])
+            cur.execute(f"DELETE FROM cargos WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+        excluidos = self._em_grupo(
+            cur, [(op, op.id) for op in alterar if op.op == 'excluir' and not op.erro],
+            excluir_varios,
+            lambda cargo_id: excluir_varios([cargo_id]),
+            'Não é possível excluir este cargo: existem funcionários ativos vinculados.',
+        )
+        if any(arquivados.get(op.id) for op in excluidos):
+            self._registrar_versao(cur, 'funcionarios')
+        chaves = [op.id_criado for op in criados] + [op.id for op in atualizados + excluidos]
+        return 'cargos', len(criados) - len(excluidos), chaves, {}
+
+    # ----------------------------
+    # RELATÓRIO
+    # ----------------------------
+    @medido
+    def gerar_relatorio(self, nome='', cargo_id=None, limite=LIMITE_PADRAO, apos=None, agregados=False):
+        """
+        Página do relatório com os filtros aplicados no banco: {'itens', 'next_cursor'}
+        e, se `agregados`, os totais por cargo (quantidade e soma/média/mín/máx de salário).
+        """
+        clausulas, params = filtro_funcionarios(self.kind, nome, somente_ativos=self._arquivo_ativo())
+        if cargo_id is not None:
+            clausulas.append("f.cargo_id = %s")
+            params.append(cargo_id)
+        where = (" WHERE " + " AND ".join(clausulas)) if clausulas else ""
+
+        pagina_clausulas, pagina_params = list(clausulas), list(params)
+        apos_id = decodificar_cursor(apos)
+        if apos_id is not None:
+            pagina_clausulas.append("f.id < %s")
+            pagina_params.append(apos_id)
+        pagina_where = (" WHERE " + " AND ".join(pagina_clausulas)) if pagina_clausulas else ""
+
+        with self.leitura('funcionarios', 'cargos') as conn, conn.cursor() as cur:
+            cur.execute(f"""SELECT f.id, f.nome, f.telefone, f.cargo_id,
+                                   c.nome AS cargo_nome, c.salario AS cargo_salario
+                            FROM funcionarios f
+                            JOIN cargos c ON f.cargo_id = c.id{pagina_where}
+                            ORDER BY f.id DESC
+                            LIMIT %s""", pagina_params + [limite + 1])
+            resultado = montar_pagina(cur.fetchall(), limite)
+
+            if agregados and not nome and self._resumo_ativo():
+                # sem filtro de nome, os totais saem do resumo por cargo: uma linha por cargo
+                filtro_cargo = " AND c.id = %s" if cargo_id is not None else ""
+                cur.execute(f"""SELECT c.id AS cargo_id, c.nome AS cargo_nome,
+                                       r.quantidade,
+                                       r.quantidade * c.salario AS salario_total,
+                                       c.salario AS salario_medio,
+                                       c.salario AS salario_minimo,
+                                       c.salario AS salario_maximo
+                                FROM resumo_cargos r
+                                JOIN cargos c ON c.id = r.cargo_id
+                                WHERE r.quantidade > 0{filtro_cargo}
+                                ORDER BY c.nome""", [cargo_id] if cargo_id is not None else [])
+                resultado['agregados'] = cur.fetchall()
+            elif agregados:
+                cur.execute(f"""SELECT c.id AS cargo_id, c.nome AS cargo_nome,
+                                       COUNT(*) AS quantidade,
+                                       SUM(c.salario) AS salario_total,
+                                       AVG(c.salario) AS salario_medio,
+                                       MIN(c.salario) AS salario_minimo,
+                                       MAX(c.salario) AS salario_maximo
+                                FROM funcionarios f
+                                JOIN cargos c ON f.cargo_id = c.id{where}
+                                GROUP BY c.id, c.nome
+                                ORDER BY c.nome""", params)
+                resultado['agregados'] = cur.fetchall()
+        return resultado
+
+    # ----------------------------
+    # VALIDAÇÃO DE CPF
+    # ----------------------------
+    def validar_cpf(self, cpf: str) -> bool:
+        return validar_cpf(cpf)
@@ -0,0 +1,562 @@
+# services/db_async.py
+"""
+AsyncDatabase: a mesma superfície do Database (cargos, funcionários, contagens) para o modo
+ASGI (asgi.py), sobre drivers assíncronos e um AsyncConnectionPool.
+
+    MySQL    -> aiomysql
+    Postgres -> asyncpg
+    SQLite   -> sqlite3 da biblioteca padrão, com cada chamada numa thread (asyncio.to_thread);
+                serve para rodar e testar o modo async sem servidor de banco
+
+Uma consulta lenta segura uma conexão do pool, não uma thread: as demais requisições
+continuam sendo atendidas pelo mesmo processo e só esperam (como corrotinas) quando todas
+as DB_ASYNC_POOL_MAX conexões estão ocupadas.
+
+As escritas mantêm `versoes_tabelas` e `resumo_cargos` como o Database, então workers
+síncronos e assíncronos podem apontar para o mesmo banco. Réplicas de leitura, cache de
+cargos e eventos SSE continuam só no modo WSGI.
+"""
+import asyncio
+import datetime
+import decimal
+import os
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+
+from services import arquivo, resumo, sqlite
+from services.contadores import ContadorTabelas
+from services.cpf import validar_cpf
+from services.db import ERROS_CONEXAO, ERROS_INTEGRIDADE, TIMEOUT_CONEXAO, Database
+from services.metricas import medido
+from services.paginacao import LIMITE_PADRAO, decodificar_cursor, montar_pagina
+from services.pool_async import AsyncConnectionPool
+
+# Dependências opcionais
+try:
+    import aiomysql
+except Exception:
+    aiomysql = None
+
+try:
+    import asyncpg
+except Exception:
+    asyncpg = None
+
+# aiomysql levanta as exceções do pymysql, já presentes em ERROS_CONEXAO / ERROS_INTEGRIDADE
+ERROS_CONEXAO_ASYNC = ERROS_CONEXAO + (
+    (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, ConnectionError) if asyncpg else (ConnectionError,)
+)
+ERROS_INTEGRIDADE_ASYNC = ERROS_INTEGRIDADE + (
+    (asyncpg.IntegrityConstraintViolationError,) if asyncpg else ()
+)
+
+_MARCADOR = re.compile(r'%s')
+
+
+# ----------------------------
+# CONEXÕES
+# ----------------------------
+class _ConexaoAsync:
+    """Interface comum das conexões do AsyncConnectionPool (linhas sempre como dict)."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.quebrada = False
+        self.pendentes = None  # ajustes em memória adiados até o COMMIT (transacao())
+        self.em_transacao = False
+        self.criado_em = self.usado_em = time.monotonic()
+
+    async def consultar_um(self, sql, params=()):
+        linhas = await self.consultar(sql, params)
+        return linhas[0] if linhas else None
+
+    async def inserir(self, sql, params=()):
+        """INSERT que devolve o id gerado."""
+        _, lastrowid = await self.executar(sql, params)
+        return lastrowid
+
+
+class ConexaoMySQL(_ConexaoAsync):
+    async def consultar(self, sql, params=()):
+        async with self._conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return list(await cur.fetchall())
+
+    async def executar(self, sql, params=()):
+        """-> (linhas afetadas, lastrowid)"""
+        async with self._conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return cur.rowcount, cur.lastrowid
+
+    async def begin(self):
+        await self._conn.begin()
+        self.em_transacao = True
+
+    async def commit(self):
+        self.em_transacao = False
+        await self._conn.commit()
+
+    async def rollback(self):
+        self.em_transacao = False
+        await self._conn.rollback()
+
+    async def ping(self):
+        try:
+            await self._conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        await self._conn.ensure_closed()
+
+
+class ConexaoPostgres(_ConexaoAsync):
+    """asyncpg usa $1, $2...: os `%s` das consultas compartilhadas com o Database são numerados aqui."""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._transacao = None
+
+    @staticmethod
+    def _numerar(sql):
+        contador = iter(range(1, 10_000))
+        return _MARCADOR.sub(lambda _: f"${next(contador)}", sql)
+
+    async def consultar(self, sql, params=()):
+        return [dict(linha) for linha in await self._conn.fetch(self._numerar(sql), *params)]
+
+    async def executar(self, sql, params=()):
+        status = await self._conn.execute(self._numerar(sql), *params)
+        # status do comando, ex.: "UPDATE 1" / "DELETE 0"
+        ultimo = status.rsplit(' ', 1)[-1]
+        return (int(ultimo) if ultimo.isdigit() else 0), None
+
+    async def inserir(self, sql, params=()):
+        return await self._conn.fetchval(self._numerar(sql + " RETURNING id"), *params)
+
+    async def begin(self):
+        self._transacao = self._conn.transaction()
+        await self._transacao.start()
+        self.em_transacao = True
+
+    async def commit(self):
+        self.em_transacao = False
+        transacao, self._transacao = self._transacao, None
+        await transacao.commit()
+
+    async def rollback(self):
+        self.em_transacao = False
+        transacao, self._transacao = self._transacao, None
+        if transacao is not None:
+            await transacao.rollback()
+
+    async def ping(self):
+        try:
+            await self._conn.fetchval("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        await self._conn.close()
+
+
+class ConexaoSQLite(_ConexaoAsync):
+    """sqlite3 numa thread por chamada: o event loop não para enquanto o SQLite lê o disco."""
+
+    def _executar(self, sql, params, buscar):
+        cur = sqlite.CursorSQLite(self._conn.cursor())
+        cur.execute(sql, params)
+        if buscar:
+            return cur.fetchall()
+        return cur.rowcount, cur.lastrowid
+
+    async def consultar(self, sql, params=()):
+        return await asyncio.to_thread(self._executar, sql, params, True)
+
+    async def executar(self, sql, params=()):
+        return await asyncio.to_thread(self._executar, sql, params, False)
+
+    async def begin(self):
+        await asyncio.to_thread(self._conn.execute, "BEGIN IMMEDIATE")
+        self.em_transacao = True
+
+    async def commit(self):
+        self.em_transacao = False
+        await asyncio.to_thread(self._conn.commit)
+
+    async def rollback(self):
+        self.em_transacao = False
+        await asyncio.to_thread(self._conn.rollback)
+
+    async def ping(self):
+        try:
+            await asyncio.to_thread(self._conn.execute, "SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        self._conn.close()
+
+
+# ----------------------------
+# DATABASE
+# ----------------------------
+class AsyncDatabase:
+    # SQL compartilhado com o Database (esses métodos só dependem de self.kind e self.tabelas_existentes)
+    COLUNAS_FUNCIONARIO = Database.COLUNAS_FUNCIONARIO
+    TABELAS_CONTADAS = Database.TABELAS_CONTADAS
+    _resolver_parametros = Database._resolver_parametros
+    _parametros_da_url = staticmethod(Database._parametros_da_url)
+    _sql_tabelas = Database._sql_tabelas
+    _consulta_cargos = Database._consulta_cargos
+    _consulta_funcionarios = Database._consulta_funcionarios
+    _resumo_ativo = Database._resumo_ativo
+    _arquivo_ativo = Database._arquivo_ativo
+    validar_cpf = staticmethod(validar_cpf)
+
+    def __init__(self, host=None, port=None, user=None, password=None, database=None,
+                 pool_min=None, pool_max=None, pool_timeout=None, pool_reciclar=None):
+        """
+        Mesma resolução de conexão do Database (DATABASE_URL ou DB_HOST/DB_PORT/...). Nada é
+        aberto aqui: o pool conecta sob demanda ou em `aquecer()`.
+
+        Pool: DB_ASYNC_POOL_MIN / DB_ASYNC_POOL_MAX (padrão 1 / 50), DB_POOL_TIMEOUT e
+        DB_POOL_RECICLAR como no modo síncrono.
+        """
+        self.kind, self._parametros = self._resolver_parametros(host, port, user, password, database)
+        if self.kind == 'mysql' and aiomysql is None:
+            raise RuntimeError("aiomysql não instalado. Rode: pip install aiomysql")
+        if self.kind == 'postgres' and asyncpg is None:
+            raise RuntimeError("asyncpg não instalado. Rode: pip install asyncpg")
+        self._schema_sqlite_pronto = False
+        self.pool = AsyncConnectionPool(
+            self._nova_conexao,
+            minimo=pool_min if pool_min is not None else int(os.getenv("DB_ASYNC_POOL_MIN", 1)),
+            maximo=pool_max if pool_max is not None else int(os.getenv("DB_ASYNC_POOL_MAX", 50)),
+            timeout=pool_timeout if pool_timeout is not None else float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            reciclar=pool_reciclar if pool_reciclar is not None else int(os.getenv("DB_POOL_RECICLAR", 1800)),
+            erros_conexao=ERROS_CONEXAO_ASYNC,
+        )
+        self.tabelas_existentes = None
+        self.inicializado = False
+        self.ultimo_erro = None
+        self._lock_inicializacao = None
+        self._recarga_contagens = None
+        self.contadores = ContadorTabelas(None, ttl=float(os.getenv("COUNTS_TTL", 30)))
+
+    async def _nova_conexao(self):
+        if self.kind == 'sqlite':
+            conn = await asyncio.to_thread(sqlite.conectar, **self._parametros)
+            if not self._schema_sqlite_pronto:
+                await asyncio.to_thread(sqlite.criar_schema, conn)
+                self._schema_sqlite_pronto = True
+            return ConexaoSQLite(conn)
+
+        parametros = self._parametros
+        if self.kind == 'postgres':
+            conn = await asyncpg.connect(
+                host=parametros['host'], port=parametros['port'], user=parametros['user'],
+                password=parametros['password'], database=parametros['dbname'],
+                ssl=parametros.get('sslmode'), timeout=TIMEOUT_CONEXAO,
+            )
+            return ConexaoPostgres(conn)
+
+        conn = await aiomysql.connect(
+            host=parametros['host'], port=parametros['port'], user=parametros['user'],
+            password=parametros['password'], db=parametros['database'],
+            connect_timeout=TIMEOUT_CONEXAO, cursorclass=aiomysql.DictCursor, autocommit=True,
+        )
+        return ConexaoMySQL(conn)
+
+    # ----------------------------
+    # CICLO DE VIDA
+    # ----------------------------
+    async def _inicializar(self):
+        """Descobre as tabelas existentes na primeira conexão (uma vez por processo)."""
+        if self.inicializado:
+            return
+        if self._lock_inicializacao is None:
+            self._lock_inicializacao = asyncio.Lock()
+        async with self._lock_inicializacao:
+            if self.inicializado:
+                return
+            async with self.pool.conexao() as conn:
+                linhas = await conn.consultar(self._sql_tabelas())
+            self.tabelas_existentes = {linha['nome'] for linha in linhas}
+            self.inicializado = True
+
+    async def aquecer(self, tentativas=None, atraso_base=0.5, atraso_maximo=30.0):
+        """
+        Abre o pool com backoff exponencial + jitter (como Database._aquecer); chamado em segundo
+        plano no startup do ASGI. Desiste após `tentativas` (DB_AQUECER_TENTATIVAS, padrão 10;
+        0 = até conseguir): o /readyz segue 503 com o último erro, e cada verificação tenta de novo.
+        """
+        if tentativas is None:
+            tentativas = int(os.getenv("DB_AQUECER_TENTATIVAS", 10)) or None
+        tentativa = 0
+        while True:
+            try:
+                await self._inicializar()
+                await self.pool.preencher()
+                self.ultimo_erro = None
+                print(f"[AsyncDatabase] ✅ Conectado ({self.kind}, pool de até {self.pool.maximo} conexões)")
+                return
+            except Exception as e:
+                self.ultimo_erro = str(e) or type(e).__name__
+                tentativa += 1
+                if tentativas is not None and tentativa >= tentativas:
+                    print(f"[AsyncDatabase] ❌ Aquecimento encerrado após {tentativa} tentativas: {e} "
+                          f"(o /readyz fica em 503 até o banco responder)")
+                    return
+                # jitter "cheio": workers do Uvicorn que subiram juntos não reconectam no mesmo instante
+                espera = random.uniform(0, min(atraso_maximo, atraso_base * 2 ** tentativa))
+                print(f"[AsyncDatabase] ❌ Falha na conexão (tentativa {tentativa}): {e}; nova tentativa em {espera:.1f}s")
+                await asyncio.sleep(espera)
+
+    async def fechar(self):
+        await self.pool.fechar()
+
+    async def verificar_prontidao(self, timeout=2.0):
+        """Para o /readyz: (pronto, detalhes), como Database.verificar_prontidao."""
+        detalhes = {'motor': self.kind, 'modo': 'async'}
+        try:
+            await self._inicializar()
+            async with self.pool.conexao(timeout=timeout) as conn:
+                if not await conn.ping():
+                    raise RuntimeError("ping sem resposta")
+            detalhes['banco'] = 'ok'
+        except Exception as e:
+            detalhes['banco'] = 'indisponivel'
+            detalhes['erro'] = str(e) or type(e).__name__
+            if self.ultimo_erro:
+                detalhes['ultimo_erro_aquecimento'] = self.ultimo_erro
+        detalhes['pool'] = self.pool.estatisticas()
+        aquecido = detalhes['pool']['total'] >= detalhes['pool']['minimo']
+        detalhes['pool_aquecido'] = aquecido
+        return detalhes['banco'] == 'ok' and aquecido, detalhes
+
+    def estatisticas(self):
+        return {'pool': self.pool.estatisticas()}
+
+    @asynccontextmanager
+    async def conexao(self):
+        """`async with db.conexao() as conn:` (autocommit)."""
+        await self._inicializar()
+        async with self.pool.conexao() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def transacao(self):
+        """Conexão dentro de uma transação: commit ao sair do bloco, rollback em erro."""
+        await self._inicializar()
+        async with self.pool.conexao() as conn:
+            conn.pendentes = []
+            await conn.begin()
+            try:
+                yield conn
+            except BaseException:
+                conn.pendentes = None
+                try:
+                    await conn.rollback()
+                except Exception:
+                    conn.quebrada = True
+                raise
+            await conn.commit()
+            pendentes, conn.pendentes = conn.pendentes, None
+        # contagens em memória só com o que foi confirmado (no rollback, descartadas)
+        for tabela, delta in pendentes:
+            self.contadores.ajustar(tabela, delta)
+
+    # ----------------------------
+    # CARGOS
+    # ----------------------------
+    @medido
+    async def buscar_cargos_por_nome(self, nome=''):
+        async with self.conexao() as conn:
+            return await conn.consultar(*self._consulta_cargos(nome))
+
+    @medido
+    async def paginar_cargos(self, nome='', limite=LIMITE_PADRAO, apos=None):
+        """Página de cargos em `id DESC` a partir do cursor `apos`: {'itens', 'next_cursor'}."""
+        async with self.conexao() as conn:
+            linhas = await conn.consultar(*self._consulta_cargos(nome, decodificar_cursor(apos), limite + 1))
+        return montar_pagina(linhas, limite)
+
+    @medido
+    async def buscar_cargo(self, cargo_id):
+        async with self.conexao() as conn:
+            return await conn.consultar_um("SELECT * FROM cargos WHERE id = %s", (cargo_id,))
+
+    @medido
+    async def inserir_cargo(self, nome, salario, descricao):
+        async with self.transacao() as conn:
+            cargo_id = await conn.inserir("INSERT INTO cargos (nome, salario, descricao) VALUES (%s, %s, %s)",
+                                          (nome, self._numerico(salario), descricao))
+            await self._registrar_escrita(conn, 'cargos', +1)
+            return cargo_id
+
+    @medido
+    async def atualizar_cargo(self, cargo_id, nome, salario, descricao):
+        async with self.transacao() as conn:
+            alteradas, _ = await conn.executar(
+                "UPDATE cargos SET nome=%s, salario=%s, descricao=%s WHERE id=%s",
+                (nome, self._numerico(salario), descricao, cargo_id))
+            if alteradas:
+                await self._registrar_escrita(conn, 'cargos')
+            return alteradas > 0
+
+    @medido
+    async def deletar_cargo(self, cargo_id):
+        """Como Database.deletar_cargo: só ativos impedem; desligados do cargo vão para o arquivo."""
+        async with self.transacao() as conn:
+            if self._arquivo_ativo():
+                desligados = [linha['id'] for linha in
+                              await conn.consultar(arquivo.sql_desligados_do_cargo(self.kind), (cargo_id,))]
+                if desligados:
+                    for sql in arquivo.sql_mover(len(desligados)):
+                        await conn.executar(sql, tuple(desligados))
+                    await self._registrar_escrita(conn, 'funcionarios')
+            removidas, _ = await conn.executar("DELETE FROM cargos WHERE id = %s", (cargo_id,))
+            if removidas:
+                await self._registrar_escrita(conn, 'cargos', -1)
+            return removidas > 0
+
+    # ----------------------------
+    # FUNCIONÁRIOS
+    # ----------------------------
+    @medido
+    async def buscar_funcionarios(self, nome='', cpf='', incluir_arquivados=False):
+        async with self.conexao() as conn:
+            return await conn.consultar(*self._consulta_funcionarios(nome, cpf, incluir_arquivados=incluir_arquivados))
+
+    @medido
+    async def paginar_funcionarios(self, nome='', cpf='', limite=LIMITE_PADRAO, apos=None, incluir_arquivados=False):
+        """Página de funcionários em `id DESC` a partir do cursor `apos`: {'itens', 'next_cursor'}."""
+        async with self.conexao() as conn:
+            linhas = await conn.consultar(*self._consulta_funcionarios(nome, cpf, decodificar_cursor(apos), limite + 1,
+                                                                       incluir_arquivados))
+        return montar_pagina(linhas, limite)
+
+    @medido
+    async def inserir_funcionario(self, nome, data_nascimento, endereco, cpf, email, telefone, cargo_id):
+        if not self.validar_cpf(cpf):
+            raise ValueError("CPF inválido")
+        valores = _valores_funcionario(dict(nome=nome, data_nascimento=data_nascimento, endereco=endereco,
+                                            cpf=cpf, email=email, telefone=telefone, cargo_id=cargo_id))
+        async with self.transacao() as conn:
+            func_id = await conn.inserir(
+                f"INSERT INTO funcionarios ({', '.join(self.COLUNAS_FUNCIONARIO)}) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                valores)
+            await self._ajustar_resumo(conn, {valores[-1]: +1})
+            await self._registrar_escrita(conn, 'funcionarios', +1)
+            return func_id
+
+    @medido
+    async def atualizar_funcionario(self, func_id, data):
+        cpf = data.get('cpf')
+        if cpf and not self.validar_cpf(cpf):
+            raise ValueError("CPF inválido")
+        valores = _valores_funcionario(data)
+        async with self.transacao() as conn:
+            anterior = None
+            if self._resumo_ativo():
+                anterior = await self._cargo_do_funcionario(conn, func_id)
+                if anterior is None:
+                    return False
+            atribuicoes = ', '.join(f"{c}=%s" for c in self.COLUNAS_FUNCIONARIO)
+            ativo = " AND ativo = TRUE" if self._arquivo_ativo() else ""
+            alteradas, _ = await conn.executar(f"UPDATE funcionarios SET {atribuicoes} WHERE id=%s{ativo}",
+                                               valores + (func_id,))
+            if alteradas:
+                novo = valores[-1]
+                if anterior is not None and str(anterior) != str(novo):
+                    await self._ajustar_resumo(conn, {anterior: -1, novo: +1})
+                await self._registrar_escrita(conn, 'funcionarios')
+            return alteradas > 0
+
+    @medido
+    async def deletar_funcionario(self, func_id):
+        async with self.transacao() as conn:
+            cargo_id = await self._cargo_do_funcionario(conn, func_id) if self._resumo_ativo() else None
+            sql = arquivo.sql_desligar() if self._arquivo_ativo() else "DELETE FROM funcionarios WHERE id=%s"
+            removidas, _ = await conn.executar(sql, (func_id,))
+            if removidas:
+                if cargo_id is not None:
+                    await self._ajustar_resumo(conn, {cargo_id: -1})
+                await self._registrar_escrita(conn, 'funcionarios', -1)
+            return removidas > 0
+
+    def _numerico(self, valor):
+        # asyncpg não converte str/float para NUMERIC sozinho; o sqlite3 não aceita Decimal
+        if self.kind != 'postgres' or valor is None or isinstance(valor, decimal.Decimal):
+            return valor
+        return decimal.Decimal(str(valor))
+
+    async def _cargo_do_funcionario(self, conn, func_id):
+        trava = "" if self.kind == 'sqlite' else " FOR UPDATE"  # no SQLite o BEGIN IMMEDIATE já trava
+        ativo = " AND ativo = TRUE" if self._arquivo_ativo() else ""
+        linha = await conn.consultar_um(f"SELECT cargo_id FROM funcionarios WHERE id = %s{ativo}{trava}", (func_id,))
+        return linha['cargo_id'] if linha else None
+
+    async def _ajustar_resumo(self, conn, deltas):
+        if not self._resumo_ativo():
+            return
+        # mesma ordem de cargo_id do Database: as duas implementações não se travam mutuamente
+        for cargo_id, delta in sorted((int(c), d) for c, d in deltas.items() if d):
+            await conn.executar(resumo.sql_ajuste(self.kind), (cargo_id, delta))
+
+    async def _registrar_escrita(self, conn, tabela, delta=0):
+        """Versão compartilhada da tabela (caches dos workers WSGI) e contagem local (após o COMMIT)."""
+        if 'versoes_tabelas' in self.tabelas_existentes:
+            await conn.executar("UPDATE versoes_tabelas SET versao = versao + 1 WHERE tabela = %s", (tabela,))
+        if delta:
+            conn.pendentes.append((tabela, delta))
+
+    # ----------------------------
+    # CONTAGENS
+    # ----------------------------
+    @medido
+    async def contar_registros(self):
+        """({tabela: total}, etag) com o mesmo cache/TTL do Database.contar_registros."""
+        snapshot = self.contadores.atual()
+        if snapshot:
+            return snapshot
+        if self._recarga_contagens is None:
+            self._recarga_contagens = asyncio.Lock()
+        # uma corrotina recarrega; as demais aguardam e reaproveitam o resultado
+        async with self._recarga_contagens:
+            return self.contadores.atual() or self.contadores.definir(await self._contar_no_banco())
+
+    async def _contar_no_banco(self):
+        resultado = {}
+        async with self.conexao() as conn:
+            for tabela in self.TABELAS_CONTADAS:
+                if tabela not in self.tabelas_existentes:
+                    resultado[tabela] = None
+                    continue
+                filtro = " WHERE ativo = TRUE" if tabela == 'funcionarios' and self._arquivo_ativo() else ""
+                linha = await conn.consultar_um(f"SELECT COUNT(*) AS total FROM {tabela}{filtro}")
+                resultado[tabela] = linha['total']
+        return resultado
+
+
+def _valores_funcionario(dados):
+    """Tupla na ordem de COLUNAS_FUNCIONARIO, com os tipos que o asyncpg exige (date, int)."""
+    valores = {c: dados.get(c) or None for c in Database.COLUNAS_FUNCIONARIO}
+    nascimento = valores['data_nascimento']
+    if isinstance(nascimento, str):
+        try:
+            valores['data_nascimento'] = datetime.date.fromisoformat(nascimento)
+        except ValueError:
+            raise ValueError("data_nascimento deve estar no formato AAAA-MM-DD")
+    if valores['cargo_id'] is not None:
+        try:
+            valores['cargo_id'] = int(valores['cargo_id'])
+        except (TypeError, ValueError):
+            raise ValueError("cargo_id deve ser numérico")
+    return tuple(valores[c] for c in Database.COLUNAS_FUNCIONARIO)
@@ -0,0 +1,212 @@
+# services/eventos.py
+"""
+Server-Sent Events (/api/events): contagens e avisos de alteração empurrados para os dashboards.
+
+Um Publicador por processo faz o fan-out: cada evento é serializado uma vez, guardado num
+histórico curto e entregue a todos os assinantes, que dormem numa única Condition até o
+próximo evento ou o heartbeat. Um dashboard ocioso custa uma thread parada e um comentário
+SSE a cada `heartbeat` segundos.
+
+Escritas deste processo publicam na hora; as de outros workers são percebidas por uma thread
+observadora (uma por processo, só enquanto houver assinantes) que chama `observar()` a cada
+`intervalo` segundos. Ids de evento são `<instância>-<sequência>`: na reconexão com
+Last-Event-ID o cliente recebe o que perdeu, ou um `sincronizar` se o id é de outro processo
+ou já saiu do histórico.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+
+from services import serializacao
+
+# pedido ao navegador para esperar isso (ms) antes de reconectar
+RECONEXAO_MS = 3000
+
+
+def maximo_conexoes(configurado=None, threads=None):
+    """
+    Conexões SSE por processo: SSE_MAX_CONEXOES, limitado à metade das threads do worker
+    (GUNICORN_THREADS, o mesmo do Dockerfile). Cada conexão prende uma thread; sem o teto, os
+    dashboards ocupariam todas e o resto da API ficaria sem quem atender.
+    """
+    if configurado is None:
+        configurado = int(os.getenv("SSE_MAX_CONEXOES", 100))
+    if threads is None:
+        threads = int(os.getenv("GUNICORN_THREADS", 32))
+    return max(1, min(configurado, threads // 2))
+
+
+def quadro(tipo, dados, id_evento=None):
+    """Um evento no formato text/event-stream."""
+    linhas = []
+    if id_evento is not None:
+        linhas.append(b"id: " + id_evento.encode())
+    linhas.append(b"event: " + tipo.encode())
+    linhas.append(b"data: " + serializacao.dumps(dados))
+    return b"\n".join(linhas) + b"\n\n"
+
+
+class Publicador:
+    def __init__(self, observar=None, estado_inicial=None, intervalo=1.0, heartbeat=15.0,
+                 historico=256, maximo_assinantes=100):
+        """
+        observar          -> callable sem argumentos -> [(tipo, dados)]: mudanças vindas de fora do processo
+        estado_inicial    -> callable sem argumentos -> [(tipo, dados)] enviados a cada (re)conexão
+        intervalo         -> segundos entre chamadas de `observar`
+        heartbeat         -> segundos sem eventos antes de mandar um comentário (mantém proxies abertos
+                             e revela clientes desconectados)
+        historico         -> eventos guardados para reenviar na reconexão
+        maximo_assinantes -> conexões simultâneas por processo (além disso, assinar() devolve None)
+        """
+        self._observar = observar
+        self._estado_inicial = estado_inicial
+        self.intervalo = intervalo
+        self.heartbeat = heartbeat
+        self.historico = historico
+        self.maximo_assinantes = maximo_assinantes
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._eventos = deque(maxlen=self.historico)  # (sequência, quadro)
+        self._seq = 0
+        self._instancia = uuid.uuid4().hex[:8]
+        self.assinantes = 0
+        self._observando = False
+
+    def _verificar_fork(self):
+        # o filho não herda as threads (assinantes e observador) do pai
+        if self._pid != os.getpid():
+            self._reiniciar_estado()
+
+    def publicar(self, tipo, dados):
+        self._verificar_fork()
+        with self._cond:
+            self._seq += 1
+            self._eventos.append((self._seq, quadro(tipo, dados, self._id(self._seq))))
+            self._cond.notify_all()
+
+    def assinar(self, ultimo_id=None):
+        """
+        Iterável de bytes text/event-stream para um cliente, ou None se o limite de conexões foi
+        atingido. A vaga é reservada aqui, antes da resposta sair: conexões simultâneas não passam
+        do limite. Ela é liberada no fim do fluxo ou no close() do servidor, mesmo que o fluxo não
+        tenha começado.
+        """
+        self._verificar_fork()
+        with self._cond:
+            if self.assinantes >= self.maximo_assinantes:
+                return None
+            self.assinantes += 1
+        liberar = self._liberador()
+        return _Assinatura(self._fluxo(ultimo_id, liberar), liberar)
+
+    def _liberador(self):
+        liberada = []
+
+        def liberar():
+            with self._cond:
+                if not liberada:
+                    liberada.append(True)
+                    self.assinantes -= 1
+        return liberar
+
+    def estatisticas(self):
+        with self._cond:
+            return {'assinantes': self.assinantes, 'publicados': self._seq}
+
+    def _id(self, seq):
+        return f"{self._instancia}-{seq}"
+
+    def _retomar_de(self, ultimo_id):
+        """Sequência a partir da qual reenviar, ou None se o id não pode ser retomado aqui."""
+        instancia, _, seq = (ultimo_id or '').partition('-')
+        if instancia != self._instancia or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        seq = int(seq)
+        mais_antigo = self._eventos[0][0] if self._eventos else self._seq + 1
+        return seq if seq >= mais_antigo - 1 else None
+
+    def _fluxo(self, ultimo_id, liberar):
+        with self._cond:
+            retomado = self._retomar_de(ultimo_id)
+            perdidos = [q for seq, q in self._eventos if seq > retomado] if retomado is not None else []
+            visto = self._seq
+        self._garantir_observador()
+        try:
+            yield f"retry: {RECONEXAO_MS}\n\n".encode()
+            if ultimo_id and retomado is None:
+                yield quadro('sincronizar', {}, self._id(visto))
+            # o que o cliente perdeu vem antes do estado atual, para não sobrescrevê-lo com valores velhos
+            if perdidos:
+                yield b"".join(perdidos)
+            for tipo, dados in (self._estado_inicial() if self._estado_inicial else ()):
+                yield quadro(tipo, dados)
+            while True:
+                with self._cond:
+                    if self._seq == visto:
+                        self._cond.wait(self.heartbeat)
+                    mais_antigo = self._eventos[0][0] if self._eventos else self._seq + 1
+                    atrasado = visto + 1 < mais_antigo
+                    # as sequências são consecutivas: o primeiro evento novo está na posição visto+1-mais_antigo
+                    novos = [q for _, q in islice(self._eventos, max(0, visto + 1 - mais_antigo), None)]
+                    visto = self._seq
+                if atrasado:
+                    # assinante lento ficou para trás do histórico: manda recarregar tudo
+                    yield quadro('sincronizar', {}, self._id(visto))
+                elif novos:
+                    yield b"".join(novos)
+                else:
+                    yield b": ping\n\n"
+        finally:
+            liberar()
+
+    def _garantir_observador(self):
+        if self._observar is None:
+            return
+        with self._cond:
+            if self._observando:
+                return
+            self._observando = True
+        threading.Thread(target=self._observar_sempre, name='sse-observador', daemon=True).start()
+
+    def _observar_sempre(self):
+        while True:
+            time.sleep(self.intervalo)
+            with self._cond:
+                if not self.assinantes:
+                    # ninguém ouvindo: a thread termina e o processo ocioso não consulta nada
+                    self._observando = False
+                    return
+            try:
+                for tipo, dados in self._observar():
+                    self.publicar(tipo, dados)
+            except Exception as e:
+                print(f"[Eventos] ❌ Falha ao observar mudanças: {e}")
+
+
+class _Assinatura:
+    """
+    O fluxo de um assinante com a vaga já reservada. close() (chamado pelo servidor WSGI) a
+    devolve também quando o fluxo nem chegou a começar e o `finally` dele não roda.
+    """
+
+    def __init__(self, fluxo, liberar):
+        self._fluxo = fluxo
+        self._liberar = liberar
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._fluxo)
+
+    def close(self):
+        try:
+            self._fluxo.close()
+        finally:
+            self._liberar()
@@ -0,0 +1,60 @@
+# services/importacao.py
+"""
+Leitura dos arquivos aceitos por POST /api/funcionarios/bulk (CSV ou NDJSON).
+
+Os dois formatos viram a mesma lista de (número da linha, dict) consumida por
+Database.importar_funcionarios; o número da linha aparece no relatório de erros.
+"""
+import csv
+import io
+import json
+
+FORMATOS = ('csv', 'ndjson')
+
+
+def detectar_formato(content_type, formato=None):
+    if formato:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato não suportado: {formato} (use csv ou ndjson)")
+        return formato
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        return 'ndjson'
+    raise ValueError("Envie Content-Type text/csv ou application/x-ndjson")
+
+
+def ler_registros(texto, formato):
+    if formato == 'csv':
+        return _ler_csv(texto)
+    return _ler_ndjson(texto)
+
+
+def _ler_csv(texto):
+    primeira = texto.split('\n', 1)[0]
+    # planilhas em pt-BR costumam exportar com ';'
+    delimitador = ';' if primeira.count(';') > primeira.count(',') else ','
+    leitor = csv.DictReader(io.StringIO(texto), delimiter=delimitador)
+    if not leitor.fieldnames or 'cpf' not in [c.strip() for c in leitor.fieldnames]:
+        raise ValueError("CSV precisa de cabeçalho com ao menos nome, cpf e cargo_id")
+    registros = []
+    for dados in leitor:
+        # linha 1 é o cabeçalho
+        registros.append((leitor.line_num, {(k or '').strip(): (v or '').strip() for k, v in dados.items()}))
+    return registros
+
+
+def _ler_ndjson(texto):
+    registros = []
+    for numero, linha in enumerate(texto.splitlines(), start=1):
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except ValueError:
+            raise ValueError(f"JSON inválido na linha {numero}")
+        if not isinstance(dados, dict):
+            raise ValueError(f"A linha {numero} deve ser um objeto JSON")
+        registros.append((numero, dados))
+    return registros
@@ -0,0 +1,134 @@
+# services/lote.py
+"""
+Leitura e validação dos lotes de POST /api/funcionarios/batch e /api/cargos/batch.
+
+Corpo aceito:
+
+    {"modo": "tudo_ou_nada" | "por_item",
+     "operacoes": [{"op": "criar", "dados": {...}},
+                   {"op": "atualizar", "id": 7, "dados": {...}},
+                   {"op": "excluir", "id": 9}]}
+
+(ou só a lista de operações, no modo tudo_ou_nada). `atualizar` substitui o registro inteiro,
+como o PUT. Erros de formato do corpo viram ValueError (400); problemas de uma operação ficam
+em `Operacao.erro` e seguem para o relatório do lote.
+"""
+import os
+
+from services.cpf import validar_cpfs
+
+OPERACOES = ('criar', 'atualizar', 'excluir')
+MODOS = ('tudo_ou_nada', 'por_item')
+LOTE_MAXIMO = int(os.getenv("LOTE_MAXIMO", 1000))
+
+CAMPOS_FUNCIONARIO = ('nome', 'cpf', 'cargo_id')
+CAMPOS_CARGO = ('nome', 'salario')
+
+
+class LoteRejeitado(Exception):
+    """Modo tudo_ou_nada com alguma operação falhando: desfaz a transação do lote."""
+
+
+class Operacao:
+    __slots__ = ('indice', 'op', 'id', 'dados', 'erro', 'id_criado')
+
+    def __init__(self, indice, op, id_=None, dados=None, erro=None):
+        self.indice = indice
+        self.op = op
+        self.id = id_
+        self.dados = dados or {}
+        self.erro = erro
+        self.id_criado = None
+
+
+def ler_lote(corpo):
+    """Corpo JSON -> (modo, [Operacao])."""
+    if isinstance(corpo, list):
+        corpo = {'operacoes': corpo}
+    if not isinstance(corpo, dict):
+        raise ValueError("Envie um objeto JSON com 'operacoes' (lista)")
+    modo = corpo.get('modo', 'tudo_ou_nada')
+    if modo not in MODOS:
+        raise ValueError(f"modo inválido: {modo} (use {' ou '.join(MODOS)})")
+    itens = corpo.get('operacoes')
+    if not isinstance(itens, list) or not itens:
+        raise ValueError("'operacoes' deve ser uma lista não vazia")
+    if len(itens) > LOTE_MAXIMO:
+        raise ValueError(f"Lote com {len(itens)} operações; o máximo é {LOTE_MAXIMO}")
+
+    operacoes = []
+    vistos = {}
+    for indice, item in enumerate(itens):
+        if not isinstance(item, dict):
+            operacoes.append(Operacao(indice, None, erro='Operação deve ser um objeto'))
+            continue
+        op = item.get('op')
+        dados = item.get('dados')
+        id_ = item.get('id')
+        if op not in OPERACOES:
+            erro = f"op inválida: {op} (use {', '.join(OPERACOES)})"
+        elif op != 'excluir' and not isinstance(dados, dict):
+            erro = "Campo dados (objeto) é obrigatório"
+        elif op != 'criar' and (isinstance(id_, bool) or not str(id_).isdigit()):
+            erro = "Campo id (inteiro) é obrigatório"
+        elif op != 'criar' and int(id_) in vistos:
+            # a ordem entre operações do mesmo registro não é garantida dentro do lote
+            erro = f"id repetido no lote (operação {vistos[int(id_)]})"
+        else:
+            erro = None
+        if erro is None and op != 'criar':
+            id_ = int(id_)
+            vistos[id_] = indice
+        operacoes.append(Operacao(indice, op, id_ if erro is None else None, dados, erro))
+    return modo, operacoes
+
+
+def validar_funcionarios(operacoes):
+    """Campos obrigatórios e CPF (validação vetorizada) das operações de funcionário."""
+    _exigir_campos(operacoes, CAMPOS_FUNCIONARIO)
+    com_cpf = [op for op in operacoes if not op.erro and op.op != 'excluir']
+    validos, digitos = validar_cpfs([op.dados['cpf'] for op in com_cpf])
+    vistos = {}
+    for op, valido, cpf in zip(com_cpf, validos, digitos):
+        if not valido:
+            op.erro = 'CPF inválido'
+        elif not str(op.dados['cargo_id']).isdigit():
+            op.erro = 'cargo_id deve ser numérico'
+        elif cpf in vistos:
+            op.erro = f'CPF repetido no lote (operação {vistos[cpf]})'
+        else:
+            vistos[cpf] = op.indice
+
+
+def validar_cargos(operacoes):
+    _exigir_campos(operacoes, CAMPOS_CARGO)
+
+
+def _exigir_campos(operacoes, campos):
+    for op in operacoes:
+        if op.erro or op.op == 'excluir':
+            continue
+        faltando = next((c for c in campos if op.dados.get(c) in (None, '')), None)
+        if faltando:
+            op.erro = f'Campo {faltando} é obrigatório'
+
+
+def resultado(operacoes, aplicado):
+    """Relatório do lote: uma entrada por operação, na ordem recebida."""
+    itens = []
+    for op in operacoes:
+        item = {'indice': op.indice, 'op': op.op, 'id': op.id if op.id is not None else op.id_criado}
+        if op.erro:
+            item['status'] = 'erro'
+            item['erro'] = op.erro
+        else:
+            item['status'] = 'ok' if aplicado else 'nao_aplicado'
+        itens.append(item)
+    erros = sum(1 for op in operacoes if op.erro)
+    return {
+        'aplicado': aplicado,
+        'total': len(operacoes),
+        'sucesso': len(operacoes) - erros if aplicado else 0,
+        'erros': erros,
+        'resultados': itens,
+    }
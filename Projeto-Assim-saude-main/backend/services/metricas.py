@@ -0,0 +1,342 @@
+# services/metricas.py
+"""
+Métricas do processo no formato texto do Prometheus (GET /metrics), sem dependências externas.
+
+ - consultas: duração, linhas e erros por impressão digital do SQL (literais trocados por `?`,
+   então CPFs e outros valores nunca viram rótulo); consultas lentas vão para o log (SLOW_QUERY_MS)
+ - métodos do Database: duração e erros por método (decorator `medido`)
+ - requisições HTTP: latência e tamanho da resposta por rota (hooks no app.py)
+
+Cada observação custa um bisect e uma soma sob um lock por métrica, então pode ficar ligado
+em produção; METRICS_HABILITADAS=0 desliga a instrumentação do cursor e dos métodos.
+Os valores são por processo: com vários workers do Gunicorn, cada scrape vê o worker que atendeu.
+"""
+import bisect
+import functools
+import hashlib
+import inspect
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+HABILITADAS = os.getenv("METRICS_HABILITADAS", "1").lower() not in ("0", "false")
+# consultas acima deste tempo (ms) são registradas no log; 0 desliga
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+
+BUCKETS_DURACAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_LINHAS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+BUCKETS_BYTES = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(nomes, valores, extra=''):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, rotulos=(), buckets=BUCKETS_DURACAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # valores dos rótulos -> [contagens por bucket (+inf no fim), soma]
+
+    def observar(self, valores, valor):
+        posicao = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][posicao] += 1
+            serie[1] += valor
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = [(valores, list(contagens), soma) for valores, (contagens, soma) in self._series.items()]
+        for valores, contagens, soma in sorted(series):
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets, contagens):
+                acumulado += quantidade
+                le = _formatar_rotulos(self.rotulos, valores, f'le="{limite}"')
+                linhas.append(f"{self.nome}_bucket{le} {acumulado}")
+            acumulado += contagens[-1]
+            infinito = _formatar_rotulos(self.rotulos, valores, 'le="+Inf"')
+            linhas.append(f"{self.nome}_bucket{infinito} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, valores)
+            linhas.append(f"{self.nome}_sum{rotulos} {soma}")
+            linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+
+class Contador:
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def incrementar(self, valores, quantidade=1):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + quantidade
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        linhas.extend(f"{self.nome}{_formatar_rotulos(self.rotulos, v)} {total}" for v, total in series)
+        return linhas
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = []
+        self._coletores = []
+
+    def histograma(self, *args, **kwargs):
+        metrica = Histograma(*args, **kwargs)
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, *args, **kwargs):
+        metrica = Contador(*args, **kwargs)
+        self._metricas.append(metrica)
+        return metrica
+
+    def registrar_coletor(self, prefixo, coletar):
+        """
+        `coletar()` é chamado a cada scrape e devolve {grupo: {nome: valor}}; cada valor vira o gauge
+        `<prefixo>_<grupo>_<nome>` (ex.: estado do pool e do cache, lidos na hora).
+        """
+        self._coletores.append((prefixo, coletar))
+
+    def exportar(self):
+        linhas = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.exportar())
+        for prefixo, coletar in self._coletores:
+            try:
+                grupos = coletar()
+            except Exception as e:
+                print(f"[Metricas] ❌ Falha no coletor {prefixo}: {e}")
+                continue
+            for grupo, valores in grupos.items():
+                for nome, valor in valores.items():
+                    if isinstance(valor, (int, float)):
+                        linhas.append(f"# TYPE {prefixo}_{grupo}_{nome} gauge")
+                        linhas.append(f"{prefixo}_{grupo}_{nome} {valor}")
+        linhas.extend(_exportar_consultas())
+        return '\n'.join(linhas) + '\n'
+
+
+REGISTRO = Registro()
+
+CONSULTA_DURACAO = REGISTRO.histograma(
+    'db_consulta_duracao_segundos', 'Tempo de execução + leitura de cada consulta SQL', ('consulta',))
+CONSULTA_LINHAS = REGISTRO.histograma(
+    'db_consulta_linhas', 'Linhas devolvidas (ou afetadas) por consulta SQL', ('consulta',), BUCKETS_LINHAS)
+CONSULTA_ERROS = REGISTRO.contador('db_consulta_erros_total', 'Consultas SQL que falharam', ('consulta', 'erro'))
+METODO_DURACAO = REGISTRO.histograma('db_metodo_duracao_segundos', 'Duração dos métodos do Database', ('metodo',))
+METODO_ERROS = REGISTRO.contador('db_metodo_erros_total', 'Exceções saindo dos métodos do Database', ('metodo', 'erro'))
+HTTP_DURACAO = REGISTRO.histograma(
+    'http_requisicao_duracao_segundos', 'Latência das requisições por rota', ('metodo', 'rota', 'status'))
+HTTP_TAMANHO = REGISTRO.histograma(
+    'http_resposta_bytes', 'Tamanho do corpo das respostas por rota', ('metodo', 'rota'), BUCKETS_BYTES)
+
+# ----------------------------
+# Consultas
+# ----------------------------
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_ESPACOS = re.compile(r"\s+")
+# SQL gerado com os valores embutidos (execute_values) pode ter megabytes: só o começo identifica a consulta
+_TAMANHO_MAXIMO_SQL = 1024
+
+_MAXIMO_CONSULTAS = 2000
+_textos_consultas = {}
+
+
+@lru_cache(maxsize=1024)
+def _impressao_digital(sql):
+    texto = _ESPACOS.sub(' ', sql).strip()
+    texto = _LISTAS.sub('(...)', _LITERAIS.sub('?', texto))
+    digital = hashlib.blake2s(texto.encode(), digest_size=6).hexdigest()
+    if len(_textos_consultas) < _MAXIMO_CONSULTAS:
+        _textos_consultas[digital] = texto[:300]
+    return digital, texto
+
+
+def impressao_digital(sql):
+    """(id curto, texto normalizado) da consulta; o id é o rótulo `consulta` das métricas."""
+    if isinstance(sql, bytes):
+        sql = sql[:_TAMANHO_MAXIMO_SQL * 2].decode('utf-8', 'replace')
+    if len(sql) > _TAMANHO_MAXIMO_SQL:
+        # corta antes dos valores: um corte no meio de uma tupla geraria um texto diferente a cada lote
+        corte = sql.upper().find('VALUES', 0, _TAMANHO_MAXIMO_SQL)
+        sql = sql[:corte] + 'VALUES (...)' if corte >= 0 else sql[:_TAMANHO_MAXIMO_SQL]
+    return _impressao_digital(sql)
+
+
+def _exportar_consultas():
+    # liga o id de cada consulta ao seu texto normalizado, para consultar no Grafana/PromQL
+    linhas = ["# HELP db_consulta_info Texto normalizado de cada consulta", "# TYPE db_consulta_info gauge"]
+    for digital, texto in sorted(list(_textos_consultas.items())):
+        linhas.append(f'db_consulta_info{{consulta="{digital}",sql="{_escapar(texto)}"}} 1')
+    return linhas
+
+
+def registrar_consulta(digital, texto, duracao, linhas, erro=None):
+    CONSULTA_DURACAO.observar((digital,), duracao)
+    if erro is not None:
+        CONSULTA_ERROS.incrementar((digital, erro))
+    elif linhas is not None:
+        CONSULTA_LINHAS.observar((digital,), linhas)
+    if SLOW_QUERY_MS and duracao * 1000 >= SLOW_QUERY_MS:
+        # só o texto normalizado: parâmetros (CPF, e-mail...) não vão para o log
+        print(f"[SlowQuery] {duracao * 1000:.1f}ms linhas={linhas} consulta={digital} {texto[:500]}")
+
+
+class CursorInstrumentado:
+    """
+    Envolve o cursor do driver medindo cada consulta. A duração soma o execute e os fetch
+    seguintes (relevante nos cursores de servidor); a consulta é registrada no próximo
+    execute ou no close.
+    """
+
+    def __init__(self, cursor):
+        self._cur = cursor
+        self._consulta = None
+        self._duracao = 0.0
+        self._linhas = None
+
+    def execute(self, sql, params=None):
+        return self._executar(self._cur.execute, sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self._executar(self._cur.executemany, sql, seq_params)
+
+    def _executar(self, metodo, sql, params):
+        self._registrar()
+        digital, texto = impressao_digital(sql)
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(sql, params)
+        except Exception as e:
+            registrar_consulta(digital, texto, time.perf_counter() - inicio, None, type(e).__name__)
+            raise
+        self._consulta = (digital, texto)
+        self._duracao = time.perf_counter() - inicio
+        # sem result set (INSERT/UPDATE/DELETE): conta as linhas afetadas
+        self._linhas = None if self._cur.description else max(self._cur.rowcount, 0)
+        return resultado
+
+    def _medir_fetch(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        self._duracao += time.perf_counter() - inicio
+        return resultado
+
+    def fetchone(self):
+        linha = self._medir_fetch(self._cur.fetchone)
+        if linha is not None:
+            self._linhas = (self._linhas or 0) + 1
+        return linha
+
+    def fetchall(self):
+        linhas = self._medir_fetch(self._cur.fetchall)
+        self._linhas = (self._linhas or 0) + len(linhas)
+        return linhas
+
+    def fetchmany(self, tamanho):
+        linhas = self._medir_fetch(self._cur.fetchmany, tamanho)
+        self._linhas = (self._linhas or 0) + len(linhas)
+        return linhas
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._registrar()
+        return self._cur.close()
+
+    def _registrar(self):
+        if self._consulta is not None:
+            registrar_consulta(*self._consulta, self._duracao, self._linhas or 0)
+            self._consulta = None
+
+    def __getattr__(self, nome):
+        # rowcount, lastrowid, description, mogrify, connection... vêm direto do cursor do driver
+        return getattr(self._cur, nome)
+
+
+# ----------------------------
+# Métodos do Database
+# ----------------------------
+def medido(funcao):
+    """Decorator dos métodos públicos do Database: duração e erros por método."""
+    if not HABILITADAS:
+        return funcao
+    nome = funcao.__name__
+
+    if inspect.isgeneratorfunction(funcao):
+        # geradores (ex.: iterar_funcionarios) são medidos do primeiro ao último lote
+        @functools.wraps(funcao)
+        def gerador(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                yield from funcao(*args, **kwargs)
+            except Exception as e:
+                METODO_ERROS.incrementar((nome, type(e).__name__))
+                raise
+            finally:
+                METODO_DURACAO.observar((nome,), time.perf_counter() - inicio)
+        return gerador
+
+    if inspect.iscoroutinefunction(funcao):
+        # AsyncDatabase: a duração inclui a espera pelo banco, não só a criação da corrotina
+        @functools.wraps(funcao)
+        async def corrotina(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return await funcao(*args, **kwargs)
+            except Exception as e:
+                METODO_ERROS.incrementar((nome, type(e).__name__))
+                raise
+            finally:
+                METODO_DURACAO.observar((nome,), time.perf_counter() - inicio)
+        return corrotina
+
+    @functools.wraps(funcao)
+    def envolto(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        except Exception as e:
+            METODO_ERROS.incrementar((nome, type(e).__name__))
+            raise
+        finally:
+            METODO_DURACAO.observar((nome,), time.perf_counter() - inicio)
+    return envolto
+
+
+# ----------------------------
+# HTTP
+# ----------------------------
+def registrar_requisicao(metodo, rota, status, duracao, tamanho):
+    HTTP_DURACAO.observar((metodo, rota, str(status)), duracao)
+    if tamanho is not None:
+        HTTP_TAMANHO.observar((metodo, rota), tamanho)
+
+
+def exportar():
+    return REGISTRO.exportar()
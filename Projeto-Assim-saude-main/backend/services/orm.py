@@ -0,0 +1,221 @@
+# services/orm.py
+"""
+Caminho de leitura pelo ORM (Flask-SQLAlchemy, models.Cargo / models.Funcionario), sobre o mesmo
+banco do Database. Ligado no app com DB_ORM=1.
+
+Só leitura: escritas continuam no Database, que mantém versões, caches, resumo e eventos.
+As listagens não hidratam objetos: `buscar_funcionarios` faz um SELECT com JOIN só das colunas
+da API e monta os dicts direto das tuplas (Funcionario.para_dicts); N funcionários custam uma
+consulta. Quando objetos são necessários, `funcionarios_com_cargo` traz os cargos numa segunda
+consulta por IN (selectinload + load_only), sem a consulta por funcionário do carregamento
+preguiçoso; o número de consultas não cresce com o número de funcionários.
+"""
+import re
+
+from services.busca import filtro_funcionarios
+from services.metricas import medido
+from services.paginacao import LIMITE_PADRAO, decodificar_cursor, montar_pagina
+
+DRIVERS = {'mysql': 'mysql+pymysql', 'postgres': 'postgresql+psycopg2', 'sqlite': 'sqlite'}
+
+_database = None
+
+
+def url_sqlalchemy(database):
+    """URL do SQLAlchemy equivalente à conexão do Database (mesmo motor, host e credenciais)."""
+    from sqlalchemy.engine import URL
+
+    parametros = database._parametros
+    if database.kind == 'sqlite':
+        # o alvo pode ser uma URI (banco em memória compartilhado): a conexão vem do `creator`
+        return URL.create('sqlite')
+    return URL.create(
+        DRIVERS[database.kind],
+        username=parametros.get('user'),
+        password=parametros.get('password'),
+        host=parametros.get('host'),
+        port=parametros.get('port'),
+        database=parametros.get('database') or parametros.get('dbname'),
+        query={'sslmode': parametros['sslmode']} if parametros.get('sslmode') else {},
+    )
+
+
+def configurar(app, database):
+    """Liga `services.db.db` ao app, apontando para o banco do `database`."""
+    global _database
+    from services.db import TIMEOUT_CONEXAO, db
+    from services import sqlite
+
+    opcoes = {'pool_pre_ping': True, 'pool_recycle': database.pool.reciclar or -1}
+    if database.kind == 'sqlite':
+        def conectar():
+            # mesmos PRAGMAs do Database; o SQLAlchemy espera tuplas, não dicts
+            conn = sqlite.conectar(**database._parametros)
+            conn.row_factory = None
+            return conn
+        opcoes = {'creator': conectar}
+    else:
+        opcoes['connect_args'] = {'connect_timeout': TIMEOUT_CONEXAO}
+    app.config['SQLALCHEMY_DATABASE_URI'] = url_sqlalchemy(database)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes
+    db.init_app(app)
+    _database = database
+
+
+def _clausula(texto, params):
+    """Condição SQL com `%s` (services.busca) -> sqlalchemy.text com parâmetros nomeados."""
+    from sqlalchemy import text
+
+    valores = {}
+
+    def nomear(_):
+        nome = f"p{len(valores)}"
+        valores[nome] = params[len(valores)]
+        return f":{nome}"
+
+    return text(re.sub(r'%s', nomear, texto)).bindparams(**valores)
+
+
+def _campos_lista():
+    from models.funcionario import Funcionario
+
+    return Funcionario.CAMPOS_LISTA_ATIVOS if _database._arquivo_ativo() else Funcionario.CAMPOS_LISTA
+
+
+def _cru(coluna):
+    """
+    A coluna com o valor do driver, sem a conversão de tipo do SQLAlchemy: a API sai igual à do
+    Database (no SQLite, `criado_em` como '2024-01-02 03:04:05' e `ativo` como 1/0).
+    """
+    from sqlalchemy import type_coerce
+    from sqlalchemy.types import NullType
+
+    return type_coerce(coluna, NullType()).label(coluna.key)
+
+
+def _consulta_lista(nome='', cpf='', apos_id=None, limite=None):
+    """
+    SELECT das colunas da listagem (_campos_lista()), cargo por JOIN, em id DESC; com a migração
+    004, só os funcionários ativos.
+    """
+    _database._inicializar()  # as tabelas existentes decidem as colunas e o filtro de ativos
+    from sqlalchemy import select
+    from sqlalchemy.orm import aliased
+    from models.cargo import Cargo
+    from models.funcionario import Funcionario
+
+    # alias `f`: as condições de services.busca (FTS, trigram, prefixo de CPF) são as do Database
+    f = aliased(Funcionario, name='f')
+    colunas = [f.id, f.nome, f.data_nascimento, f.endereco, f.cpf, f.email, f.telefone, f.cargo_id, f.criado_em,
+               f.cpf_digitos]
+    if _database._arquivo_ativo():
+        colunas += [f.ativo, f.desligado_em]
+    colunas += [Cargo.nome.label('cargo_nome'), Cargo.salario.label('cargo_salario')]
+    consulta = (
+        select(*(_cru(coluna) for coluna in colunas))
+        .join(Cargo, f.cargo_id == Cargo.id)
+        .order_by(f.id.desc())
+    )
+    clausulas, params = filtro_funcionarios(_database.kind, nome, cpf, somente_ativos=_database._arquivo_ativo())
+    for clausula in clausulas:
+        quantidade = clausula.count('%s')
+        consulta = consulta.where(_clausula(clausula, params[:quantidade]))
+        params = params[quantidade:]
+    if apos_id is not None:
+        consulta = consulta.where(f.id < apos_id)
+    if limite is not None:
+        consulta = consulta.limit(limite)
+    return consulta
+
+
+@medido
+def buscar_funcionarios(nome='', cpf=''):
+    """Como Database.buscar_funcionarios: uma consulta, dicts montados das tuplas."""
+    from services.db import db
+    from models.funcionario import Funcionario
+
+    return Funcionario.para_dicts(db.session.execute(_consulta_lista(nome, cpf)), _campos_lista())
+
+
+@medido
+def paginar_funcionarios(nome='', cpf='', limite=LIMITE_PADRAO, apos=None):
+    """Como Database.paginar_funcionarios: {'itens', 'next_cursor'}."""
+    from services.db import db
+    from models.funcionario import Funcionario
+
+    linhas = db.session.execute(_consulta_lista(nome, cpf, decodificar_cursor(apos), limite + 1))
+    return montar_pagina(Funcionario.para_dicts(linhas, _campos_lista()), limite)
+
+
+@medido
+def funcionarios_com_cargo(ids=None, limite=None, incluir_arquivados=False):
+    """
+    Objetos Funcionario (para quem precisa do modelo) com o cargo já carregado: os cargos vêm
+    numa consulta só (IN), sem repetir as colunas do cargo em cada linha de funcionário como
+    faria o JOIN. Só as colunas usadas por to_dict (do cargo, nome e salário).
+    Com a migração 004, só os ativos, como as listagens; `incluir_arquivados` traz também os
+    desligados e os arquivados (estes como objetos avulsos, fora da sessão).
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import load_only, selectinload
+    from services.db import db
+    from models.cargo import Cargo
+    from models.funcionario import Funcionario
+
+    _database._inicializar()
+    com_ativo = _database._arquivo_ativo()
+    campos = [Funcionario.nome, Funcionario.data_nascimento, Funcionario.endereco, Funcionario.cpf,
+              Funcionario.email, Funcionario.telefone, Funcionario.cargo_id, Funcionario.criado_em]
+    if com_ativo:
+        campos.append(Funcionario.ativo)
+    consulta = (
+        select(Funcionario)
+        .options(load_only(*campos), selectinload(Funcionario.cargo).load_only(Cargo.nome, Cargo.salario))
+        .order_by(Funcionario.id.desc())
+    )
+    if com_ativo and not incluir_arquivados:
+        consulta = consulta.where(Funcionario.ativo.is_(True))
+    if ids is not None:
+        ids = list(ids)
+        consulta = consulta.where(Funcionario.id.in_(ids))
+    if limite is not None:
+        consulta = consulta.limit(limite)
+    funcionarios = db.session.scalars(consulta).all()
+    if com_ativo and incluir_arquivados:
+        funcionarios = _com_arquivados(funcionarios, ids, limite)
+    return funcionarios
+
+
+def _com_arquivados(funcionarios, ids, limite):
+    """Intercala (id DESC) os arquivados de `ids` como Funcionario avulsos; o cargo numa consulta por IN."""
+    from sqlalchemy import column, select, table
+    from sqlalchemy.orm import load_only
+    from sqlalchemy.orm.attributes import set_committed_value
+    from services.db import db
+    from models.cargo import Cargo
+    from models.funcionario import Funcionario
+
+    # mesmas colunas (e tipos) do modelo: datas chegam como date/datetime, como nos ativos
+    nomes = ('id', 'nome', 'data_nascimento', 'endereco', 'cpf', 'email', 'telefone', 'cargo_id', 'criado_em')
+    a = table('funcionarios_arquivo', *(column(n, Funcionario.__table__.c[n].type) for n in nomes))
+    consulta = select(a).order_by(a.c.id.desc())
+    if ids is not None:
+        consulta = consulta.where(a.c.id.in_(ids))
+    if limite is not None:
+        consulta = consulta.limit(limite)
+    linhas = db.session.execute(consulta).all()
+    if not linhas:
+        return funcionarios
+
+    # o arquivo não tem FK: cargo excluído depois do arquivamento fica None, como no LEFT JOIN do Database
+    cargos = {c.id: c for c in db.session.scalars(
+        select(Cargo).options(load_only(Cargo.nome, Cargo.salario))
+        .where(Cargo.id.in_({linha.cargo_id for linha in linhas})))}
+    arquivados = []
+    for linha in linhas:
+        funcionario = Funcionario(**linha._asdict(), ativo=False)
+        # sem eventos de relacionamento: o objeto não entra na sessão pelo backref do cargo
+        set_committed_value(funcionario, 'cargo', cargos.get(linha.cargo_id))
+        arquivados.append(funcionario)
+    todos = sorted(list(funcionarios) + arquivados, key=lambda f: f.id, reverse=True)
+    return todos[:limite] if limite is not None else todos
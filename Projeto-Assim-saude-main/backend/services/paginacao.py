@@ -0,0 +1,53 @@
+# services/paginacao.py
+"""
+Paginação por chave (keyset) sobre a ordenação `id DESC` usada nas listagens.
+
+O cursor é opaco para o cliente: um base64url do último id entregue. A próxima
+página é sempre `WHERE id < :ultimo_id ORDER BY id DESC LIMIT n`, então o custo
+de qualquer página é proporcional ao tamanho dela, não à sua profundidade.
+"""
+import base64
+import json
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+def codificar_cursor(ultimo_id) -> str:
+    bruto = json.dumps({'id': int(ultimo_id)}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(bruto).rstrip(b'=').decode()
+
+
+def decodificar_cursor(cursor):
+    """Retorna o id guardado no cursor, ou None se não houver cursor."""
+    if not cursor:
+        return None
+    try:
+        preenchido = cursor + '=' * (-len(cursor) % 4)
+        valor = json.loads(base64.urlsafe_b64decode(preenchido.encode()))
+        return int(valor['id'])
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+
+
+def ler_limite(valor, padrao=LIMITE_PADRAO):
+    """Converte o parâmetro `limit` da query string validando a faixa permitida."""
+    if valor is None or valor == '':
+        return padrao
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        limite = 0
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f"limit deve ser um inteiro entre 1 e {LIMITE_MAXIMO}")
+    return limite
+
+
+def montar_pagina(linhas, limite, chave='id'):
+    """
+    Recebe até `limite + 1` linhas (a extra só indica que há próxima página)
+    e devolve {'itens': [...], 'next_cursor': str | None}.
+    """
+    itens = list(linhas[:limite])
+    proximo = codificar_cursor(itens[-1][chave]) if len(linhas) > limite and itens else None
+    return {'itens': itens, 'next_cursor': proximo}
@@ -0,0 +1,77 @@
+# services/perfil.py
+"""
+Profiler por amostragem para uma requisição específica.
+
+Com PROFILER_HABILITADO=1, uma requisição com o header `X-Profile: 1` (ou `?profile=1`) é
+amostrada: uma thread lê a pilha da thread que atende a requisição a cada
+PROFILER_INTERVALO_MS e, no fim, grava as pilhas no formato "collapsed"
+(uma pilha por linha + contagem), pronto para flamegraph.pl / speedscope. O cliente recebe só
+um id opaco (header X-Profile-Id); o caminho do arquivo vai para o log do servidor.
+As demais requisições não pagam nada: sem o header, nenhum amostrador é criado.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+HABILITADO = os.getenv("PROFILER_HABILITADO", "0").lower() in ("1", "true")
+INTERVALO = float(os.getenv("PROFILER_INTERVALO_MS", 5)) / 1000
+DIRETORIO = os.getenv("PROFILER_DIR", "/tmp/perfis")
+PROFUNDIDADE_MAXIMA = 128
+
+
+class AmostradorPilhas:
+    def __init__(self, thread_id=None, intervalo=INTERVALO):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = None
+        self.inicio = None
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        self._thread = threading.Thread(target=self._amostrar, name='perfil-amostrador', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+        return self.pilhas
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            quadros = []
+            while frame is not None and len(quadros) < PROFUNDIDADE_MAXIMA:
+                codigo = frame.f_code
+                quadros.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.pilhas[';'.join(reversed(quadros))] += 1
+
+    def salvar(self, nome):
+        """
+        Grava as pilhas em DIRETORIO/<nome>-<timestamp>-<id>.folded e devolve (id, caminho):
+        o id pode ir para o cliente, o caminho não.
+        """
+        os.makedirs(DIRETORIO, exist_ok=True)
+        seguro = ''.join(c if c.isalnum() else '_' for c in nome).strip('_') or 'raiz'
+        identificador = uuid.uuid4().hex[:12]
+        caminho = os.path.join(DIRETORIO, f"{seguro}-{int(time.time() * 1000)}-{identificador}.folded")
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, contagem in self.pilhas.most_common():
+                f.write(f"{pilha} {contagem}\n")
+        return identificador, caminho
+
+
+def pedido(headers, args):
+    """A requisição pediu profiling? (sempre False com PROFILER_HABILITADO desligado)"""
+    if not HABILITADO:
+        return False
+    return headers.get('X-Profile') == '1' or args.get('profile') == '1'
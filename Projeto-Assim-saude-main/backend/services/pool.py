@@ -0,0 +1,183 @@
+# services/pool.py
+"""
+Pool de conexões thread-safe e consciente de fork usado por services.db.Database.
+
+Cada método do Database pega uma conexão emprestada (`with pool.conexao() as conn:`)
+e a devolve ao terminar, então threads e workers do gunicorn não disputam mais
+um único socket.
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolEsgotado(Exception):
+    """Nenhuma conexão ficou livre dentro do timeout de checkout."""
+
+
+class ConnectionPool:
+    def __init__(self, fabrica, minimo=1, maximo=10, timeout=30.0, reciclar=1800, ping_apos=30.0, erros_conexao=()):
+        """
+        fabrica        -> callable sem argumentos que abre uma nova conexão (ConnWrapper)
+        minimo/maximo  -> quantidade de conexões mantidas abertas / limite total
+        timeout        -> segundos esperando uma conexão livre antes de PoolEsgotado
+        reciclar       -> idade máxima (s) de uma conexão antes de ser reaberta (0 desliga)
+        ping_apos      -> conexões ociosas há mais que isso recebem um ping antes do uso
+        erros_conexao  -> exceções do driver que indicam conexão quebrada (descarta a conexão)
+        """
+        if maximo < 1 or minimo < 0 or minimo > maximo:
+            raise ValueError("Configuração de pool inválida: exige 0 <= minimo <= maximo e maximo >= 1")
+        self._fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = maximo
+        self.timeout = timeout
+        self.reciclar = reciclar
+        self.ping_apos = ping_apos
+        self.erros_conexao = tuple(erros_conexao)
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._livres = deque()
+        self._total = 0
+
+    def _verificar_fork(self):
+        # Depois de um fork (gunicorn --preload, multiprocessing) o filho herda os sockets do pai.
+        # Não fechamos essas conexões herdadas (isso encerraria a sessão do pai); apenas as
+        # abandonamos e recomeçamos o pool do zero neste processo.
+        if self._pid != os.getpid():
+            self._reiniciar_estado()
+
+    # ----------------------------
+    # CHECKOUT / DEVOLUÇÃO
+    # ----------------------------
+    def obter(self, timeout=None):
+        """Checkout de uma conexão; `timeout` sobrescreve o padrão do pool (ex.: checagens rápidas)."""
+        self._verificar_fork()
+        timeout = self.timeout if timeout is None else timeout
+        limite = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._livres:
+                    conn = self._livres.pop()
+                    break
+                if self._total < self.maximo:
+                    self._total += 1
+                    conn = None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise PoolEsgotado(
+                        f"Nenhuma conexão livre após {timeout}s (máximo de {self.maximo} conexões)"
+                    )
+                self._cond.wait(restante)
+
+        try:
+            if conn is None:
+                return self._abrir()
+            if self._precisa_reabrir(conn):
+                self._fechar_silencioso(conn)
+                return self._abrir()
+            return conn
+        except BaseException:
+            # a vaga reservada não virou conexão: libera para outra thread
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def devolver(self, conn, descartar=False):
+        if getattr(conn, 'pid', None) != os.getpid() or self._pid != os.getpid():
+            # conexão de outro processo (pré-fork): nunca volta para este pool
+            return
+        if not descartar and conn.em_transacao():
+            # não devolve conexão com transação pendente para outro usuário
+            try:
+                conn.rollback()
+            except Exception:
+                descartar = True
+        if descartar or conn.quebrada:
+            self._fechar_silencioso(conn)
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            return
+        conn.usado_em = time.monotonic()
+        with self._cond:
+            self._livres.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def conexao(self, timeout=None):
+        """Empresta uma conexão pelo tempo do bloco `with`."""
+        conn = self.obter(timeout)
+        descartar = False
+        try:
+            yield conn
+        except GeneratorExit:
+            # consumidor abandonou um gerador no meio (ex.: cliente desconectou de um stream)
+            descartar = True
+            raise
+        except self.erros_conexao:
+            descartar = True
+            raise
+        finally:
+            self.devolver(conn, descartar=descartar)
+
+    # ----------------------------
+    # MANUTENÇÃO
+    # ----------------------------
+    def preencher(self):
+        """Abre conexões até atingir o mínimo configurado (propaga erro de conexão)."""
+        self._verificar_fork()
+        while True:
+            with self._cond:
+                if self._total >= self.minimo:
+                    return
+                self._total += 1
+            try:
+                conn = self._abrir()
+            except BaseException:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            self.devolver(conn)
+
+    def fechar(self):
+        with self._cond:
+            livres, self._livres = self._livres, deque()
+            self._total -= len(livres)
+            self._cond.notify_all()
+        for conn in livres:
+            self._fechar_silencioso(conn)
+
+    def estatisticas(self):
+        with self._cond:
+            return {'total': self._total, 'livres': len(self._livres), 'minimo': self.minimo, 'maximo': self.maximo}
+
+    def _abrir(self):
+        conn = self._fabrica()
+        conn.pid = os.getpid()
+        conn.criado_em = conn.usado_em = time.monotonic()
+        return conn
+
+    def _precisa_reabrir(self, conn):
+        agora = time.monotonic()
+        if conn.quebrada:
+            return True
+        if self.reciclar and agora - conn.criado_em > self.reciclar:
+            return True
+        if self.ping_apos is not None and agora - conn.usado_em > self.ping_apos:
+            return not conn.ping()
+        return False
+
+    @staticmethod
+    def _fechar_silencioso(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,181 @@
+# services/pool_async.py
+"""
+Pool de conexões para asyncio usado por services.db_async.AsyncDatabase.
+
+Mesma ideia do ConnectionPool, sem threads: quem espera por uma conexão livre é uma
+corrotina parada numa asyncio.Condition, não uma thread. Centenas de requisições em
+espera custam alguns KB cada, e o banco continua vendo no máximo `maximo` conexões.
+O pool pertence ao event loop em que foi usado pela primeira vez (um por worker).
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from services.pool import PoolEsgotado
+
+
+class AsyncConnectionPool:
+    def __init__(self, fabrica, minimo=1, maximo=10, timeout=30.0, reciclar=1800, ping_apos=30.0, erros_conexao=()):
+        """
+        fabrica        -> corrotina sem argumentos que abre uma nova conexão (services.db_async)
+        minimo/maximo  -> quantidade de conexões mantidas abertas / limite total
+        timeout        -> segundos esperando uma conexão livre antes de PoolEsgotado
+        reciclar       -> idade máxima (s) de uma conexão antes de ser reaberta (0 desliga)
+        ping_apos      -> conexões ociosas há mais que isso recebem um ping antes do uso
+        erros_conexao  -> exceções do driver que indicam conexão quebrada (descarta a conexão)
+        """
+        if maximo < 1 or minimo < 0 or minimo > maximo:
+            raise ValueError("Configuração de pool inválida: exige 0 <= minimo <= maximo e maximo >= 1")
+        self._fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = maximo
+        self.timeout = timeout
+        self.reciclar = reciclar
+        self.ping_apos = ping_apos
+        self.erros_conexao = tuple(erros_conexao)
+        self._cond = None
+        self._livres = deque()
+        self._total = 0
+        self.esperando = 0
+
+    def _condicao(self):
+        # criada no loop que usa o pool (o construtor pode rodar antes do loop existir)
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    # ----------------------------
+    # CHECKOUT / DEVOLUÇÃO
+    # ----------------------------
+    async def obter(self, timeout=None):
+        """Checkout de uma conexão; `timeout` sobrescreve o padrão do pool."""
+        timeout = self.timeout if timeout is None else timeout
+        limite = time.monotonic() + timeout
+        cond = self._condicao()
+        async with cond:
+            while True:
+                if self._livres:
+                    conn = self._livres.pop()
+                    break
+                if self._total < self.maximo:
+                    self._total += 1
+                    conn = None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise PoolEsgotado(
+                        f"Nenhuma conexão livre após {timeout}s (máximo de {self.maximo} conexões)"
+                    )
+                self.esperando += 1
+                try:
+                    await asyncio.wait_for(cond.wait(), restante)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self.esperando -= 1
+
+        try:
+            if conn is None:
+                return await self._abrir()
+            if await self._precisa_reabrir(conn):
+                await self._fechar_silencioso(conn)
+                return await self._abrir()
+            return conn
+        except BaseException:
+            # a vaga reservada não virou conexão: libera para outra corrotina
+            async with cond:
+                self._total -= 1
+                cond.notify()
+            raise
+
+    async def devolver(self, conn, descartar=False):
+        cond = self._condicao()
+        if not descartar and conn.em_transacao:
+            # não devolve conexão com transação pendente para outro usuário
+            try:
+                await conn.rollback()
+            except Exception:
+                descartar = True
+        if descartar or conn.quebrada:
+            await self._fechar_silencioso(conn)
+            async with cond:
+                self._total -= 1
+                cond.notify()
+            return
+        conn.usado_em = time.monotonic()
+        async with cond:
+            self._livres.append(conn)
+            cond.notify()
+
+    @asynccontextmanager
+    async def conexao(self, timeout=None):
+        """Empresta uma conexão pelo tempo do bloco `async with`."""
+        conn = await self.obter(timeout)
+        descartar = False
+        try:
+            yield conn
+        except asyncio.CancelledError:
+            # cliente desconectou no meio da consulta: o estado da conexão é incerto
+            descartar = True
+            raise
+        except self.erros_conexao:
+            descartar = True
+            raise
+        finally:
+            await self.devolver(conn, descartar=descartar)
+
+    # ----------------------------
+    # MANUTENÇÃO
+    # ----------------------------
+    async def preencher(self):
+        """Abre conexões até atingir o mínimo configurado (propaga erro de conexão)."""
+        cond = self._condicao()
+        while True:
+            async with cond:
+                if self._total >= self.minimo:
+                    return
+                self._total += 1
+            try:
+                conn = await self._abrir()
+            except BaseException:
+                async with cond:
+                    self._total -= 1
+                    cond.notify()
+                raise
+            await self.devolver(conn)
+
+    async def fechar(self):
+        cond = self._condicao()
+        async with cond:
+            livres, self._livres = self._livres, deque()
+            self._total -= len(livres)
+            cond.notify_all()
+        for conn in livres:
+            await self._fechar_silencioso(conn)
+
+    def estatisticas(self):
+        return {'total': self._total, 'livres': len(self._livres), 'minimo': self.minimo,
+                'maximo': self.maximo, 'esperando': self.esperando}
+
+    async def _abrir(self):
+        conn = await self._fabrica()
+        conn.criado_em = conn.usado_em = time.monotonic()
+        return conn
+
+    async def _precisa_reabrir(self, conn):
+        agora = time.monotonic()
+        if conn.quebrada:
+            return True
+        if self.reciclar and agora - conn.criado_em > self.reciclar:
+            return True
+        if self.ping_apos is not None and agora - conn.usado_em > self.ping_apos:
+            return not await conn.ping()
+        return False
+
+    @staticmethod
+    async def _fechar_silencioso(conn):
+        try:
+            await conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,146 @@
+# services/replicas.py
+"""
+Réplicas de leitura para services.db.Database (DATABASE_REPLICA_URLS).
+
+Cada réplica tem o seu ConnectionPool. As leituras escolhem uma réplica saudável por
+round-robin ou pela menor latência (ping medido pela verificação periódica); uma réplica
+que falha (conexão recusada/perdida, atraso de replicação acima do máximo) é ejetada por
+um tempo e a leitura cai para o primário. A verificação em segundo plano readmite a
+réplica assim que ela volta a responder dentro do atraso aceito.
+"""
+import itertools
+import os
+import threading
+import time
+
+ESTRATEGIAS = ('round_robin', 'menor_latencia')
+
+
+class Replica:
+    # peso da última medição na média móvel da latência
+    SUAVIZACAO = 0.3
+
+    def __init__(self, nome, pool):
+        self.nome = nome
+        self.pool = pool
+        self.latencia = None     # segundos (média móvel do ping)
+        self.atraso = None       # segundos atrás do primário, quando o banco informa
+        self.ejetada_ate = 0.0
+        self.falhas = 0
+        self.motivo = None
+
+    def disponivel(self, agora):
+        return agora >= self.ejetada_ate
+
+    def registrar_latencia(self, segundos):
+        if self.latencia is None:
+            self.latencia = segundos
+        else:
+            self.latencia += self.SUAVIZACAO * (segundos - self.latencia)
+
+    def estatisticas(self):
+        pool = self.pool.estatisticas()
+        return {
+            'disponivel': int(self.disponivel(time.monotonic())),
+            'latencia_segundos': self.latencia,
+            'atraso_segundos': self.atraso,
+            'falhas': self.falhas,
+            'conexoes': pool['total'],
+            'conexoes_livres': pool['livres'],
+        }
+
+
+class ConjuntoReplicas:
+    def __init__(self, replicas, estrategia='round_robin', ejecao=30.0, atraso_maximo=5.0,
+                 intervalo=5.0, medir_atraso=None):
+        """
+        replicas       -> lista de Replica
+        estrategia     -> 'round_robin' ou 'menor_latencia'
+        ejecao         -> segundos fora de rotação depois de uma falha
+        atraso_maximo  -> réplica mais atrasada que isso (s) é ejetada pela verificação
+        intervalo      -> segundos entre verificações em segundo plano (0 desliga)
+        medir_atraso   -> callable(conn) -> segundos de atraso de replicação (ou None)
+        """
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estratégia de réplicas inválida: {estrategia} (use {', '.join(ESTRATEGIAS)})")
+        self.replicas = list(replicas)
+        self.estrategia = estrategia
+        self.ejecao = ejecao
+        self.atraso_maximo = atraso_maximo
+        self.intervalo = intervalo
+        self._medir_atraso = medir_atraso
+        self._lock = threading.Lock()
+        self._rodizio = itertools.count()
+        # a thread de verificação não sobrevive ao fork: cada processo inicia a sua
+        self._pid_verificador = None
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def escolher(self):
+        """Réplica para a próxima leitura, ou None se nenhuma estiver disponível."""
+        self._garantir_verificador()
+        agora = time.monotonic()
+        candidatas = [r for r in self.replicas if r.disponivel(agora)]
+        if not candidatas:
+            return None
+        if self.estrategia == 'menor_latencia':
+            # sem medição ainda conta como 0: a réplica nova recebe tráfego e passa a ser medida
+            return min(candidatas, key=lambda r: r.latencia or 0.0)
+        return candidatas[next(self._rodizio) % len(candidatas)]
+
+    def falhou(self, replica, erro):
+        """Tira a réplica de rotação por `ejecao` segundos."""
+        with self._lock:
+            replica.falhas += 1
+            replica.motivo = str(erro) or type(erro).__name__
+            ja_ejetada = not replica.disponivel(time.monotonic())
+            replica.ejetada_ate = time.monotonic() + self.ejecao
+        if not ja_ejetada:
+            print(f"[Replicas] ❌ {replica.nome} ejetada por {self.ejecao:.0f}s: {replica.motivo}")
+
+    def readmitir(self, replica):
+        with self._lock:
+            ejetada = not replica.disponivel(time.monotonic())
+            replica.ejetada_ate = 0.0
+            replica.motivo = None
+        if ejetada:
+            print(f"[Replicas] ✅ {replica.nome} de volta à rotação")
+
+    def verificar(self, timeout=2.0):
+        """Ping + atraso de replicação de cada réplica (inclusive as ejetadas)."""
+        for replica in self.replicas:
+            try:
+                inicio = time.perf_counter()
+                with replica.pool.conexao(timeout=timeout) as conn:
+                    if not conn.ping():
+                        raise RuntimeError("ping sem resposta")
+                    replica.registrar_latencia(time.perf_counter() - inicio)
+                    replica.atraso = self._medir_atraso(conn) if self._medir_atraso else None
+            except Exception as e:
+                self.falhou(replica, e)
+                continue
+            if replica.atraso is not None and replica.atraso > self.atraso_maximo:
+                self.falhou(replica, f"atraso de replicação de {replica.atraso:.1f}s")
+            else:
+                self.readmitir(replica)
+
+    def estatisticas(self):
+        return {f"replica_{i}": r.estatisticas() for i, r in enumerate(self.replicas)}
+
+    def _garantir_verificador(self):
+        if not self.intervalo or self._pid_verificador == os.getpid():
+            return
+        with self._lock:
+            if self._pid_verificador == os.getpid():
+                return
+            self._pid_verificador = os.getpid()
+        threading.Thread(target=self._verificar_sempre, name='db-replicas', daemon=True).start()
+
+    def _verificar_sempre(self):
+        while True:
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"[Replicas] ❌ Falha na verificação: {e}")
+            time.sleep(self.intervalo)
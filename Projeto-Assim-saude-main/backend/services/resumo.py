@@ -0,0 +1,86 @@
+# services/resumo.py
+"""
+Resumo da folha por cargo (tabela `resumo_cargos`), mantido incrementalmente pelo Database.
+
+Com a migração 004, só funcionários ativos contam (desligados saem do resumo, ver services.arquivo).
+Cada escrita em funcionários ajusta `quantidade` do(s) cargo(s) afetado(s) na mesma transação;
+a folha é quantidade x salário do cargo, calculada na leitura, então mudar o salário de um cargo
+não exige recálculo. Ler o resumo custa uma linha por cargo, não por funcionário.
+
+Verificação / reconstrução (recontagem completa, compara com o resumo):
+
+    python -m services.resumo              # só verifica; sai com 1 se houver divergência
+    python -m services.resumo --corrigir   # regrava os cargos divergentes
+"""
+import argparse
+import sys
+
+# recontagem completa: a verdade contra a qual o resumo é verificado
+SQL_RECONTAGEM = """SELECT c.id AS cargo_id, COUNT(f.id) AS quantidade
+                    FROM cargos c
+                    LEFT JOIN funcionarios f ON f.cargo_id = c.id{ativos}
+                    GROUP BY c.id"""
+
+# resumo por cargo lido da tabela: O(cargos)
+SQL_RESUMO = """SELECT c.id AS cargo_id, c.nome AS cargo_nome, c.salario,
+                       COALESCE(r.quantidade, 0) AS quantidade,
+                       COALESCE(r.quantidade, 0) * c.salario AS folha
+                FROM cargos c
+                LEFT JOIN resumo_cargos r ON r.cargo_id = c.id"""
+
+# mesmo resultado sem a tabela (banco sem a migração 003): O(funcionários)
+SQL_RESUMO_AGREGADO = """SELECT c.id AS cargo_id, c.nome AS cargo_nome, c.salario,
+                                COUNT(f.id) AS quantidade,
+                                COUNT(f.id) * c.salario AS folha
+                         FROM cargos c
+                         LEFT JOIN funcionarios f ON f.cargo_id = c.id{ativos}
+                         GROUP BY c.id, c.nome, c.salario"""
+
+
+def so_ativos(sql, somente_ativos):
+    """SQL_RECONTAGEM / SQL_RESUMO_AGREGADO contando só os ativos (bancos com a migração 004)."""
+    return sql.format(ativos=" AND f.ativo = TRUE" if somente_ativos else "")
+
+
+def sql_ajuste(kind):
+    """Soma `delta` à quantidade do cargo, criando a linha na primeira vez: params (cargo_id, delta)."""
+    if kind == 'mysql':
+        return """INSERT INTO resumo_cargos (cargo_id, quantidade) VALUES (%s, %s)
+                  ON DUPLICATE KEY UPDATE quantidade = quantidade + VALUES(quantidade)"""
+    return """INSERT INTO resumo_cargos (cargo_id, quantidade) VALUES (%s, %s)
+              ON CONFLICT (cargo_id) DO UPDATE SET quantidade = resumo_cargos.quantidade + excluded.quantidade"""
+
+
+def sql_definir(kind):
+    """Grava a quantidade absoluta do cargo (usado na correção): params (cargo_id, quantidade)."""
+    if kind == 'mysql':
+        return """INSERT INTO resumo_cargos (cargo_id, quantidade) VALUES (%s, %s)
+                  ON DUPLICATE KEY UPDATE quantidade = VALUES(quantidade)"""
+    return """INSERT INTO resumo_cargos (cargo_id, quantidade) VALUES (%s, %s)
+              ON CONFLICT (cargo_id) DO UPDATE SET quantidade = excluded.quantidade"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corrigir', action='store_true', help='regrava os cargos divergentes')
+    args = parser.parse_args(argv)
+
+    from services.db import Database
+
+    db = Database(aquecer=False)
+    divergencias = db.verificar_resumo(corrigir=args.corrigir)
+    if not divergencias:
+        print("✅ Resumo por cargo confere com a recontagem")
+        return 0
+    print(f"{'cargo_id':>8} {'resumo':>8} {'recontagem':>11}")
+    for d in divergencias:
+        print(f"{d['cargo_id']:>8} {d['registrado']:>8} {d['esperado']:>11}")
+    if args.corrigir:
+        print(f"✅ {len(divergencias)} cargo(s) corrigido(s)")
+        return 0
+    print(f"❌ {len(divergencias)} cargo(s) divergente(s); rode com --corrigir para regravar")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# services/serializacao.py
+"""
+Serialização das respostas JSON da API.
+
+ - orjson (opcional) codifica listas de linhas do banco direto em bytes, com datas em ISO 8601;
+   Decimal (salários no MySQL/Postgres) vira texto com as casas do banco ("3500.00"), como no jsonify
+   padrão do Flask. Sem orjson cai no json da stdlib com o mesmo formato.
+ - formato colunar (`?formato=colunar`): {'colunas': [...], 'linhas': [[...], ...]}, sem repetir
+   os nomes das colunas em cada registro
+ - gzip negociado pelo Accept-Encoding, inclusive nas respostas em stream; o corpo comprimido é outra
+   representação, então o ETag dele vira fraco (W/"...") e a resposta leva Vary: Accept-Encoding
+"""
+import datetime
+import decimal
+import gzip
+import json
+import os
+import zlib
+
+from flask.json.provider import DefaultJSONProvider
+
+# Dependência opcional
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# respostas menores que isso não compensam o custo de comprimir
+GZIP_MINIMO = int(os.getenv("GZIP_MINIMO_BYTES", 1024))
+# nível 1..9; JSON de listagens é muito repetitivo: o nível 1 já reduz ~6x com menos da metade
+# da CPU do nível 5 (ver `python -m bench.serializacao`)
+GZIP_NIVEL = int(os.getenv("GZIP_NIVEL", 1))
+TIPOS_COMPRIMIVEIS = ('application/json', 'application/x-ndjson', 'text/plain', 'text/csv')
+
+
+def _padrao(valor):
+    if isinstance(valor, decimal.Decimal):
+        # float arredondaria salários grandes e perderia o "3500.00" que a API sempre enviou
+        return str(valor)
+    if isinstance(valor, (datetime.date, datetime.time)):
+        return valor.isoformat()
+    if isinstance(valor, datetime.timedelta):
+        return valor.total_seconds()
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return bytes(valor).decode('utf-8', 'replace')
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    raise TypeError(f"Tipo não serializável em JSON: {type(valor).__name__}")
+
+
+if orjson is not None:
+    def dumps(valor) -> bytes:
+        return orjson.dumps(valor, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    _codificador = json.JSONEncoder(default=_padrao, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps(valor) -> bytes:
+        return _codificador.encode(valor).encode('utf-8')
+
+    loads = json.loads
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    """Provider do Flask (app.json): jsonify e request.json passam a usar o codificador acima."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        dados = self._prepare_response_obj(args, kwargs)
+        # bytes direto para o corpo, sem passar por str
+        return self._app.response_class(dumps(dados), mimetype=self.mimetype)
+
+
+def colunar(dados):
+    """
+    Lista de linhas (dicts com as mesmas chaves) -> {'colunas': [...], 'linhas': [[...], ...]}.
+    Páginas ({'itens': [...], ...}) mantêm os demais campos e só trocam os itens.
+    """
+    if isinstance(dados, dict) and 'itens' in dados:
+        return {**dados, 'itens': colunar(dados['itens'])}
+    if not dados:
+        return {'colunas': [], 'linhas': []}
+    colunas = list(dados[0])
+    return {'colunas': colunas, 'linhas': [tuple(linha.values()) for linha in dados]}
+
+
+def aceita_gzip(request):
+    return 'gzip' in request.accept_encodings
+
+
+def comprimir(resp, request):
+    """gzip da resposta se o cliente aceita e se vale a pena (after_request)."""
+    if (resp.direct_passthrough or resp.status_code < 200 or resp.status_code >= 300
+            or resp.status_code == 204 or 'Content-Encoding' in resp.headers
+            or resp.mimetype not in TIPOS_COMPRIMIVEIS):
+        return resp
+    resp.vary.add('Accept-Encoding')
+    if not aceita_gzip(request):
+        return resp
+    if resp.is_streamed:
+        resp.response = comprimir_stream(resp.response)
+        resp.headers.pop('Content-Length', None)
+    else:
+        corpo = resp.get_data()
+        if len(corpo) < GZIP_MINIMO:
+            return resp
+        resp.set_data(gzip.compress(corpo, compresslevel=GZIP_NIVEL, mtime=0))
+    resp.headers['Content-Encoding'] = 'gzip'
+    etag, _ = resp.get_etag()
+    if etag:
+        # RFC 9110: o ETag forte identifica os bytes da representação; a gzip não é a mesma
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+def comprimir_stream(pedacos):
+    """Comprime um corpo em stream pedaço a pedaço; cada pedaço sai na hora (Z_SYNC_FLUSH)."""
+    compressor = zlib.compressobj(GZIP_NIVEL, zlib.DEFLATED, 31)  # wbits=31: cabeçalho gzip
+    try:
+        for pedaco in pedacos:
+            if isinstance(pedaco, str):
+                pedaco = pedaco.encode('utf-8')
+            saida = compressor.compress(pedaco) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if saida:
+                yield saida
+        yield compressor.flush()
+    finally:
+        # cliente desconectou: fecha o gerador original, que devolve a conexão do cursor de servidor
+        fechar = getattr(pedacos, 'close', None)
+        if fechar:
+            fechar()
@@ -0,0 +1,198 @@
+# services/sqlite.py
+"""
+Motor SQLite embutido para services.db.Database (DATABASE_URL=sqlite:///caminho.db).
+
+Pensado para instalações de um nó só e para CI/benchmarks sem servidor de banco:
+ - journal WAL e pragmas de desempenho em cada conexão
+ - linhas como dict (mesmo formato do DictCursor/RealDictCursor)
+ - o mesmo schema de database/script.sql, criado na primeira conexão
+ - tradução do paramstyle `%s` (pymysql/psycopg2) para `?`
+"""
+import re
+import sqlite3
+import uuid
+from functools import lru_cache
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",        # leitores não bloqueiam o escritor
+    "PRAGMA synchronous = NORMAL",      # seguro com WAL, sem fsync a cada commit
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -65536",       # 64 MiB de cache de páginas
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cargos (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  nome VARCHAR(255) NOT NULL,
+  salario DECIMAL(10,2) NOT NULL,
+  descricao TEXT,
+  criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS funcionarios (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  nome VARCHAR(255) NOT NULL,
+  data_nascimento DATE,
+  endereco TEXT,
+  cpf VARCHAR(14) NOT NULL UNIQUE,
+  email VARCHAR(255),
+  telefone VARCHAR(20),
+  cargo_id INT NOT NULL REFERENCES cargos(id) ON DELETE RESTRICT ON UPDATE CASCADE,
+  criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  cpf_digitos CHAR(11) GENERATED ALWAYS AS (REPLACE(REPLACE(REPLACE(cpf, '.', ''), '-', ''), ' ', '')) STORED,
+  ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  desligado_em TIMESTAMP
+);
+
+-- desligados há mais de ARQUIVO_DIAS, movidos por `python -m services.arquivo` (ids originais)
+CREATE TABLE IF NOT EXISTS funcionarios_arquivo (
+  id INTEGER PRIMARY KEY,
+  nome VARCHAR(255) NOT NULL,
+  data_nascimento DATE,
+  endereco TEXT,
+  cpf VARCHAR(14) NOT NULL,
+  email VARCHAR(255),
+  telefone VARCHAR(20),
+  cargo_id INT NOT NULL,
+  criado_em TIMESTAMP,
+  cpf_digitos CHAR(11),
+  desligado_em TIMESTAMP,
+  arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS relatorios (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  titulo VARCHAR(255) NOT NULL,
+  descricao TEXT,
+  criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS versoes_tabelas (
+  tabela VARCHAR(64) PRIMARY KEY,
+  versao BIGINT NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO versoes_tabelas (tabela, versao) VALUES ('cargos', 0), ('funcionarios', 0);
+
+CREATE TABLE IF NOT EXISTS resumo_cargos (
+  cargo_id INTEGER PRIMARY KEY REFERENCES cargos(id) ON DELETE CASCADE,
+  quantidade INT NOT NULL DEFAULT 0
+);
+-- bancos criados antes do resumo: conta só os cargos que ainda não têm linha
+INSERT INTO resumo_cargos (cargo_id, quantidade)
+  SELECT c.id, (SELECT COUNT(*) FROM funcionarios f WHERE f.cargo_id = c.id AND f.ativo = TRUE) FROM cargos c
+  WHERE c.id NOT IN (SELECT cargo_id FROM resumo_cargos);
+
+-- índices parciais: o nome só é buscado entre os ativos, a data só entre os desligados
+DROP INDEX IF EXISTS idx_funcionarios_nome;
+CREATE INDEX IF NOT EXISTS idx_funcionarios_ativos_nome ON funcionarios(nome COLLATE NOCASE) WHERE ativo = TRUE;
+CREATE INDEX IF NOT EXISTS idx_funcionarios_desligados ON funcionarios(desligado_em) WHERE ativo = FALSE;
+CREATE INDEX IF NOT EXISTS idx_cargos_nome ON cargos(nome);
+-- único: o mesmo CPF com ou sem pontuação é o mesmo funcionário (upsert por CPF)
+DROP INDEX IF EXISTS idx_funcionarios_cpf_digitos;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_funcionarios_cpf_digitos ON funcionarios(cpf_digitos);
+CREATE INDEX IF NOT EXISTS idx_funcionarios_cargo_id ON funcionarios(cargo_id);
+CREATE INDEX IF NOT EXISTS idx_funcionarios_arquivo_cpf_digitos ON funcionarios_arquivo(cpf_digitos);
+
+-- busca por trecho do nome: FTS5 com tokenizer trigram, sincronizado por triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS funcionarios_fts USING fts5(
+  nome, content='funcionarios', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS funcionarios_fts_ai AFTER INSERT ON funcionarios BEGIN
+  INSERT INTO funcionarios_fts(rowid, nome) VALUES (new.id, new.nome);
+END;
+CREATE TRIGGER IF NOT EXISTS funcionarios_fts_ad AFTER DELETE ON funcionarios BEGIN
+  INSERT INTO funcionarios_fts(funcionarios_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+END;
+CREATE TRIGGER IF NOT EXISTS funcionarios_fts_au AFTER UPDATE OF nome ON funcionarios BEGIN
+  INSERT INTO funcionarios_fts(funcionarios_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+  INSERT INTO funcionarios_fts(rowid, nome) VALUES (new.id, new.nome);
+END;
+"""
+
+_MARCADOR = re.compile(r'%s')
+
+
+@lru_cache(maxsize=512)
+def traduzir(sql):
+    """Troca os marcadores `%s` pelo `?` do sqlite3 (resultado em cache por texto de SQL)."""
+    return _MARCADOR.sub('?', sql)
+
+
+def _linha_dict(cursor, linha):
+    return {coluna[0]: valor for coluna, valor in zip(cursor.description, linha)}
+
+
+def resolver_caminho(url_path):
+    """
+    `sqlite:///dev.db` -> 'dev.db'; `sqlite:////tmp/x.db` -> '/tmp/x.db';
+    `sqlite:///:memory:` -> banco em memória compartilhado entre as conexões do pool.
+    Retorna (alvo, uri).
+    """
+    caminho = url_path[1:] if url_path.startswith('/') else url_path
+    if caminho in ('', ':memory:'):
+        return f"file:memdb_{uuid.uuid4().hex}?mode=memory&cache=shared", True
+    return caminho, False
+
+
+def conectar(alvo, uri=False):
+    # isolation_level=None: autocommit, como nos outros drivers; transações só com BEGIN explícito
+    conn = sqlite3.connect(alvo, uri=uri, isolation_level=None, check_same_thread=False, timeout=5.0)
+    conn.row_factory = _linha_dict
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _migrar(conn):
+    """Colunas acrescentadas depois da criação do schema (o CREATE TABLE IF NOT EXISTS não as traz)."""
+    colunas = {linha['name'] for linha in conn.execute("PRAGMA table_xinfo(funcionarios)").fetchall()}
+    if colunas and 'ativo' not in colunas:
+        conn.execute("ALTER TABLE funcionarios ADD COLUMN ativo BOOLEAN NOT NULL DEFAULT TRUE")
+        conn.execute("ALTER TABLE funcionarios ADD COLUMN desligado_em TIMESTAMP")
+
+
+def criar_schema(conn):
+    _migrar(conn)
+    conn.executescript(SCHEMA)
+
+
+class CursorSQLite:
+    """Cursor sqlite3 que aceita o paramstyle `%s` usado pelas consultas do Database."""
+
+    def __init__(self, cursor):
+        self._cur = cursor
+
+    def execute(self, sql, params=()):
+        self._cur.execute(traduzir(sql), tuple(params or ()))
+        return self._cur.rowcount
+
+    def executemany(self, sql, seq_params):
+        self._cur.executemany(traduzir(sql), seq_params)
+        return self._cur.rowcount
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetchmany(self, tamanho):
+        return self._cur.fetchmany(tamanho)
+
+    def close(self):
+        self._cur.close()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
@@ -0,0 +1,93 @@
+# services/versoes.py
+"""
+Versão por tabela, incrementada a cada escrita.
+
+Com a tabela `versoes_tabelas` presente no banco, o contador é compartilhado entre
+todos os workers: cada escrita faz `versao = versao + 1` na mesma conexão (e transação)
+da alteração, e as leituras reconsultam o valor no máximo a cada `intervalo` segundos.
+Sem a tabela, a versão vale só para o processo atual.
+"""
+import os
+import threading
+import time
+import uuid
+
+
+class VersoesTabelas:
+    def __init__(self, conexao, intervalo=1.0):
+        """
+        conexao   -> callable que empresta uma conexão (Database.conexao)
+        intervalo -> idade máxima (s) da versão lida do banco antes de reconsultar
+        """
+        self._conexao = conexao
+        self.intervalo = intervalo
+        self.compartilhado = False
+        self._lock = threading.Lock()
+        self._versoes = {}
+        self._lidas_em = {}
+        # quando cada tabela mudou pela última vez (escrita local ou versão nova lida do banco)
+        self._mudou_em = {}
+        # distingue reinícios do processo (os contadores locais voltam a zero)
+        self._instancia = uuid.uuid4().hex[:8]
+
+    def ativar_compartilhamento(self, tabelas_existentes):
+        self.compartilhado = 'versoes_tabelas' in (tabelas_existentes or ())
+
+    def incrementar(self, cur, tabela, confirmar=True):
+        """
+        Registra uma escrita em `tabela` usando o cursor da própria escrita. Dentro de uma
+        transação, passe confirmar=False e chame confirmar(tabela) só depois do COMMIT: antes
+        dele, outra requisição veria a versão nova com os dados antigos (ETag/304 presos).
+        """
+        if self.compartilhado:
+            cur.execute("UPDATE versoes_tabelas SET versao = versao + 1 WHERE tabela = %s", (tabela,))
+        if confirmar:
+            self.confirmar(tabela)
+
+    def confirmar(self, tabela):
+        """Aplica à versão local uma escrita já confirmada no banco."""
+        with self._lock:
+            self._versoes[tabela] = self._versoes.get(tabela, 0) + 1
+            self._mudou_em[tabela] = time.monotonic()
+            # força releitura do valor compartilhado na próxima consulta
+            self._lidas_em.pop(tabela, None)
+
+    def atual(self, tabela):
+        """Versão corrente de `tabela` (lida do banco no máximo a cada `intervalo` segundos)."""
+        return self.atuais((tabela,))[0]
+
+    def atuais(self, tabelas):
+        """Versões de várias tabelas, com no máximo uma consulta ao banco."""
+        agora = time.monotonic()
+        with self._lock:
+            vencidas = [t for t in tabelas
+                        if self.compartilhado and agora - self._lidas_em.get(t, float('-inf')) >= self.intervalo]
+            if not vencidas:
+                return tuple(self._versoes.get(t, 0) for t in tabelas)
+
+        marcadores = ', '.join(['%s'] * len(vencidas))
+        with self._conexao() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT tabela, versao FROM versoes_tabelas WHERE tabela IN ({marcadores})", vencidas)
+            lidas = {linha['tabela']: linha['versao'] for linha in cur.fetchall()}
+        with self._lock:
+            for tabela in vencidas:
+                anterior = self._versoes.get(tabela)
+                self._versoes[tabela] = lidas.get(tabela, 0)
+                if anterior is not None and anterior != self._versoes[tabela]:
+                    self._mudou_em[tabela] = agora
+                self._lidas_em[tabela] = agora
+            return tuple(self._versoes.get(t, 0) for t in tabelas)
+
+    def mudou_ha_menos_de(self, segundos, tabelas):
+        """Alguma das `tabelas` mudou nos últimos `segundos`? (só o que este processo já observou)"""
+        limite = time.monotonic() - segundos
+        with self._lock:
+            return any(self._mudou_em.get(t, float('-inf')) > limite for t in tabelas)
+
+    def etag(self, *tabelas):
+        """
+        ETag forte para respostas que dependem de `tabelas`. Sem versão compartilhada, os
+        contadores são do processo, então o pid entra no ETag para não coincidir entre workers.
+        """
+        versoes = '.'.join(str(v) for v in self.atuais(tabelas))
+        return f"v{versoes}" if self.compartilhado else f"p{os.getpid()}-{self._instancia}-{versoes}"
@@ -0,0 +1,12 @@
+import pytest
+
+from services.db import Database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Database num SQLite novo (schema criado na primeira conexão)."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'teste.db'}")
+    banco = Database()
+    yield banco
+    banco.pool.fechar()
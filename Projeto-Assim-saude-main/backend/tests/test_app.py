@@ -0,0 +1,34 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.delenv('DB_ORM', raising=False)
+    import app as modulo
+    return importlib.reload(modulo)
+
+
+def test_etag_das_listagens_depende_da_query_string(app):
+    app.DB.inserir_cargo('Dev', 10, '')
+    cliente = app.app.test_client()
+    for rota in ('/api/cargos', '/api/funcionarios'):
+        etag = cliente.get(rota).headers['ETag']
+        assert cliente.get(rota, headers={'If-None-Match': etag}).status_code == 304
+        for variante in ('?formato=colunar', '?limit=10', '?nome=Dev'):
+            outra = cliente.get(rota + variante)
+            assert outra.headers['ETag'] != etag
+            assert cliente.get(rota + variante, headers={'If-None-Match': etag}).status_code == 200
+        # a ordem dos parâmetros não muda a representação
+        assert cliente.get(rota + '?limit=10&nome=D').headers['ETag'] == \
+            cliente.get(rota + '?nome=D&limit=10').headers['ETag']
+
+
+def test_parametro_invalido_e_400_mesmo_com_if_none_match(app):
+    cliente = app.app.test_client()
+    for rota in ('/api/cargos', '/api/funcionarios'):
+        for invalida in ('?limit=0', '?after=xyz'):
+            resp = cliente.get(rota + invalida, headers={'If-None-Match': '*'})
+            assert resp.status_code == 400, (rota, invalida)
@@ -0,0 +1,23 @@
+import importlib
+
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('httpx')
+from starlette.testclient import TestClient
+
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'asgi.db'}")
+    import asgi
+    with TestClient(importlib.reload(asgi).app) as cliente:
+        yield cliente
+
+
+def test_counts_if_none_match_com_lista_fraca_e_curinga(cliente):
+    etag = cliente.get('/api/counts').headers['etag']
+    assert cliente.get('/api/counts', headers={'If-None-Match': etag}).status_code == 304
+    assert cliente.get('/api/counts', headers={'If-None-Match': f'"outra", W/{etag}'}).status_code == 304
+    assert cliente.get('/api/counts', headers={'If-None-Match': '*'}).status_code == 304
+    assert cliente.get('/api/counts', headers={'If-None-Match': '"outra"'}).status_code == 200
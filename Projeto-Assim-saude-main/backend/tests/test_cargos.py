@@ -0,0 +1,42 @@
+import pytest
+
+from services.db import ERROS_INTEGRIDADE
+
+
+def test_cargo_so_com_desligados_e_excluido_e_eles_vao_para_o_arquivo(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    func_id = db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, cargo_id)
+    db.deletar_funcionario(func_id)
+
+    assert db.deletar_cargo(cargo_id)
+    assert db.contar_desligados() == {'funcionarios_inativos': 0, 'funcionarios_arquivados': 1}
+    arquivado, = db.buscar_funcionarios(incluir_arquivados=True)
+    assert (arquivado['id'], arquivado['cargo_nome']) == (func_id, None)
+
+
+def test_cargo_com_ativo_nao_e_excluido_e_nada_e_arquivado(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    desligado = db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, cargo_id)
+    db.deletar_funcionario(desligado)
+    db.inserir_funcionario('Bia', None, None, '111.444.777-35', None, None, cargo_id)
+
+    with pytest.raises(ERROS_INTEGRIDADE):
+        db.deletar_cargo(cargo_id)
+    assert db.contar_desligados() == {'funcionarios_inativos': 1, 'funcionarios_arquivados': 0}
+
+
+def test_lote_exclui_cargo_so_com_desligados_como_o_delete(db):
+    from services import lote
+
+    so_desligados = db.inserir_cargo('Dev', 10, '')
+    com_ativo = db.inserir_cargo('QA', 10, '')
+    desligado = db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, so_desligados)
+    db.deletar_funcionario(desligado)
+    db.inserir_funcionario('Bia', None, None, '111.444.777-35', None, None, com_ativo)
+
+    relatorio = db.lote_cargos([lote.Operacao(0, 'excluir', so_desligados), lote.Operacao(1, 'excluir', com_ativo)],
+                               tudo_ou_nada=False)
+    assert [r['status'] for r in relatorio['resultados']] == ['ok', 'erro']
+    assert relatorio['resultados'][1]['erro'] == 'Não é possível excluir este cargo: existem funcionários ativos vinculados.'
+    assert db.buscar_cargo(so_desligados) is None
+    assert db.contar_desligados() == {'funcionarios_inativos': 0, 'funcionarios_arquivados': 1}
@@ -0,0 +1,52 @@
+import pytest
+
+from services import cpf as modulo_cpf
+from services.cpf import carregar_numpy, gerar_cpfs, validar_cpf, validar_cpfs
+
+CASOS = [
+    '529.982.247-25',
+    '52998224725',
+    ' 529 982 247 25 ',
+    '529.982.247-24',
+    '111.111.111-11',
+    '5299822472',
+    '529982247255',
+    '',
+    'abc',
+    '5299822472٥5',   # dígito arábico-índico no lugar de um 2
+    '٥٢٩٩٨٢٢٤٧٢٥',
+    '529.982.247-2５',  # dígito de largura total
+    '529\n982.247-25',
+]
+
+
+@pytest.mark.parametrize('cpf', CASOS)
+def test_lote_igual_ao_escalar(cpf):
+    validos, _ = validar_cpfs([cpf])
+    assert bool(validos[0]) == validar_cpf(cpf)
+
+
+def test_lote_misto_igual_ao_escalar():
+    validos, normalizados = validar_cpfs(CASOS)
+    assert [bool(v) for v in validos] == [validar_cpf(c) for c in CASOS]
+    assert len(normalizados) == len(CASOS)
+
+
+@pytest.mark.skipif(carregar_numpy() is None, reason='NumPy não instalado')
+def test_lote_ascii_usa_caminho_vetorizado():
+    validos, normalizados = validar_cpfs(['529.982.247-25', '123.456.789-00'])
+    assert [bool(v) for v in validos] == [True, False]
+    assert normalizados == ['52998224725', '12345678900']
+
+
+@pytest.mark.parametrize('com_numpy', [True, False])
+def test_gerar_cpfs_entrega_a_quantidade_pedida_sem_repetidos(com_numpy, monkeypatch):
+    if com_numpy and carregar_numpy() is None:
+        pytest.skip('NumPy não instalado')
+    if not com_numpy:
+        monkeypatch.setattr(modulo_cpf, 'carregar_numpy', lambda: None)
+    for quantidade in (1, 7, 5000):
+        gerados = gerar_cpfs(quantidade, seed=3)
+        assert len(gerados) == len(set(gerados)) == quantidade
+        assert all(validar_cpf(c) for c in gerados)
+    assert gerar_cpfs(50, seed=3) == gerar_cpfs(50, seed=3)
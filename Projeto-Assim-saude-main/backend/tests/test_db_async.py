@@ -0,0 +1,25 @@
+import asyncio
+
+from services.db_async import AsyncDatabase
+
+
+def test_aquecimento_desiste_e_readyz_mostra_o_erro(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'async.db'}")
+    db = AsyncDatabase()
+
+    async def fora_do_ar():
+        raise ConnectionError('banco fora do ar')
+    monkeypatch.setattr(db, '_inicializar', fora_do_ar)
+    esperas = []
+
+    async def dormir(segundos):
+        esperas.append(segundos)
+    monkeypatch.setattr(asyncio, 'sleep', dormir)
+
+    asyncio.run(db.aquecer(tentativas=4, atraso_base=1, atraso_maximo=3))
+
+    assert len(esperas) == 3
+    assert all(0 <= espera <= min(3, 2 ** (i + 1)) for i, espera in enumerate(esperas))
+    pronto, detalhes = asyncio.run(db.verificar_prontidao())
+    assert not pronto
+    assert detalhes['ultimo_erro_aquecimento'] == 'banco fora do ar'
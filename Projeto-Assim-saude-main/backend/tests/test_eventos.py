@@ -0,0 +1,30 @@
+from services.eventos import Publicador, maximo_conexoes
+
+
+def test_limite_fica_abaixo_das_threads():
+    assert maximo_conexoes(100, 32) == 16
+    assert maximo_conexoes(10, 32) == 10
+    assert maximo_conexoes(100, 1) == 1
+
+
+def test_vaga_reservada_antes_do_fluxo_comecar():
+    publicador = Publicador(maximo_assinantes=2)
+    primeira = publicador.assinar()
+    segunda = publicador.assinar()
+    # nenhum dos dois fluxos começou, e mesmo assim o limite já vale
+    assert publicador.assinar() is None
+    assert publicador.estatisticas()['assinantes'] == 2
+
+    primeira.close()  # cliente caiu antes do primeiro byte
+    assert publicador.estatisticas()['assinantes'] == 1
+    terceira = publicador.assinar()
+    assert terceira is not None
+
+
+def test_vaga_devolvida_uma_vez_so():
+    publicador = Publicador(maximo_assinantes=1, heartbeat=0.01)
+    assinatura = publicador.assinar()
+    assert next(iter(assinatura)).startswith(b"retry:")
+    assinatura.close()
+    assinatura.close()
+    assert publicador.estatisticas()['assinantes'] == 0
@@ -0,0 +1,23 @@
+from services import lote
+
+
+def test_por_item_com_todas_as_operacoes_falhando_nao_e_aplicado(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, cargo_id)
+
+    # falha no banco: CPF já cadastrado e funcionário inexistente
+    relatorio = db.lote_funcionarios([
+        lote.Operacao(0, 'criar', None, {'nome': 'Ana', 'cpf': '52998224725', 'cargo_id': cargo_id}),
+        lote.Operacao(1, 'excluir', 999),
+    ], tudo_ou_nada=False)
+    assert (relatorio['aplicado'], relatorio['sucesso'], relatorio['erros']) == (False, 0, 2)
+
+    # falha na validação: o banco nem é tocado
+    relatorio = db.lote_cargos([lote.Operacao(0, 'criar', None, {'nome': 'Sem salário'})], tudo_ou_nada=False)
+    assert relatorio['aplicado'] is False
+
+    relatorio = db.lote_funcionarios([
+        lote.Operacao(0, 'excluir', 999),
+        lote.Operacao(1, 'criar', None, {'nome': 'Bia', 'cpf': '111.444.777-35', 'cargo_id': cargo_id}),
+    ], tudo_ou_nada=False)
+    assert (relatorio['aplicado'], relatorio['sucesso']) == (True, 1)
@@ -0,0 +1,51 @@
+import datetime
+import importlib
+
+import pytest
+
+from services import serializacao
+
+pytest.importorskip('flask_sqlalchemy')
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'orm.db'}")
+    monkeypatch.setenv('DB_ORM', '1')
+    import app as modulo
+    return importlib.reload(modulo)
+
+
+def test_listagem_pelo_orm_igual_a_do_database(app):
+    cargo_id = app.DB.inserir_cargo('Dev', 10, '')
+    app.DB.inserir_funcionario('Ana', '1990-01-02', None, '529.982.247-25', None, None, cargo_id)
+    cliente = app.app.test_client()
+    pelo_orm = cliente.get('/api/funcionarios').get_json()
+    orm, app.ORM = app.ORM, None
+    try:
+        pelo_database = cliente.get('/api/funcionarios').get_json()
+    finally:
+        app.ORM = orm
+    assert pelo_orm == pelo_database
+
+
+def test_funcionarios_com_cargo_so_ativos_ou_com_arquivados(app):
+    db = app.DB
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    ativo = db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, cargo_id)
+    desligado = db.inserir_funcionario('Bia', None, None, '111.444.777-35', None, None, cargo_id)
+    arquivado = db.inserir_funcionario('Caio', None, None, '123.456.789-09', None, None, cargo_id)
+    db.deletar_funcionario(arquivado)
+    db.arquivar_funcionarios(dias=0)
+    db.deletar_funcionario(desligado)
+
+    with app.app.app_context():
+        apenas_ativos = [f.to_dict() for f in app.ORM.funcionarios_com_cargo()]
+        todos = [f.to_dict() for f in app.ORM.funcionarios_com_cargo(incluir_arquivados=True)]
+
+    assert [f['id'] for f in apenas_ativos] == [ativo]
+    assert [f['id'] for f in todos] == sorted([f['id'] for f in todos], reverse=True)
+    assert {f['id']: f['ativo'] for f in todos} == {ativo: True, desligado: False, arquivado: False}
+    # tipos do modelo, como as linhas do Database no MySQL/Postgres; o JSON sai pelo serializacao
+    assert all(isinstance(f['criado_em'], datetime.datetime) for f in todos)
+    assert serializacao.loads(serializacao.dumps(todos[0]))['criado_em'] == todos[0]['criado_em'].isoformat()
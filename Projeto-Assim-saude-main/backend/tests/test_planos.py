@@ -0,0 +1,44 @@
+import os
+
+from bench import planos, resultados
+
+BASELINE_SQLITE = os.path.join(os.path.dirname(planos.__file__), 'baselines', 'planos_sqlite.json')
+
+
+def test_primeira_pagina_parada_no_limit_nao_e_varredura():
+    # plano da listagem com arquivados: cada lado do UNION lê a tabela pelo rowid e para no LIMIT
+    linhas = [
+        (4, 0, 'MERGE (UNION ALL)'), (6, 4, 'LEFT'), (8, 6, 'CO-ROUTINE x'), (12, 8, 'SCAN f'),
+        (15, 8, 'SEARCH c USING INTEGER PRIMARY KEY (rowid=?)'),
+        (21, 6, 'SCAN x'), (34, 6, 'USE TEMP B-TREE FOR ORDER BY'),
+        (42, 4, 'RIGHT'), (44, 42, 'CO-ROUTINE y'), (48, 44, 'SCAN a'),
+        (57, 42, 'SCAN y'), (70, 42, 'USE TEMP B-TREE FOR ORDER BY'),
+    ]
+    acessos = planos._acessos_sqlite(linhas, limitada=True)
+    assert [(a['tabela'], a['acesso']) for a in acessos] == [
+        ('f', 'varredura_limitada'), ('c', 'pk'), ('a', 'varredura_limitada')]
+    # sem LIMIT, ou com ORDER BY resolvido numa B-tree temporária, a tabela é lida inteira
+    assert planos._acessos_sqlite(linhas)[0]['acesso'] == 'varredura'
+    ordenada = [(2, 0, 'SCAN f'), (9, 0, 'USE TEMP B-TREE FOR ORDER BY')]
+    assert planos._acessos_sqlite(ordenada, limitada=True)[0]['acesso'] == 'varredura'
+
+
+def test_varreduras_inesperadas():
+    plano = lambda operacao, linhas=None: {
+        'operacao': operacao, 'acessos': [{'tabela': 'f', 'acesso': 'varredura', 'indice': None, 'linhas': linhas}]}
+    mensagens = planos.varreduras_inesperadas({
+        'a': plano('buscar_funcionarios'),            # listagem completa: esperado
+        'b': plano('paginar_funcionarios (nome)'),
+        'c': plano('gerar_relatorio', linhas=20),     # tabela pequena
+    })
+    assert mensagens == ['paginar_funcionarios (nome) [b]: varre f por completo']
+
+
+def test_planos_sqlite_contra_baseline_versionado(monkeypatch):
+    baseline = resultados.carregar(BASELINE_SQLITE)
+    meta = baseline['meta']
+    monkeypatch.setenv('DATABASE_URL', '')  # coletar() troca pelo SQLite temporário
+    motor, atuais = planos.coletar(meta['cargos'], meta['funcionarios'], meta['seed'])
+    assert motor == 'sqlite'
+    assert planos.varreduras_inesperadas(atuais) == []
+    assert planos.comparar(atuais, baseline) == []
@@ -0,0 +1,29 @@
+import decimal
+
+from flask import Flask, Response, request
+
+from services import serializacao
+
+
+def test_decimal_mantem_o_formato_do_banco():
+    assert serializacao.dumps({'salario': decimal.Decimal('3500.00')}) == b'{"salario":"3500.00"}'
+    grande = decimal.Decimal('12345678901234567.89')
+    assert serializacao.loads(serializacao.dumps([grande])) == ['12345678901234567.89']
+
+
+def test_gzip_troca_o_etag_forte_por_fraco():
+    app = Flask(__name__)
+    corpo = b'[' + b','.join([b'{"nome":"Ana"}'] * 200) + b']'
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        resp = Response(corpo, mimetype='application/json')
+        resp.set_etag('cargos-7')
+        resp = serializacao.comprimir(resp, request)
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert resp.headers['ETag'] == 'W/"cargos-7"'
+    assert 'Accept-Encoding' in resp.headers['Vary']
+
+    with app.test_request_context():
+        resp = Response(corpo, mimetype='application/json')
+        resp.set_etag('cargos-7')
+        resp = serializacao.comprimir(resp, request)
+    assert resp.headers['ETag'] == '"cargos-7"'
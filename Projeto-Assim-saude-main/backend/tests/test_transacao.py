@@ -0,0 +1,39 @@
+import pytest
+
+
+class Falha(Exception):
+    pass
+
+
+def test_rollback_nao_altera_versao_contagem_nem_cache(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    contagens, etag = db.contar_registros()
+    versao = db.versoes.atual('funcionarios')
+    db.buscar_cargos_por_nome('')  # carrega o cache de cargos
+    eventos = []
+    db.eventos.publicar = lambda tipo, dados: eventos.append(tipo)
+
+    with pytest.raises(Falha):
+        with db.transacao() as conn, conn.cursor() as cur:
+            cur.execute("INSERT INTO funcionarios (nome, cpf, cargo_id) VALUES (%s, %s, %s)",
+                        ('Ana', '52998224725', cargo_id))
+            db._registrar_escrita(cur, 'funcionarios', +1, chave=cur.lastrowid)
+            cur.execute("UPDATE cargos SET nome = %s WHERE id = %s", ('Outro', cargo_id))
+            db._registrar_escrita(cur, 'cargos', chave=cargo_id)
+            raise Falha()
+
+    assert db.contar_registros() == (contagens, etag)
+    assert db.versoes.atual('funcionarios') == versao
+    assert db.buscar_cargos_por_nome('')[0]['nome'] == 'Dev'
+    assert eventos == []
+
+
+def test_versao_local_muda_so_depois_do_commit(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    antes = db.versoes.atual('funcionarios')
+    with db.transacao() as conn, conn.cursor() as cur:
+        cur.execute("INSERT INTO funcionarios (nome, cpf, cargo_id) VALUES (%s, %s, %s)",
+                    ('Ana', '52998224725', cargo_id))
+        db._registrar_escrita(cur, 'funcionarios', +1, chave=cur.lastrowid)
+        assert db.versoes.atual('funcionarios') == antes
+    assert db.versoes.atual('funcionarios') == antes + 1
@@ -0,0 +1,43 @@
+import pytest
+
+from services.db import ERROS_INTEGRIDADE, violacao_de_fk
+
+
+def test_mesmo_cpf_com_e_sem_pontuacao_e_o_mesmo_funcionario(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    func_id, criado = db.upsert_funcionario('529.982.247-25', {'nome': 'Ana', 'cargo_id': cargo_id})
+    assert criado
+
+    mesmo_id, criado = db.upsert_funcionario('52998224725', {'nome': 'Ana Souza', 'cargo_id': cargo_id})
+    assert (mesmo_id, criado) == (func_id, False)
+    assert [f['nome'] for f in db.buscar_funcionarios()] == ['Ana Souza']
+
+
+def test_upsert_nao_duplica_cadastro_feito_pelo_post(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    func_id = db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, cargo_id)
+    assert db.upsert_funcionario('529 982 247 25', {'nome': 'Ana', 'cargo_id': cargo_id}) == (func_id, False)
+    assert db.contar_registros()[0]['funcionarios'] == 1
+
+
+def test_readmissao_pelo_cpf_sem_pontuacao(db):
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    func_id, _ = db.upsert_funcionario('529.982.247-25', {'nome': 'Ana', 'cargo_id': cargo_id})
+    db.deletar_funcionario(func_id)
+    assert db.contar_registros()[0]['funcionarios'] == 0
+
+    assert db.upsert_funcionario('52998224725', {'nome': 'Ana', 'cargo_id': cargo_id}) == (func_id, False)
+    assert db.contar_registros()[0]['funcionarios'] == 1
+    assert db.resumo_cargos()[0]['quantidade'] == 1
+
+
+def test_so_a_violacao_de_fk_vira_cargo_nao_encontrado(db):
+    with pytest.raises(ERROS_INTEGRIDADE) as fk:
+        db.upsert_funcionario('529.982.247-25', {'nome': 'Ana', 'cargo_id': 999})
+    assert violacao_de_fk(fk.value)
+
+    cargo_id = db.inserir_cargo('Dev', 10, '')
+    db.inserir_funcionario('Ana', None, None, '529.982.247-25', None, None, cargo_id)
+    with pytest.raises(ERROS_INTEGRIDADE) as unico:
+        db.inserir_funcionario('Ana', None, None, '52998224725', None, None, cargo_id)
+    assert not violacao_de_fk(unico.value)
@@ -0,0 +1,15 @@
+-- Busca indexada de funcionários (MySQL 8) para bancos criados antes desta versão.
+-- Bancos novos já recebem estas estruturas pelo database/script.sql.
+USE assim_saude;
+
+ALTER TABLE funcionarios
+  ADD COLUMN cpf_digitos CHAR(11) AS (REPLACE(REPLACE(REPLACE(cpf, '.', ''), '-', ''), ' ', '')) STORED;
+
+CREATE INDEX idx_funcionarios_cpf_digitos ON funcionarios(cpf_digitos);
+-- sem stopwords: a lista padrão do InnoDB tem letras soltas ('a', 'i', ...) e o parser ngram descarta
+-- todo token que contém uma stopword; com ngram_token_size=2 a maioria dos bigramas de nomes em
+-- português nunca seria indexada e o MATCH ... AGAINST perderia linhas que o LIKE encontrava.
+-- A configuração da sessão vale no momento do CREATE; bancos que já têm o índice: migração 006.
+SET SESSION innodb_ft_enable_stopword = OFF;
+CREATE FULLTEXT INDEX ftx_funcionarios_nome ON funcionarios(nome) WITH PARSER ngram;
+SET SESSION innodb_ft_enable_stopword = ON;
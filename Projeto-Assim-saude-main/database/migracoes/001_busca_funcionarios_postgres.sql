@@ -0,0 +1,11 @@
+-- Busca indexada de funcionários (PostgreSQL 12+).
+-- pg_trgm permite que ILIKE '%x%' use índice GIN e fornece word_similarity() para o ranking.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE funcionarios
+  ADD COLUMN IF NOT EXISTS cpf_digitos VARCHAR(11)
+  GENERATED ALWAYS AS (regexp_replace(cpf, '[^0-9]', '', 'g')) STORED;
+
+-- text_pattern_ops: LIKE 'prefixo%' usa o índice independente da collation
+CREATE INDEX IF NOT EXISTS idx_funcionarios_cpf_digitos ON funcionarios (cpf_digitos text_pattern_ops);
+CREATE INDEX IF NOT EXISTS trgm_funcionarios_nome ON funcionarios USING GIN (nome gin_trgm_ops);
@@ -0,0 +1,8 @@
+-- Versão por tabela para invalidação de cache entre workers (MySQL 8).
+USE assim_saude;
+
+CREATE TABLE IF NOT EXISTS versoes_tabelas (
+  tabela VARCHAR(64) PRIMARY KEY,
+  versao BIGINT NOT NULL DEFAULT 0
+);
+INSERT IGNORE INTO versoes_tabelas (tabela, versao) VALUES ('cargos', 0), ('funcionarios', 0);
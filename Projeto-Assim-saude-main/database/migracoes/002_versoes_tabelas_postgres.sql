@@ -0,0 +1,7 @@
+-- Versão por tabela para invalidação de cache entre workers (PostgreSQL).
+CREATE TABLE IF NOT EXISTS versoes_tabelas (
+  tabela VARCHAR(64) PRIMARY KEY,
+  versao BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO versoes_tabelas (tabela, versao) VALUES ('cargos', 0), ('funcionarios', 0)
+ON CONFLICT (tabela) DO NOTHING;
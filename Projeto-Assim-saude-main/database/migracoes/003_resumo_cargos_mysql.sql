@@ -0,0 +1,14 @@
+-- Resumo por cargo (quantidade de funcionários) mantido pelo backend (MySQL 8).
+-- Sem esta tabela o /api/resumo/cargos continua respondendo, mas agregando todos os funcionários.
+USE assim_saude;
+
+CREATE TABLE IF NOT EXISTS resumo_cargos (
+  cargo_id INT PRIMARY KEY,
+  quantidade INT NOT NULL DEFAULT 0,
+  FOREIGN KEY (cargo_id) REFERENCES cargos(id) ON DELETE CASCADE
+);
+
+-- carga inicial; depois confira com `python -m services.resumo`
+INSERT INTO resumo_cargos (cargo_id, quantidade)
+  SELECT c.id, COUNT(f.id) FROM cargos c LEFT JOIN funcionarios f ON f.cargo_id = c.id GROUP BY c.id
+ON DUPLICATE KEY UPDATE quantidade = VALUES(quantidade);
@@ -0,0 +1,11 @@
+-- Resumo por cargo (quantidade de funcionários) mantido pelo backend (PostgreSQL).
+-- Sem esta tabela o /api/resumo/cargos continua respondendo, mas agregando todos os funcionários.
+CREATE TABLE IF NOT EXISTS resumo_cargos (
+  cargo_id INT PRIMARY KEY REFERENCES cargos(id) ON DELETE CASCADE,
+  quantidade INT NOT NULL DEFAULT 0
+);
+
+-- carga inicial; depois confira com `python -m services.resumo`
+INSERT INTO resumo_cargos (cargo_id, quantidade)
+  SELECT c.id, COUNT(f.id) FROM cargos c LEFT JOIN funcionarios f ON f.cargo_id = c.id GROUP BY c.id
+ON CONFLICT (cargo_id) DO UPDATE SET quantidade = excluded.quantidade;
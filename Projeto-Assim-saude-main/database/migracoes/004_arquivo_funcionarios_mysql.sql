@@ -0,0 +1,27 @@
+-- Desligamento (soft delete) e arquivo de funcionários (MySQL 8).
+-- Com a tabela funcionarios_arquivo o DELETE da API vira desligamento e os desligados há mais
+-- de ARQUIVO_DIAS são movidos para o arquivo por `python -m services.arquivo`.
+USE assim_saude;
+
+ALTER TABLE funcionarios
+  ADD COLUMN ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  ADD COLUMN desligado_em TIMESTAMP NULL;
+
+-- o MySQL não tem índice parcial: (ativo, desligado_em) serve ao job de arquivamento
+CREATE INDEX idx_funcionarios_ativo_desligado ON funcionarios(ativo, desligado_em);
+
+CREATE TABLE IF NOT EXISTS funcionarios_arquivo (
+  id INT PRIMARY KEY,
+  nome VARCHAR(255) NOT NULL,
+  data_nascimento DATE,
+  endereco TEXT,
+  cpf VARCHAR(14) NOT NULL,
+  email VARCHAR(255),
+  telefone VARCHAR(20),
+  cargo_id INT NOT NULL,
+  criado_em TIMESTAMP NULL,
+  cpf_digitos CHAR(11),
+  desligado_em TIMESTAMP NULL,
+  arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_funcionarios_arquivo_cpf_digitos (cpf_digitos)
+);
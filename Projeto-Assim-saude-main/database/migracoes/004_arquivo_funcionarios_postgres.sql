@@ -0,0 +1,28 @@
+-- Desligamento (soft delete) e arquivo de funcionários (PostgreSQL).
+-- Com a tabela funcionarios_arquivo o DELETE da API vira desligamento e os desligados há mais
+-- de ARQUIVO_DIAS são movidos para o arquivo por `python -m services.arquivo`.
+ALTER TABLE funcionarios
+  ADD COLUMN IF NOT EXISTS ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  ADD COLUMN IF NOT EXISTS desligado_em TIMESTAMP;
+
+-- índices parciais: a busca por nome só olha os ativos, o arquivamento só os desligados
+DROP INDEX IF EXISTS trgm_funcionarios_nome;
+CREATE INDEX IF NOT EXISTS trgm_funcionarios_ativos_nome ON funcionarios USING GIN (nome gin_trgm_ops) WHERE ativo;
+CREATE INDEX IF NOT EXISTS idx_funcionarios_desligados ON funcionarios (desligado_em) WHERE NOT ativo;
+
+CREATE TABLE IF NOT EXISTS funcionarios_arquivo (
+  id INT PRIMARY KEY,
+  nome VARCHAR(255) NOT NULL,
+  data_nascimento DATE,
+  endereco TEXT,
+  cpf VARCHAR(14) NOT NULL,
+  email VARCHAR(255),
+  telefone VARCHAR(20),
+  cargo_id INT NOT NULL,
+  criado_em TIMESTAMP,
+  cpf_digitos VARCHAR(11),
+  desligado_em TIMESTAMP,
+  arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_funcionarios_arquivo_cpf_digitos
+  ON funcionarios_arquivo (cpf_digitos text_pattern_ops);
@@ -0,0 +1,9 @@
+-- CPF único pelos dígitos (MySQL 8): '529.982.247-25' e '52998224725' são o mesmo funcionário.
+-- O upsert por CPF (PUT /api/funcionarios/by-cpf/<cpf>) passa a resolver o conflito por este índice.
+-- Duplicados com formatação diferente impedem a criação; liste-os antes e resolva à mão:
+--   SELECT cpf_digitos, GROUP_CONCAT(id) FROM funcionarios GROUP BY cpf_digitos HAVING COUNT(*) > 1;
+USE assim_saude;
+
+-- o índice único também atende a busca por prefixo (LIKE '529%'): substitui o anterior
+CREATE UNIQUE INDEX uq_funcionarios_cpf_digitos ON funcionarios(cpf_digitos);
+DROP INDEX idx_funcionarios_cpf_digitos ON funcionarios;
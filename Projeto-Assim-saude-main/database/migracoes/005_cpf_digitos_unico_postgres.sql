@@ -0,0 +1,8 @@
+-- CPF único pelos dígitos (PostgreSQL): '529.982.247-25' e '52998224725' são o mesmo funcionário.
+-- O upsert por CPF (PUT /api/funcionarios/by-cpf/<cpf>) passa a usar ON CONFLICT (cpf_digitos);
+-- sem este índice ele continua resolvendo pelo `cpf` exatamente como enviado.
+-- Duplicados com formatação diferente impedem a criação; liste-os antes e resolva à mão:
+--   SELECT cpf_digitos, array_agg(id) FROM funcionarios GROUP BY cpf_digitos HAVING COUNT(*) > 1;
+
+-- o idx_funcionarios_cpf_digitos (text_pattern_ops) continua servindo a busca por prefixo
+CREATE UNIQUE INDEX IF NOT EXISTS uq_funcionarios_cpf_digitos ON funcionarios (cpf_digitos);
@@ -0,0 +1,10 @@
+-- Reconstrói o índice FULLTEXT (ngram) do nome sem stopwords (MySQL 8), para bancos que aplicaram
+-- a migração 001 ou o script.sql antes da correção. Com a lista padrão do InnoDB ligada, o parser
+-- ngram descarta todo bigrama que contém 'a', 'i', ... e a busca por nome (MATCH ... AGAINST) deixa
+-- de encontrar funcionários que o LIKE encontrava. Só o MySQL: no Postgres a busca usa pg_trgm.
+USE assim_saude;
+
+SET SESSION innodb_ft_enable_stopword = OFF;
+DROP INDEX ftx_funcionarios_nome ON funcionarios;
+CREATE FULLTEXT INDEX ftx_funcionarios_nome ON funcionarios(nome) WITH PARSER ngram;
+SET SESSION innodb_ft_enable_stopword = ON;
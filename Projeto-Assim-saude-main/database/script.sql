@@ -24,6 +24,11 @@ CREATE TABLE IF NOT EXISTS funcionarios (
   telefone VARCHAR(20),
   cargo_id INT NOT NULL,
   criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  -- CPF só com dígitos, para busca por prefixo em índice
+  cpf_digitos CHAR(11) AS (REPLACE(REPLACE(REPLACE(cpf, '.', ''), '-', ''), ' ', '')) STORED,
+  -- DELETE pela API desliga (ativo = FALSE); o arquivamento move a linha depois de ARQUIVO_DIAS
+  ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  desligado_em TIMESTAMP NULL,
   FOREIGN KEY (cargo_id) REFERENCES cargos(id) ON DELETE RESTRICT ON UPDATE CASCADE
 );
 
@@ -35,10 +40,49 @@ CREATE TABLE IF NOT EXISTS relatorios (
   criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- versão por tabela, incrementada a cada escrita (invalida caches em todos os workers)
+CREATE TABLE IF NOT EXISTS versoes_tabelas (
+  tabela VARCHAR(64) PRIMARY KEY,
+  versao BIGINT NOT NULL DEFAULT 0
+);
+INSERT IGNORE INTO versoes_tabelas (tabela, versao) VALUES ('cargos', 0), ('funcionarios', 0);
+
+-- resumo por cargo (quantidade de funcionários), mantido pelo backend a cada escrita
+CREATE TABLE IF NOT EXISTS resumo_cargos (
+  cargo_id INT PRIMARY KEY,
+  quantidade INT NOT NULL DEFAULT 0,
+  FOREIGN KEY (cargo_id) REFERENCES cargos(id) ON DELETE CASCADE
+);
+
+-- desligados há mais de ARQUIVO_DIAS, movidos por `python -m services.arquivo` (ids originais)
+CREATE TABLE IF NOT EXISTS funcionarios_arquivo (
+  id INT PRIMARY KEY,
+  nome VARCHAR(255) NOT NULL,
+  data_nascimento DATE,
+  endereco TEXT,
+  cpf VARCHAR(14) NOT NULL,
+  email VARCHAR(255),
+  telefone VARCHAR(20),
+  cargo_id INT NOT NULL,
+  criado_em TIMESTAMP NULL,
+  cpf_digitos CHAR(11),
+  desligado_em TIMESTAMP NULL,
+  arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 
 -- índices
 CREATE INDEX idx_funcionarios_nome ON funcionarios(nome);
 CREATE INDEX idx_cargos_nome ON cargos(nome);
+-- único: o mesmo CPF com ou sem pontuação é o mesmo funcionário (upsert por CPF)
+CREATE UNIQUE INDEX uq_funcionarios_cpf_digitos ON funcionarios(cpf_digitos);
+CREATE INDEX idx_funcionarios_ativo_desligado ON funcionarios(ativo, desligado_em);
+CREATE INDEX idx_funcionarios_arquivo_cpf_digitos ON funcionarios_arquivo(cpf_digitos);
+-- busca por trecho do nome (substitui LIKE '%x%', que não usa índice)
+-- sem stopwords: com elas o parser ngram descarta todo bigrama que contém 'a', 'e', 'i'...
+-- (a lista padrão do InnoDB), e boa parte dos nomes some da busca; vale o valor no CREATE
+SET SESSION innodb_ft_enable_stopword = OFF;
+CREATE FULLTEXT INDEX ftx_funcionarios_nome ON funcionarios(nome) WITH PARSER ngram;
+SET SESSION innodb_ft_enable_stopword = ON;
 
 
 
@@ -1,33 +1,71 @@
-
-const updateCounts = async () => {
+const renderCounts = (data) => {
   const elCargos = document.getElementById('count-cargos');
   const elFuncs = document.getElementById('count-funcionarios');
   const elRels = document.getElementById('count-relatorios');
-  if (!elCargos && !elFuncs && !elRels) return;
 
-  try {
-    const res = await fetch(`${API_URL}/counts`);
-    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-    const data = await res.json();
+  if (elCargos) elCargos.textContent = (data.cargos ?? 0).toString();
+  if (elFuncs)  elFuncs.textContent  = (data.funcionarios ?? 0).toString();
 
-    if (elCargos) elCargos.textContent = (data.cargos ?? 0).toString();
-    if (elFuncs)  elFuncs.textContent  = (data.funcionarios ?? 0).toString();
+  // mostra "—" se relatorios não existir (null), senão número
+  if (elRels) {
+    elRels.textContent = (data.relatorios === null || data.relatorios === undefined) ? '—' : data.relatorios.toString();
+  }
+};
 
-    // mostra "—" se relatorios não existir (null), senão número
-    if (elRels) {
-      elRels.textContent = (data.relatorios === null || data.relatorios === undefined) ? '—' : data.relatorios.toString();
-    }
+const hasCountElements = () =>
+  ['count-cargos', 'count-funcionarios', 'count-relatorios'].some((id) => document.getElementById(id));
+
+const updateCounts = async () => {
+  if (!hasCountElements()) return;
+
+  try {
+    // no-cache: o navegador revalida com If-None-Match e o backend responde 304 se nada mudou
+    const res = await fetch(`${API_URL}/counts`, { cache: 'no-cache' });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    renderCounts(await res.json());
   } catch (err) {
     console.error('Erro ao buscar counts:', err);
-    if (elCargos) elCargos.textContent = '!';
-    if (elFuncs)  elFuncs.textContent  = '!';
-    if (elRels)   elRels.textContent   = '!';
+    ['count-cargos', 'count-funcionarios', 'count-relatorios'].forEach((id) => {
+      const el = document.getElementById(id);
+      if (el) el.textContent = '!';
+    });
   }
 };
 
-// inicia ao carregar e repete a cada 5s
-document.addEventListener('DOMContentLoaded', () => {
+// fallback: polling a cada 5s (navegador sem EventSource ou /api/events indisponível)
+let pollingTimer = null;
+const startPolling = () => {
+  if (pollingTimer) return;
   updateCounts();
-  setInterval(updateCounts, 5000);
-});
+  pollingTimer = setInterval(updateCounts, 5000);
+};
+
+const stopPolling = () => {
+  clearInterval(pollingTimer);
+  pollingTimer = null;
+};
 
+// /api/events empurra as contagens quando mudam; o EventSource reconecta sozinho (com Last-Event-ID)
+const startEvents = () => {
+  if (!('EventSource' in window)) return startPolling();
+
+  const source = new EventSource(`${API_URL}/events`);
+  source.addEventListener('open', stopPolling);
+  source.addEventListener('contagens', (ev) => renderCounts(JSON.parse(ev.data)));
+  // o servidor perdeu o fio dos eventos (reinício, outro worker): recarrega tudo
+  source.addEventListener('sincronizar', updateCounts);
+  // avisa as telas abertas que cargos/funcionários mudaram
+  source.addEventListener('alteracao', (ev) => {
+    document.dispatchEvent(new CustomEvent('assim:alteracao', { detail: JSON.parse(ev.data) }));
+  });
+  source.addEventListener('error', () => {
+    // CLOSED = o servidor recusou (ex.: 503 por limite de conexões); enquanto isso, polling
+    startPolling();
+    if (source.readyState === EventSource.CLOSED) setTimeout(() => { stopPolling(); startEvents(); }, 30000);
+  });
+};
+
+document.addEventListener('DOMContentLoaded', () => {
+  if (!hasCountElements()) return;
+  startEvents();
+});
@@ -4,28 +4,43 @@ if(!window.API_URL){
 }
 
 const tabelaBody = document.querySelector('#tabela_relatorio tbody');
+const resumoBody = document.querySelector('#tabela_resumo tbody');
 const btnFilter = document.getElementById('btn_filter');
+const btnMore = document.getElementById('btn_more');
+
+// estado da paginação: filtros usados na consulta atual e cursor da próxima página
+let filtrosAtuais = { nome: '', cargo: '' };
+let proximoCursor = null;
+let linhasExibidas = 0;
 
 async function fetchCargos(){
   const res = await fetch(`${API_URL}/cargos`);
   return res.json();
 }
-async function fetchFuncionarios(nome='', cargo=''){
-  // cargo filter: we'll filter clientside by cargo id if backend doesn't support direct join filter param
-  const res = await fetch(`${API_URL}/funcionarios?nome=${encodeURIComponent(nome)}`);
+async function fetchRelatorio(nome='', cargo='', after=null, agregados=false){
+  // filtros de nome e cargo são aplicados no backend; só a página visível é transferida
+  const params = new URLSearchParams({ nome, limit: '50' });
+  if (cargo) params.set('cargo_id', cargo);
+  if (after) params.set('after', after);
+  if (agregados) params.set('agregados', '1');
+  const res = await fetch(`${API_URL}/relatorio?${params.toString()}`);
   return res.json();
 }
 
-function renderRelatorio(funcs){
-  tabelaBody.innerHTML = '';
+function renderRelatorio(funcs, append=false){
+  if (!append) {
+    tabelaBody.innerHTML = '';
+    linhasExibidas = 0;
+  }
 
  
-  funcs.forEach((f, idx) => {
+  funcs.forEach((f) => {
     const tr = document.createElement('tr');
+    linhasExibidas += 1;
 
 
     tr.innerHTML = `
-      <td>${idx + 1}</td>
+      <td>${linhasExibidas}</td>
       <td>${f.nome || ''}</td>
       <td>${f.telefone || ''}</td>
       <td>${f.cargo_nome || f.cargo || ''}</td>
@@ -34,9 +49,25 @@ function renderRelatorio(funcs){
     tabelaBody.appendChild(tr);
   });
 
-  
+  btnMore.style.display = proximoCursor ? 'inline-block' : 'none';
+}
+
+function renderResumo(agregados){
+  resumoBody.innerHTML = '';
+  let total = 0;
+  agregados.forEach(a => {
+    const tr = document.createElement('tr');
+    tr.innerHTML = `
+      <td>${a.cargo_nome || ''}</td>
+      <td>${a.quantidade}</td>
+      <td>${a.salario_total || ''}</td>
+    `;
+    resumoBody.appendChild(tr);
+    total += Number(a.quantidade) || 0;
+  });
+
   try {
-    localStorage.setItem('relatorios_count', String(funcs.length));
+    localStorage.setItem('relatorios_count', String(total));
   } catch (e) {
     // se storage falhar, não atrapalha a renderização
     console.warn('Não foi possível salvar relatorios_count em localStorage', e);
@@ -55,11 +86,21 @@ async function loadFilters(){
 }
 
 btnFilter.onclick = async ()=>{
-  const nome = document.getElementById('filter_nome').value;
-  const cargo = document.getElementById('filter_cargo').value;
-  const funcs = await fetchFuncionarios(nome);
-  const filtered = cargo ? funcs.filter(f=> String(f.cargo_id) === String(cargo)) : funcs;
-  renderRelatorio(filtered);
+  filtrosAtuais = {
+    nome: document.getElementById('filter_nome').value,
+    cargo: document.getElementById('filter_cargo').value
+  };
+  const data = await fetchRelatorio(filtrosAtuais.nome, filtrosAtuais.cargo, null, true);
+  proximoCursor = data.next_cursor;
+  renderRelatorio(data.itens || []);
+  renderResumo(data.agregados || []);
+};
+
+btnMore.onclick = async ()=>{
+  if (!proximoCursor) return;
+  const data = await fetchRelatorio(filtrosAtuais.nome, filtrosAtuais.cargo, proximoCursor);
+  proximoCursor = data.next_cursor;
+  renderRelatorio(data.itens || [], true);
 };
 
 loadFilters();